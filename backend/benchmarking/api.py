@@ -4,12 +4,18 @@ FastAPI routes for benchmark data and comparisons
 """
 
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import numpy as np
-from .logging_service import BenchmarkLogger
+from .logging_service import BenchmarkLogger, EXPORT_COLUMNS, EXPORT_TYPES
 from .statistics_service import StatisticsService
 import logging
 
+try:
+    from streaming_export import EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_rows, parquet_available
+except ImportError:
+    from backend.streaming_export import EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_rows, parquet_available
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/benchmarks", tags=["benchmarks"])
@@ -72,34 +78,38 @@ async def compare_models(
 ):
     """Compare multiple models on a dataset"""
     try:
+        # Aggregates are read from the per-model/dataset/metric rollups
+        rollups = benchmark_logger.summarize_metrics(
+            model_names=models,
+            dataset_names=[dataset],
+            metric_names=metrics
+        )
         comparison_data = {}
-        
         for model in models:
-            runs = benchmark_logger.query_metrics(
-                model_names=[model],
-                dataset_names=[dataset],
-                metric_names=metrics
-            )
-            
-            # Aggregate metrics
-            model_metrics = {}
-            for run in runs:
-                metric_name = run['metric_name']
-                if metric_name not in model_metrics:
-                    model_metrics[metric_name] = []
-                model_metrics[metric_name].append(run['metric_value'])
-            
-            # Compute statistics
-            comparison_data[model] = {}
-            for metric_name, values in model_metrics.items():
-                values_array = np.array(values)
-                comparison_data[model][metric_name] = {
-                    'mean': float(np.mean(values_array)),
-                    'std': float(np.std(values_array)),
-                    'min': float(np.min(values_array)),
-                    'max': float(np.max(values_array)),
-                    'count': len(values)
+            comparison_data[model] = {
+                metric_name: {
+                    'mean': stats['mean'],
+                    'std': stats['std'],
+                    'min': stats['min'],
+                    'max': stats['max'],
+                    'count': stats['count']
                 }
+                for metric_name, stats in rollups.get(model, {}).get('metrics', {}).items()
+            }
+        
+        # Load every (model, metric) series once for the pairwise tests
+        series = benchmark_logger.get_metric_series(
+            model_names=models,
+            dataset_names=[dataset],
+            metric_names=metrics
+        )
+        raw_values = {
+            model: {
+                metric_name: np.array(values)
+                for metric_name, values in series.get(model, {}).items()
+            }
+            for model in models
+        }
         
         # Perform statistical significance tests
         significance_tests = {}
@@ -110,21 +120,9 @@ async def compare_models(
                 model_b = model_list[j]
                 
                 for metric in metrics:
-                    if metric in comparison_data[model_a] and metric in comparison_data[model_b]:
-                        # Get raw values for t-test
-                        runs_a = benchmark_logger.query_metrics(
-                            model_names=[model_a],
-                            dataset_names=[dataset],
-                            metric_names=[metric]
-                        )
-                        runs_b = benchmark_logger.query_metrics(
-                            model_names=[model_b],
-                            dataset_names=[dataset],
-                            metric_names=[metric]
-                        )
-                        
-                        values_a = np.array([r['metric_value'] for r in runs_a])
-                        values_b = np.array([r['metric_value'] for r in runs_b])
+                    if metric in raw_values[model_a] and metric in raw_values[model_b]:
+                        values_a = raw_values[model_a][metric]
+                        values_b = raw_values[model_b][metric]
                         
                         if len(values_a) > 1 and len(values_b) > 1:
                             test_result = stats_service.paired_t_test(values_a, values_b)
@@ -146,6 +144,45 @@ async def compare_models(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/comparison/paired")
+async def compare_models_paired(
+    models: List[str] = Query(...),
+    dataset: str = Query(...),
+    metrics: List[str] = Query(["accuracy", "f1", "latency_mean"]),
+    align_by: str = Query("experiment_id", regex="^(experiment_id|seed)$"),
+    correction: str = Query("benjamini_hochberg", regex="^(bonferroni|benjamini_hochberg)$")
+):
+    """Run-aligned paired tests for every model pair, corrected for multiple comparisons"""
+    try:
+        results = {}
+        
+        for metric in metrics:
+            values_by_model = benchmark_logger.get_aligned_metric_values(
+                model_names=models,
+                dataset_names=[dataset],
+                metric_name=metric,
+                align_by=align_by
+            )
+            matrix, keys = stats_service.build_aligned_matrix(values_by_model, list(models))
+            
+            results[metric] = {
+                'num_aligned_runs': len(keys),
+                'pairs': stats_service.all_pairs_paired_tests(
+                    matrix, list(models), correction=correction
+                )
+            }
+        
+        return {
+            'status': 'success',
+            'align_by': align_by,
+            'correction': correction,
+            'paired_tests': results
+        }
+    except Exception as e:
+        logger.error(f"Error running paired comparison: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/robustness")
 async def get_robustness_metrics(
     model_name: str = Query(...),
@@ -228,46 +265,44 @@ async def create_run(run_data: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/runs/bulk")
+async def create_runs_bulk(runs_data: List[dict]):
+    """Create many benchmark runs in one transaction (historical backfill)"""
+    try:
+        run_ids = benchmark_logger.log_runs_bulk(runs_data)
+        
+        return {
+            'status': 'success',
+            'count': len(run_ids),
+            'run_ids': run_ids
+        }
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing field: {e}")
+    except Exception as e:
+        logger.error(f"Error creating runs in bulk: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/summary")
 async def get_summary(
     dataset_name: Optional[str] = Query(None)
 ):
     """Get summary statistics"""
     try:
-        runs = benchmark_logger.query_metrics(
-            dataset_names=[dataset_name] if dataset_name else None,
-            limit=10000
+        model_stats = benchmark_logger.summarize_metrics(
+            dataset_names=[dataset_name] if dataset_name else None
         )
         
-        # Group by model
-        model_stats = {}
-        for run in runs:
-            model = run['model_name']
-            if model not in model_stats:
-                model_stats[model] = {
-                    'num_runs': 0,
-                    'metrics': {}
-                }
-            
-            model_stats[model]['num_runs'] += 1
-            
-            metric_name = run['metric_name']
-            if metric_name not in model_stats[model]['metrics']:
-                model_stats[model]['metrics'][metric_name] = []
-            
-            model_stats[model]['metrics'][metric_name].append(run['metric_value'])
-        
-        # Compute averages
         summary = {}
         for model, stats in model_stats.items():
             summary[model] = {
                 'num_runs': stats['num_runs'],
-                'avg_metrics': {}
+                'avg_metrics': {
+                    metric_name: metric_stats['mean']
+                    for metric_name, metric_stats in stats['metrics'].items()
+                },
+                'metric_stats': stats['metrics']
             }
-            
-            for metric_name, values in stats['metrics'].items():
-                values_array = np.array(values)
-                summary[model]['avg_metrics'][metric_name] = float(np.mean(values_array))
         
         return {
             'status': 'success',
@@ -474,6 +509,38 @@ async def export_comparison_data(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/export/stream")
+async def stream_benchmark_export(
+    format: str = Query("csv", regex="^(csv|ndjson|parquet)$"),
+    include: str = Query("metrics", regex="^(metrics|predictions)$"),
+    model_names: Optional[List[str]] = Query(None),
+    dataset_name: Optional[str] = Query(None),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=50000)
+):
+    """Stream raw benchmark metrics or predictions as CSV, NDJSON or Parquet"""
+    if format == 'parquet' and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+    
+    try:
+        row_chunks = benchmark_logger.iter_export_rows(
+            include=include,
+            model_names=model_names,
+            dataset_names=[dataset_name] if dataset_name else None,
+            chunk_size=chunk_size
+        )
+        
+        return StreamingResponse(
+            stream_rows(format, EXPORT_COLUMNS[include], row_chunks, EXPORT_TYPES[include]),
+            media_type=EXPORT_FORMATS[format],
+            headers={
+                'Content-Disposition': f'attachment; filename="benchmark-{include}.{format}"'
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error streaming benchmark export: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 def convert_comparison_to_csv(data: dict) -> str:
     """Convert comparison data to CSV format"""
     import io
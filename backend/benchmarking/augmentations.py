@@ -0,0 +1,316 @@
+"""
+Batched Augmentations for Robustness Benchmarking
+Tensor-level corruption operators applied to whole NCHW batches
+"""
+
+import math
+import torch
+import torch.nn.functional as F
+from typing import Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Normalization applied by the benchmark data loaders
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+class BatchAugmentation:
+    """
+    Base class for augmentations applied to a whole NCHW batch at once
+
+    Each pass over a test set draws its randomness from a fresh generator
+    seeded with ``seed``, so repeated evaluations see identical corruptions.
+    """
+
+    def __init__(self, seed: int = 0):
+        """
+        Initialize augmentation
+
+        Args:
+            seed: Seed for the random generator used on each pass
+        """
+        self.seed = seed
+
+    def make_generator(self, device) -> torch.Generator:
+        """Create a freshly seeded generator on the given device"""
+        generator = torch.Generator(device=device)
+        generator.manual_seed(self.seed)
+        return generator
+
+    def apply(self, images: torch.Tensor, generator: torch.Generator) -> torch.Tensor:
+        """
+        Apply augmentation to a batch
+
+        Args:
+            images: Float tensor of shape (N, C, H, W)
+            generator: Random generator on the same device as images
+
+        Returns:
+            Augmented tensor with the same shape as images
+        """
+        raise NotImplementedError
+
+    def __call__(self, images: torch.Tensor, generator: Optional[torch.Generator] = None) -> torch.Tensor:
+        if generator is None:
+            generator = self.make_generator(images.device)
+        return self.apply(images, generator)
+
+    def _uniform(self, n: int, low: float, high: float, images: torch.Tensor,
+                 generator: torch.Generator) -> torch.Tensor:
+        """Draw one uniform value per sample in [low, high)"""
+        values = torch.rand(n, generator=generator, device=images.device, dtype=images.dtype)
+        return low + (high - low) * values
+
+
+class PixelSpaceAugmentation(BatchAugmentation):
+    """
+    Base class for augmentations defined on [0, 1] pixel values
+
+    Inputs are normalized with mean/std (the loaders' ImageNet statistics
+    by default). They are mapped back to [0, 1], changed there, saturated
+    as a real image would be, and normalized again. Pass mean=(0.0,),
+    std=(1.0,) for raw [0, 1] inputs.
+    """
+
+    def __init__(
+        self,
+        mean: Sequence[float] = IMAGENET_MEAN,
+        std: Sequence[float] = IMAGENET_STD,
+        seed: int = 0
+    ):
+        super().__init__(seed)
+        self.mean = tuple(mean)
+        self.std = tuple(std)
+
+    def _channel_stats(self, images: torch.Tensor):
+        """mean and std shaped (1, C, 1, 1) for broadcasting over a batch"""
+        c = images.shape[1]
+        mean = torch.tensor(self.mean, device=images.device, dtype=images.dtype)
+        std = torch.tensor(self.std, device=images.device, dtype=images.dtype)
+        if mean.numel() not in (1, c) or std.numel() not in (1, c):
+            raise ValueError(f"mean/std must have 1 or {c} values")
+        return mean.expand(c).view(1, c, 1, 1), std.expand(c).view(1, c, 1, 1)
+
+    def apply_pixels(self, pixels: torch.Tensor, generator: torch.Generator) -> torch.Tensor:
+        """
+        Apply augmentation to [0, 1] pixel values
+
+        Args:
+            pixels: Denormalized float tensor of shape (N, C, H, W)
+            generator: Random generator on the same device as pixels
+
+        Returns:
+            Augmented pixels; values outside [0, 1] are clamped afterwards
+        """
+        raise NotImplementedError
+
+    def apply(self, images, generator):
+        mean, std = self._channel_stats(images)
+        pixels = self.apply_pixels(images * std + mean, generator)
+        return (torch.clamp(pixels, 0.0, 1.0) - mean) / std
+
+
+class GaussianNoise(PixelSpaceAugmentation):
+    """
+    Additive Gaussian noise with std in [0, 1] pixel units
+
+    std is the noise level, so the normalization statistics are passed as
+    channel_mean/channel_std.
+    """
+
+    def __init__(
+        self,
+        std: float = 0.1,
+        channel_mean: Sequence[float] = IMAGENET_MEAN,
+        channel_std: Sequence[float] = IMAGENET_STD,
+        seed: int = 0
+    ):
+        super().__init__(mean=channel_mean, std=channel_std, seed=seed)
+        self.noise_std = std
+
+    def apply_pixels(self, pixels, generator):
+        noise = torch.randn(
+            pixels.shape, generator=generator, device=pixels.device, dtype=pixels.dtype
+        )
+        return pixels + noise * self.noise_std
+
+
+class GaussianBlur(BatchAugmentation):
+    """Gaussian blur as a separable depthwise convolution"""
+
+    def __init__(self, kernel_size: int = 5, sigma: float = 1.0, seed: int = 0):
+        super().__init__(seed)
+        if kernel_size % 2 == 0:
+            raise ValueError(f"kernel_size must be odd, got {kernel_size}")
+        self.kernel_size = kernel_size
+        self.sigma = sigma
+
+    def apply(self, images, generator):
+        channels = images.shape[1]
+        half = self.kernel_size // 2
+        coords = torch.arange(-half, half + 1, device=images.device, dtype=images.dtype)
+        kernel = torch.exp(-(coords ** 2) / (2 * self.sigma ** 2))
+        kernel = kernel / kernel.sum()
+
+        kernel_h = kernel.view(1, 1, 1, -1).repeat(channels, 1, 1, 1)
+        kernel_v = kernel.view(1, 1, -1, 1).repeat(channels, 1, 1, 1)
+
+        padded = F.pad(images, (half, half, half, half), mode='reflect')
+        blurred = F.conv2d(padded, kernel_h, groups=channels)
+        return F.conv2d(blurred, kernel_v, groups=channels)
+
+
+class Brightness(PixelSpaceAugmentation):
+    """Per-sample multiplicative brightness change on [0, 1] pixel values"""
+
+    def __init__(
+        self,
+        max_delta: float = 0.3,
+        mean: Sequence[float] = IMAGENET_MEAN,
+        std: Sequence[float] = IMAGENET_STD,
+        seed: int = 0
+    ):
+        super().__init__(mean=mean, std=std, seed=seed)
+        self.max_delta = max_delta
+
+    def apply_pixels(self, pixels, generator):
+        factors = self._uniform(
+            pixels.shape[0], 1.0 - self.max_delta, 1.0 + self.max_delta, pixels, generator
+        )
+        return pixels * factors.view(-1, 1, 1, 1)
+
+
+class Rotation(BatchAugmentation):
+    """Per-sample rotation via a single batched affine grid sample"""
+
+    def __init__(self, max_degrees: float = 15.0, seed: int = 0):
+        super().__init__(seed)
+        self.max_degrees = max_degrees
+
+    def apply(self, images, generator):
+        angles = self._uniform(
+            images.shape[0], -self.max_degrees, self.max_degrees, images, generator
+        ) * (math.pi / 180.0)
+        cos, sin = torch.cos(angles), torch.sin(angles)
+        zeros = torch.zeros_like(angles)
+
+        theta = torch.stack([
+            torch.stack([cos, -sin, zeros], dim=1),
+            torch.stack([sin, cos, zeros], dim=1)
+        ], dim=1)
+
+        grid = F.affine_grid(theta, list(images.shape), align_corners=False)
+        return F.grid_sample(images, grid, padding_mode='zeros', align_corners=False)
+
+
+# Standard JPEG luminance quantization table (ITU T.81, Annex K)
+_JPEG_LUMA_TABLE = [
+    [16, 11, 10, 16, 24, 40, 51, 61],
+    [12, 12, 14, 19, 26, 58, 60, 55],
+    [14, 13, 16, 24, 40, 57, 69, 56],
+    [14, 17, 22, 29, 51, 87, 80, 62],
+    [18, 22, 37, 56, 68, 109, 103, 77],
+    [24, 35, 55, 64, 81, 104, 113, 92],
+    [49, 64, 78, 87, 103, 121, 120, 101],
+    [72, 92, 95, 98, 112, 100, 103, 99],
+]
+
+
+class JPEGCompression(PixelSpaceAugmentation):
+    """
+    JPEG compression artifacts via blockwise 8x8 DCT quantization
+
+    Every channel is quantized with the scaled luminance table; chroma
+    subsampling and entropy coding are skipped since they do not change
+    the reconstructed pixels. Pixels are scaled to [0, 255] for the DCT
+    round-trip.
+    """
+
+    def __init__(
+        self,
+        quality: int = 50,
+        mean: Sequence[float] = IMAGENET_MEAN,
+        std: Sequence[float] = IMAGENET_STD,
+        seed: int = 0
+    ):
+        super().__init__(mean=mean, std=std, seed=seed)
+        if not 1 <= quality <= 100:
+            raise ValueError(f"quality must be in [1, 100], got {quality}")
+        self.quality = quality
+
+    def _quant_table(self, images: torch.Tensor) -> torch.Tensor:
+        scale = 5000 / self.quality if self.quality < 50 else 200 - 2 * self.quality
+        table = torch.tensor(_JPEG_LUMA_TABLE, device=images.device, dtype=images.dtype)
+        return torch.clamp(torch.floor((table * scale + 50) / 100), min=1)
+
+    @staticmethod
+    def _dct_matrix(images: torch.Tensor) -> torch.Tensor:
+        k = torch.arange(8, device=images.device, dtype=images.dtype)
+        matrix = torch.cos((2 * k.view(1, -1) + 1) * k.view(-1, 1) * math.pi / 16)
+        matrix[0] *= 1 / math.sqrt(2)
+        return matrix * 0.5
+
+    def apply_pixels(self, pixels, generator):
+        n, c, h, w = pixels.shape
+        pad_h, pad_w = (-h) % 8, (-w) % 8
+        shifted = F.pad(pixels * 255.0 - 128.0, (0, pad_w, 0, pad_h), mode='replicate')
+        hp, wp = h + pad_h, w + pad_w
+
+        # (N, C, H/8, 8, W/8, 8) -> (N, C, H/8, W/8, 8, 8)
+        blocks = shifted.view(n, c, hp // 8, 8, wp // 8, 8).permute(0, 1, 2, 4, 3, 5)
+
+        dct = self._dct_matrix(pixels)
+        table = self._quant_table(pixels)
+        coeffs = dct @ blocks @ dct.T
+        coeffs = torch.round(coeffs / table) * table
+        blocks = dct.T @ coeffs @ dct
+
+        shifted = blocks.permute(0, 1, 2, 4, 3, 5).reshape(n, c, hp, wp)[:, :, :h, :w]
+        return (shifted + 128.0) / 255.0
+
+
+BATCH_AUGMENTATIONS = {
+    'noise': GaussianNoise,
+    'blur': GaussianBlur,
+    'rotation': Rotation,
+    'brightness': Brightness,
+    'compression': JPEGCompression,
+}
+
+
+def get_batch_augmentations(
+    names: Optional[List[str]] = None,
+    seed: int = 0,
+    mean: Sequence[float] = IMAGENET_MEAN,
+    std: Sequence[float] = IMAGENET_STD
+) -> Dict[str, BatchAugmentation]:
+    """
+    Build batched augmentations by robustness metric name
+
+    Args:
+        names: Augmentation names (defaults to all of BATCH_AUGMENTATIONS)
+        seed: Seed shared by all returned augmentations
+        mean: Per-channel normalization mean of the loader's images
+        std: Per-channel normalization std of the loader's images
+
+    Returns:
+        Dict of augmentation name -> BatchAugmentation
+    """
+    names = names or list(BATCH_AUGMENTATIONS.keys())
+
+    unknown = [name for name in names if name not in BATCH_AUGMENTATIONS]
+    if unknown:
+        raise ValueError(f"Unknown augmentation(s): {', '.join(unknown)}")
+
+    augmentations = {}
+    for name in names:
+        augmentation_class = BATCH_AUGMENTATIONS[name]
+        if name == 'noise':
+            augmentations[name] = GaussianNoise(channel_mean=mean, channel_std=std, seed=seed)
+        elif issubclass(augmentation_class, PixelSpaceAugmentation):
+            augmentations[name] = augmentation_class(mean=mean, std=std, seed=seed)
+        else:
+            augmentations[name] = augmentation_class(seed=seed)
+    return augmentations
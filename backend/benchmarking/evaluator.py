@@ -9,13 +9,14 @@ from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     roc_auc_score, confusion_matrix, matthews_corrcoef
 )
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import time
-import psutil
 import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import uuid
+from .augmentations import BatchAugmentation, get_batch_augmentations
+from .memory_profiler import MemorySampler, torch_allocator_probe
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +66,8 @@ class ModelEvaluator:
         test_loader,
         dataset_name: str,
         model_name: str,
-        batch_sizes: List[int] = [1, 8, 32, 64]
+        batch_sizes: List[int] = [1, 8, 32, 64],
+        track_allocator: bool = False
     ) -> EvaluationResult:
         """
         Comprehensive evaluation of model on test set
@@ -75,6 +77,7 @@ class ModelEvaluator:
             dataset_name: Name of dataset
             model_name: Name of model
             batch_sizes: Batch sizes for throughput testing
+            track_allocator: Also sample torch's allocator during throughput passes
         
         Returns:
             EvaluationResult with all metrics
@@ -141,13 +144,12 @@ class ModelEvaluator:
         metrics['latency_mean'] = float(np.mean(latencies))
         metrics['latency_std'] = float(np.std(latencies))
         
-        # 3. Throughput Metrics
-        throughput_results = self._measure_throughput(test_loader, batch_sizes)
+        # 3. Throughput and Memory Metrics (sampled during the same passes)
+        throughput_results, memory_usage = self._measure_throughput(
+            test_loader, batch_sizes, track_allocator=track_allocator
+        )
         metrics.update(throughput_results)
         
-        # 4. Memory Metrics
-        memory_usage = self._measure_memory(test_loader)
-        
         # 5. Build predictions list for error analysis
         predictions = [
             {
@@ -175,11 +177,33 @@ class ModelEvaluator:
     def _measure_throughput(
         self,
         test_loader,
-        batch_sizes: List[int]
-    ) -> Dict[str, float]:
-        """Measure throughput at different batch sizes"""
+        batch_sizes: List[int],
+        sample_interval_ms: float = 10.0,
+        track_allocator: bool = False
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Measure throughput and memory usage at different batch sizes
+        
+        CPU memory is sampled on a background thread during the timed
+        forward passes, reporting peak, mean and delta from the
+        pre-inference baseline RSS; GPU peak allocation is read from
+        torch's allocator stats for the same passes. With track_allocator,
+        the device allocator is sampled alongside RSS where torch exposes
+        it (CUDA, MPS).
+        
+        Returns:
+            Tuple of (throughput metrics, memory usage)
+        """
         throughput = {}
+        memory_usage = {}
+        cpu_peak = 0.0
+        gpu_peak = 0.0
+        use_cuda = torch.cuda.is_available()
+        allocator = torch_allocator_probe(self.device) if track_allocator else None
+        if track_allocator and allocator is None:
+            logger.info(f"No allocator stats for device {self.device}; reporting RSS only")
         
+        self.model.eval()
         for batch_size in batch_sizes:
             # Create loader with specific batch size
             loader = torch.utils.data.DataLoader(
@@ -191,84 +215,102 @@ class ModelEvaluator:
             total_time = 0
             total_samples = 0
             
-            self.model.eval()
-            with torch.no_grad():
-                for images, _ in loader:
-                    images = images.to(self.device)
-                    
-                    start_time = time.time()
-                    _ = self.model(images)
-                    total_time += time.time() - start_time
-                    
-                    total_samples += images.size(0)
+            if use_cuda:
+                torch.cuda.reset_peak_memory_stats()
+            
+            with MemorySampler(interval_ms=sample_interval_ms, allocator=allocator) as sampler:
+                with torch.no_grad():
+                    for images, _ in loader:
+                        images = images.to(self.device)
+                        
+                        start_time = time.time()
+                        _ = self.model(images)
+                        total_time += time.time() - start_time
+                        
+                        total_samples += images.size(0)
             
             throughput[f'throughput_batch_{batch_size}'] = float(total_samples / total_time) if total_time > 0 else 0.0
-        
-        return throughput
-    
-    def _measure_memory(self, test_loader) -> Dict[str, float]:
-        """Measure CPU and GPU memory usage"""
-        memory_usage = {}
-        
-        # CPU memory
-        process = psutil.Process()
-        memory_usage['cpu_memory_mb'] = float(process.memory_info().rss / 1024 / 1024)
-        
-        # GPU memory (if available)
-        if torch.cuda.is_available():
-            torch.cuda.reset_peak_memory_stats()
             
-            self.model.eval()
-            with torch.no_grad():
-                for images, _ in test_loader:
-                    images = images.to(self.device)
-                    _ = self.model(images)
+            stats = sampler.summary()
+            memory_usage[f'cpu_memory_peak_mb_batch_{batch_size}'] = stats['peak_mb']
+            memory_usage[f'cpu_memory_mean_mb_batch_{batch_size}'] = stats['mean_mb']
+            memory_usage[f'cpu_memory_delta_mb_batch_{batch_size}'] = stats['delta_mb']
+            cpu_peak = max(cpu_peak, stats['peak_mb'])
+            if allocator is not None:
+                memory_usage[f'allocator_memory_peak_mb_batch_{batch_size}'] = stats['allocator_peak_mb']
+                memory_usage[f'allocator_memory_mean_mb_batch_{batch_size}'] = stats['allocator_mean_mb']
+                memory_usage[f'allocator_memory_delta_mb_batch_{batch_size}'] = stats['allocator_delta_mb']
             
-            memory_usage['gpu_memory_mb'] = float(torch.cuda.max_memory_allocated() / 1024 / 1024)
+            if use_cuda:
+                gpu_peak = max(gpu_peak, torch.cuda.max_memory_allocated() / 1024 / 1024)
+        
+        memory_usage['cpu_memory_mb'] = cpu_peak
+        if use_cuda:
+            memory_usage['gpu_memory_mb'] = float(gpu_peak)
         
-        return memory_usage
+        return throughput, memory_usage
     
     def evaluate_robustness(
         self,
         test_loader,
-        augmentations: Dict[str, callable]
+        augmentations: Optional[Dict[str, callable]] = None
     ) -> Dict[str, float]:
         """
         Evaluate model robustness to augmentations
         
         Args:
             test_loader: Test data loader
-            augmentations: Dict of augmentation name -> function
+            augmentations: Dict of augmentation name -> function. BatchAugmentation
+                instances are applied to whole batches on the device; any other
+                callable is applied per sample through AugmentedDataset.
+                Defaults to every batched augmentation from get_batch_augmentations.
         
         Returns:
             Dict of robustness metrics
         """
+        if augmentations is None:
+            augmentations = get_batch_augmentations()
+        
         robustness_metrics = {}
         
         # Baseline accuracy
         baseline_acc = self._get_accuracy(test_loader)
         
         for aug_name, aug_func in augmentations.items():
-            # Apply augmentation to test set
-            augmented_loader = self._apply_augmentation(test_loader, aug_func)
-            
-            # Evaluate on augmented data
-            aug_acc = self._get_accuracy(augmented_loader)
+            if isinstance(aug_func, BatchAugmentation):
+                # Corrupt each batch after it reaches the device
+                aug_acc = self._get_accuracy(test_loader, batch_augmentation=aug_func)
+            else:
+                # Apply augmentation to test set
+                augmented_loader = self._apply_augmentation(test_loader, aug_func)
+                
+                # Evaluate on augmented data
+                aug_acc = self._get_accuracy(augmented_loader)
             
             # Compute robustness metric (accuracy drop)
             robustness_metrics[f'robustness_{aug_name}'] = float(baseline_acc - aug_acc)
         
         return robustness_metrics
     
-    def _get_accuracy(self, test_loader) -> float:
-        """Get accuracy on test loader"""
+    def _get_accuracy(
+        self,
+        test_loader,
+        batch_augmentation: BatchAugmentation = None
+    ) -> float:
+        """Get accuracy on test loader, optionally augmenting each batch"""
         all_preds = []
         all_labels = []
         
+        generator = None
+        if batch_augmentation is not None:
+            generator = batch_augmentation.make_generator(self.device)
+        
         self.model.eval()
         with torch.no_grad():
             for images, labels in test_loader:
                 images = images.to(self.device)
+                if batch_augmentation is not None:
+                    images = batch_augmentation(images, generator)
                 outputs = self.model(images)
                 _, preds = torch.max(outputs, 1)
                 
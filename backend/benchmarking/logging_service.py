@@ -5,31 +5,161 @@ Log and query benchmark runs and metrics
 
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 import uuid
 import logging
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Known metrics and their units
+METRIC_UNITS = {
+    'accuracy': '%',
+    'precision': '%',
+    'recall': '%',
+    'f1': '%',
+    'auroc': '%',
+    'mcc': '',
+    'calibration_error': '',
+    'latency_p50': 'ms',
+    'latency_p95': 'ms',
+    'latency_p99': 'ms',
+    'latency_mean': 'ms',
+    'latency_std': 'ms',
+    'throughput_batch_1': 'img/s',
+    'throughput_batch_8': 'img/s',
+    'throughput_batch_32': 'img/s',
+    'throughput_batch_64': 'img/s',
+    'cpu_memory_mb': 'MB',
+    'gpu_memory_mb': 'MB',
+    'robustness_noise': '',
+    'robustness_blur': '',
+    'robustness_rotation': '',
+    'robustness_brightness': '',
+    'robustness_compression': '',
+}
+
+# Column order and types of streamed exports (see iter_export_rows)
+EXPORT_COLUMNS = {
+    'metrics': [
+        'run_id', 'model_name', 'model_version', 'dataset_name', 'experiment_id',
+        'timestamp', 'metric_name', 'metric_value', 'metric_unit'
+    ],
+    'predictions': [
+        'run_id', 'model_name', 'dataset_name', 'sample_id',
+        'true_label', 'predicted_label', 'confidence', 'latency_ms'
+    ],
+}
+EXPORT_TYPES = {
+    'metrics': {'metric_value': 'float'},
+    'predictions': {'confidence': 'float', 'latency_ms': 'float'},
+}
+
 
 class BenchmarkLogger:
     """Log and query benchmark runs"""
     
-    def __init__(self, database_path: str = 'arogya_benchmarks.db'):
+    def __init__(
+        self,
+        database_path: str = 'arogya_benchmarks.db',
+        cache_size_kb: int = 16384,
+        busy_timeout_ms: int = 5000
+    ):
         """
         Initialize benchmark logger
         
+        Connections are opened lazily, one per thread, and reused for the
+        lifetime of the logger. The schema is created on first use rather
+        than at construction.
+        
         Args:
             database_path: Path to SQLite database
+            cache_size_kb: SQLite page cache size per connection in KiB
+            busy_timeout_ms: How long a writer waits on a locked database
         """
         self.database_path = database_path
-        self._init_database()
+        self.cache_size_kb = cache_size_kb
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self._run_count = None  # (count, MAX(rowid) it was counted at)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        # Each connection is only used by its own thread; check_same_thread is
+        # relaxed so close() can release connections opened by other threads
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+            if not self._schema_ready:
+                self._init_database(conn)
+                self._schema_ready = True
+        
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """Yield a cursor inside a transaction, committing on success"""
+        conn = self._connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    
+    def _total_run_count(self, cursor: sqlite3.Cursor) -> int:
+        """
+        Total number of runs, recounted only when the runs table has changed
+        
+        Runs are never deleted, and every insert (from any process or
+        logger) takes a new rowid, so MAX(rowid) - a single b-tree seek -
+        tells whether the cached count is still current.
+        """
+        cursor.execute('SELECT MAX(rowid) as last FROM runs')
+        last = cursor.fetchone()['last']
+        with self._lock:
+            if self._run_count is not None and self._run_count[1] == last:
+                return self._run_count[0]
+        
+        cursor.execute('SELECT COUNT(*) as count FROM runs')
+        count = cursor.fetchone()['count']
+        with self._lock:
+            self._run_count = (count, last)
+        return count
     
-    def _init_database(self):
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+    
+    def _init_database(self, conn: sqlite3.Connection):
         """Initialize database schema"""
-        conn = sqlite3.connect(self.database_path)
         cursor = conn.cursor()
         
         # Runs table
@@ -84,17 +214,82 @@ class BenchmarkLogger:
             )
         ''')
         
+        # Per-run wide table from earlier schemas; superseded by the rollups
+        cursor.execute('DROP TABLE IF EXISTS run_metrics')
+        
+        # Rollup tables: running aggregates per (model, dataset[, metric])
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'metric_rollups'")
+        rollups_exist = cursor.fetchone() is not None
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS metric_rollups (
+                model_name TEXT NOT NULL,
+                dataset_name TEXT NOT NULL,
+                metric_name TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                sum REAL NOT NULL,
+                sum_sq REAL NOT NULL,
+                min REAL,
+                max REAL,
+                PRIMARY KEY (model_name, dataset_name, metric_name)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_rollups (
+                model_name TEXT NOT NULL,
+                dataset_name TEXT NOT NULL,
+                num_runs INTEGER NOT NULL,
+                PRIMARY KEY (model_name, dataset_name)
+            )
+        ''')
+        
+        if not rollups_exist:
+            self._rebuild_rollups(cursor)
+        
         # Create indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_runs_model ON runs(model_name)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_runs_dataset ON runs(dataset_name)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs(timestamp)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_run ON metrics(run_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics(metric_name)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_predictions_run ON predictions(run_id)')
         
         conn.commit()
-        conn.close()
         
         logger.info(f"Database initialized: {self.database_path}")
     
+    def _rebuild_rollups(self, cursor: sqlite3.Cursor):
+        """Recompute rollup tables from raw runs and metrics"""
+        cursor.execute('DELETE FROM metric_rollups')
+        cursor.execute('''
+            INSERT INTO metric_rollups (
+                model_name, dataset_name, metric_name, count, sum, sum_sq, min, max
+            )
+            SELECT r.model_name, r.dataset_name, m.metric_name,
+                   COUNT(m.metric_value), SUM(m.metric_value),
+                   SUM(m.metric_value * m.metric_value),
+                   MIN(m.metric_value), MAX(m.metric_value)
+            FROM runs r
+            JOIN metrics m ON r.run_id = m.run_id
+            WHERE m.metric_value IS NOT NULL
+            GROUP BY r.model_name, r.dataset_name, m.metric_name
+        ''')
+        
+        cursor.execute('DELETE FROM run_rollups')
+        cursor.execute('''
+            INSERT INTO run_rollups (model_name, dataset_name, num_runs)
+            SELECT model_name, dataset_name, COUNT(*)
+            FROM runs
+            GROUP BY model_name, dataset_name
+        ''')
+    
+    def rebuild_rollups(self):
+        """Rebuild rollup tables from raw data (admin operation)"""
+        with self._transaction() as cursor:
+            self._rebuild_rollups(cursor)
+        logger.info("Rebuilt metric rollups")
+    
     def log_run(
         self,
         model_name: str,
@@ -128,59 +323,145 @@ class BenchmarkLogger:
         Returns:
             run_id
         """
-        run_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.database_path)
-        cursor = conn.cursor()
+        run = {
+            'model_name': model_name,
+            'dataset_name': dataset_name,
+            'metrics': metrics,
+            'duration_seconds': duration_seconds,
+            'hyperparameters': hyperparameters,
+            'model_version': model_version,
+            'framework': framework,
+            'status': status,
+            'error_message': error_message,
+            'experiment_id': experiment_id,
+            'notes': notes
+        }
         
         try:
-            # Insert run
-            cursor.execute('''
-                INSERT INTO runs (
-                    run_id, model_name, model_version, framework,
-                    dataset_name, num_samples, timestamp, duration_seconds,
-                    status, error_message, hyperparameters, experiment_id, notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                run_id, model_name, model_version, framework,
-                dataset_name, metrics.get('num_samples', 0),
-                datetime.utcnow().isoformat(), duration_seconds,
-                status, error_message,
+            with self._transaction() as cursor:
+                run_id = self._insert_runs(cursor, [run])[0]
+            logger.info(f"Logged run {run_id} for {model_name} on {dataset_name}")
+            
+        except Exception as e:
+            logger.error(f"Error logging run: {e}")
+            raise
+        
+        return run_id
+    
+    def log_runs_bulk(self, runs: List[Dict]) -> List[str]:
+        """
+        Log many benchmark runs in a single transaction
+        
+        Intended for backfilling historical results. Either every run is
+        written or none are.
+        
+        Args:
+            runs: List of dicts with the same keys as log_run arguments.
+                Each may also carry 'run_id' and an ISO 'timestamp' to
+                preserve identifiers and times from the original results.
+        
+        Returns:
+            List of run_ids in input order
+        """
+        try:
+            with self._transaction() as cursor:
+                run_ids = self._insert_runs(cursor, runs)
+            logger.info(f"Bulk logged {len(run_ids)} runs")
+            
+        except Exception as e:
+            logger.error(f"Error bulk logging runs: {e}")
+            raise
+        
+        return run_ids
+    
+    def _insert_runs(self, cursor: sqlite3.Cursor, runs: List[Dict]) -> List[str]:
+        """Insert runs and their metrics with one executemany per table"""
+        now = datetime.utcnow().isoformat()
+        run_rows = []
+        metric_rows = []
+        run_ids = []
+        metric_deltas = {}
+        run_deltas = {}
+        
+        for run in runs:
+            run_id = run.get('run_id') or str(uuid.uuid4())
+            timestamp = run.get('timestamp') or now
+            metrics = run['metrics']
+            hyperparameters = run.get('hyperparameters')
+            
+            run_rows.append((
+                run_id, run['model_name'], run.get('model_version'), run.get('framework'),
+                run['dataset_name'], metrics.get('num_samples', 0),
+                timestamp, run['duration_seconds'],
+                run.get('status', 'success'), run.get('error_message'),
                 json.dumps(hyperparameters) if hyperparameters else None,
-                experiment_id, notes
+                run.get('experiment_id'), run.get('notes')
             ))
             
-            # Insert metrics
+            run_key = (run['model_name'], run['dataset_name'])
+            run_deltas[run_key] = run_deltas.get(run_key, 0) + 1
+            
             for metric_name, metric_value in metrics.items():
                 if isinstance(metric_value, (int, float)):
-                    metric_id = str(uuid.uuid4())
-                    metric_unit = self._get_metric_unit(metric_name)
-                    
-                    cursor.execute('''
-                        INSERT INTO metrics (
-                            metric_id, run_id, metric_name, metric_value, metric_unit, timestamp
-                        ) VALUES (?, ?, ?, ?, ?, ?)
-                    ''', (
-                        metric_id, run_id, metric_name, float(metric_value),
-                        metric_unit, datetime.utcnow().isoformat()
+                    value = float(metric_value)
+                    metric_rows.append((
+                        str(uuid.uuid4()), run_id, metric_name, value,
+                        self._get_metric_unit(metric_name), timestamp
                     ))
+                    
+                    key = run_key + (metric_name,)
+                    delta = metric_deltas.get(key)
+                    if delta is None:
+                        metric_deltas[key] = [1, value, value * value, value, value]
+                    else:
+                        delta[0] += 1
+                        delta[1] += value
+                        delta[2] += value * value
+                        delta[3] = min(delta[3], value)
+                        delta[4] = max(delta[4], value)
             
-            conn.commit()
-            logger.info(f"Logged run {run_id} for {model_name} on {dataset_name}")
-            
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Error logging run: {e}")
-            raise
-        finally:
-            conn.close()
+            run_ids.append(run_id)
         
-        return run_id
+        # Insert runs
+        cursor.executemany('''
+            INSERT INTO runs (
+                run_id, model_name, model_version, framework,
+                dataset_name, num_samples, timestamp, duration_seconds,
+                status, error_message, hyperparameters, experiment_id, notes
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', run_rows)
+        
+        # Insert metrics
+        cursor.executemany('''
+            INSERT INTO metrics (
+                metric_id, run_id, metric_name, metric_value, metric_unit, timestamp
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        ''', metric_rows)
+        
+        # Fold this batch into the rollups
+        cursor.executemany('''
+            INSERT INTO metric_rollups (
+                model_name, dataset_name, metric_name, count, sum, sum_sq, min, max
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (model_name, dataset_name, metric_name) DO UPDATE SET
+                count = count + excluded.count,
+                sum = sum + excluded.sum,
+                sum_sq = sum_sq + excluded.sum_sq,
+                min = MIN(min, excluded.min),
+                max = MAX(max, excluded.max)
+        ''', [key + tuple(delta) for key, delta in metric_deltas.items()])
+        
+        cursor.executemany('''
+            INSERT INTO run_rollups (model_name, dataset_name, num_runs) VALUES (?, ?, ?)
+            ON CONFLICT (model_name, dataset_name) DO UPDATE SET
+                num_runs = num_runs + excluded.num_runs
+        ''', [key + (count,) for key, count in run_deltas.items()])
+        
+        return run_ids
     
     def get_run(self, run_id: str) -> Optional[Dict]:
         """Get run details"""
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
         try:
             cursor.execute('SELECT * FROM runs WHERE run_id = ?', (run_id,))
@@ -204,7 +485,7 @@ class BenchmarkLogger:
                 'notes': run['notes']
             }
         finally:
-            conn.close()
+            cursor.close()
     
     def query_metrics(
         self,
@@ -214,9 +495,7 @@ class BenchmarkLogger:
         limit: int = 1000
     ) -> List[Dict]:
         """Query metrics with filters"""
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
         try:
             query = '''
@@ -260,7 +539,214 @@ class BenchmarkLogger:
                 for row in results
             ]
         finally:
-            conn.close()
+            cursor.close()
+    
+    def get_metric_series(
+        self,
+        model_names: List[str] = None,
+        dataset_names: List[str] = None,
+        metric_names: List[str] = None
+    ) -> Dict[str, Dict[str, List[float]]]:
+        """
+        Fetch raw metric values for many (model, metric) pairs in one query
+        
+        Values are ordered by run timestamp so each series is stable
+        between calls.
+        
+        Args:
+            model_names: Models to include (all if None)
+            dataset_names: Datasets to include (all if None)
+            metric_names: Metrics to include (all if None)
+        
+        Returns:
+            Dict of model_name -> metric_name -> list of values
+        """
+        query = '''
+            SELECT r.model_name, m.metric_name, m.metric_value
+            FROM runs r
+            JOIN metrics m ON r.run_id = m.run_id
+            WHERE m.metric_value IS NOT NULL
+        '''
+        params = []
+        
+        if model_names:
+            placeholders = ','.join('?' * len(model_names))
+            query += f' AND r.model_name IN ({placeholders})'
+            params.extend(model_names)
+        
+        if dataset_names:
+            placeholders = ','.join('?' * len(dataset_names))
+            query += f' AND r.dataset_name IN ({placeholders})'
+            params.extend(dataset_names)
+        
+        if metric_names:
+            placeholders = ','.join('?' * len(metric_names))
+            query += f' AND m.metric_name IN ({placeholders})'
+            params.extend(metric_names)
+        
+        query += ' ORDER BY r.timestamp, r.run_id'
+        
+        cursor = self._connection().cursor()
+        
+        try:
+            cursor.execute(query, params)
+            
+            series = {}
+            for row in cursor:
+                series.setdefault(row['model_name'], {}).setdefault(
+                    row['metric_name'], []
+                ).append(row['metric_value'])
+            
+            return series
+        finally:
+            cursor.close()
+    
+    def get_aligned_metric_values(
+        self,
+        model_names: List[str],
+        dataset_names: List[str],
+        metric_name: str,
+        align_by: str = 'experiment_id'
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Fetch one metric per model keyed by a run key shared across models
+        
+        Runs without the key are skipped. If a model has several runs with
+        the same key, their values are averaged.
+        
+        Args:
+            model_names: Models to include
+            dataset_names: Datasets to include (all if None)
+            metric_name: Metric to fetch
+            align_by: 'experiment_id' or 'seed' (read from hyperparameters)
+        
+        Returns:
+            Dict of model_name -> key -> value
+        """
+        key_expressions = {
+            'experiment_id': 'r.experiment_id',
+            'seed': "json_extract(r.hyperparameters, '$.seed')",
+        }
+        if align_by not in key_expressions:
+            raise ValueError(f"Unknown align_by: {align_by}")
+        key_expr = key_expressions[align_by]
+        
+        placeholders = ','.join('?' * len(model_names))
+        query = f'''
+            SELECT r.model_name, CAST({key_expr} AS TEXT) AS align_key,
+                   AVG(m.metric_value) AS metric_value
+            FROM runs r
+            JOIN metrics m ON r.run_id = m.run_id
+            WHERE m.metric_name = ?
+              AND r.model_name IN ({placeholders})
+              AND {key_expr} IS NOT NULL
+              AND m.metric_value IS NOT NULL
+        '''
+        params = [metric_name] + list(model_names)
+        
+        if dataset_names:
+            placeholders = ','.join('?' * len(dataset_names))
+            query += f' AND r.dataset_name IN ({placeholders})'
+            params.extend(dataset_names)
+        
+        query += ' GROUP BY r.model_name, align_key'
+        
+        cursor = self._connection().cursor()
+        
+        try:
+            cursor.execute(query, params)
+            
+            values = {}
+            for row in cursor.fetchall():
+                values.setdefault(row['model_name'], {})[row['align_key']] = row['metric_value']
+            
+            return values
+        finally:
+            cursor.close()
+    
+    def summarize_metrics(
+        self,
+        model_names: List[str] = None,
+        dataset_names: List[str] = None,
+        metric_names: List[str] = None
+    ) -> Dict[str, Dict]:
+        """
+        Per-model, per-metric statistics read from the rollup tables
+        
+        Each (model, dataset, metric) cell holds running count, sum, sum of
+        squares, min and max, so the cost is proportional to the number of
+        cells rather than the number of logged runs.
+        
+        Args:
+            model_names: Models to include (all if None)
+            dataset_names: Datasets to include (all if None)
+            metric_names: Metrics to include (all if None)
+        
+        Returns:
+            Dict of model_name -> {'num_runs': int, 'metrics': {metric_name -> stats}}
+            where stats has count, mean, std, min, max and sum_sq
+        """
+        filters = ''
+        params = []
+        
+        if model_names:
+            placeholders = ','.join('?' * len(model_names))
+            filters += f' AND model_name IN ({placeholders})'
+            params.extend(model_names)
+        
+        if dataset_names:
+            placeholders = ','.join('?' * len(dataset_names))
+            filters += f' AND dataset_name IN ({placeholders})'
+            params.extend(dataset_names)
+        
+        metric_filter = ''
+        metric_params = []
+        if metric_names:
+            placeholders = ','.join('?' * len(metric_names))
+            metric_filter = f' AND metric_name IN ({placeholders})'
+            metric_params.extend(metric_names)
+        
+        cursor = self._connection().cursor()
+        
+        try:
+            summary = {}
+            
+            cursor.execute(f'''
+                SELECT model_name, SUM(num_runs) AS num_runs
+                FROM run_rollups
+                WHERE 1=1{filters}
+                GROUP BY model_name
+            ''', params)
+            for row in cursor.fetchall():
+                summary[row['model_name']] = {'num_runs': row['num_runs'], 'metrics': {}}
+            
+            cursor.execute(f'''
+                SELECT model_name, metric_name,
+                       SUM(count) AS count, SUM(sum) AS sum, SUM(sum_sq) AS sum_sq,
+                       MIN(min) AS min, MAX(max) AS max
+                FROM metric_rollups
+                WHERE 1=1{filters}{metric_filter}
+                GROUP BY model_name, metric_name
+            ''', params + metric_params)
+            for row in cursor.fetchall():
+                count = row['count']
+                if not count:
+                    continue
+                mean = row['sum'] / count
+                variance = max(row['sum_sq'] / count - mean * mean, 0.0)
+                summary.setdefault(row['model_name'], {'num_runs': 0, 'metrics': {}})
+                summary[row['model_name']]['metrics'][row['metric_name']] = {
+                    'count': count,
+                    'mean': float(mean),
+                    'std': float(variance ** 0.5),
+                    'min': float(row['min']),
+                    'max': float(row['max']),
+                    'sum_sq': float(row['sum_sq'])
+                }
+            
+            return summary
+        finally:
+            cursor.close()
     
     def list_runs(
         self,
@@ -270,62 +756,61 @@ class BenchmarkLogger:
         offset: int = 0
     ) -> Dict:
         """List runs with pagination"""
-        conn = sqlite3.connect(self.database_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         
         try:
-            # Get total count
-            count_query = 'SELECT COUNT(*) as count FROM runs WHERE 1=1'
-            count_params = []
+            filters = ''
+            filter_params = []
             
             if model_name:
-                count_query += ' AND model_name = ?'
-                count_params.append(model_name)
+                filters += ' AND model_name = ?'
+                filter_params.append(model_name)
             
             if dataset_name:
-                count_query += ' AND dataset_name = ?'
-                count_params.append(dataset_name)
+                filters += ' AND dataset_name = ?'
+                filter_params.append(dataset_name)
             
-            cursor.execute(count_query, count_params)
-            total = cursor.fetchone()['count']
+            # Get total count (unfiltered count is cached until the table changes)
+            if filter_params:
+                cursor.execute(f'SELECT COUNT(*) as count FROM runs WHERE 1=1{filters}', filter_params)
+                total = cursor.fetchone()['count']
+            else:
+                total = self._total_run_count(cursor)
             
             # Get paginated results
-            query = 'SELECT * FROM runs WHERE 1=1'
-            params = []
-            
-            if model_name:
-                query += ' AND model_name = ?'
-                params.append(model_name)
-            
-            if dataset_name:
-                query += ' AND dataset_name = ?'
-                params.append(dataset_name)
-            
-            query += ' ORDER BY timestamp DESC LIMIT ? OFFSET ?'
-            params.extend([limit, offset])
-            
-            cursor.execute(query, params)
+            cursor.execute(
+                f'SELECT * FROM runs WHERE 1=1{filters} ORDER BY timestamp DESC, run_id LIMIT ? OFFSET ?',
+                filter_params + [limit, offset]
+            )
             runs = cursor.fetchall()
             
-            # Get metrics for each run
-            run_list = []
-            for run in runs:
-                cursor.execute(
-                    'SELECT metric_name, metric_value FROM metrics WHERE run_id = ?',
-                    (run['run_id'],)
-                )
-                metrics = {row['metric_name']: row['metric_value'] for row in cursor.fetchall()}
-                
-                run_list.append({
+            # Get metrics for exactly the runs on this page, bound by id so a
+            # concurrent insert can't shift the page between the two queries.
+            # Chunked to stay under SQLite's bound-variable limit.
+            run_ids = [run['run_id'] for run in runs]
+            metrics_by_run = {}
+            for start in range(0, len(run_ids), 500):
+                chunk = run_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    SELECT run_id, metric_name, metric_value FROM metrics
+                    WHERE run_id IN ({placeholders})
+                ''', chunk)
+                for row in cursor.fetchall():
+                    metrics_by_run.setdefault(row['run_id'], {})[row['metric_name']] = row['metric_value']
+            
+            run_list = [
+                {
                     'run_id': run['run_id'],
                     'model_name': run['model_name'],
                     'dataset_name': run['dataset_name'],
                     'timestamp': run['timestamp'],
                     'duration_seconds': run['duration_seconds'],
                     'status': run['status'],
-                    'metrics': metrics
-                })
+                    'metrics': metrics_by_run.get(run['run_id'], {})
+                }
+                for run in runs
+            ]
             
             return {
                 'total': total,
@@ -333,28 +818,81 @@ class BenchmarkLogger:
                 'offset': offset,
                 'runs': run_list
             }
+        finally:
+            cursor.close()
+    
+    def iter_export_rows(
+        self,
+        include: str = 'metrics',
+        model_names: List[str] = None,
+        dataset_names: List[str] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[List[tuple]]:
+        """
+        Yield export rows in chunks straight from a SQLite cursor
+        
+        Uses a dedicated connection for the lifetime of the iterator so a
+        long export can be consumed from any thread without holding the
+        pooled connections. Under WAL it does not block run logging.
+        
+        Args:
+            include: 'metrics' (one row per run metric) or 'predictions'
+            model_names: Models to include (all if None)
+            dataset_names: Datasets to include (all if None)
+            chunk_size: Rows per yielded chunk
+        
+        Yields:
+            Lists of row tuples in EXPORT_COLUMNS[include] order
+        """
+        if include not in EXPORT_COLUMNS:
+            raise ValueError(f"Unknown export: {include}")
+        
+        self._connection()  # Ensure schema exists
+        
+        if include == 'metrics':
+            query = '''
+                SELECT r.run_id, r.model_name, r.model_version, r.dataset_name,
+                       r.experiment_id, r.timestamp, m.metric_name, m.metric_value, m.metric_unit
+                FROM runs r
+                JOIN metrics m ON r.run_id = m.run_id
+                WHERE 1=1
+            '''
+        else:
+            query = '''
+                SELECT r.run_id, r.model_name, r.dataset_name, p.sample_id,
+                       p.true_label, p.predicted_label, p.confidence, p.latency_ms
+                FROM runs r
+                JOIN predictions p ON r.run_id = p.run_id
+                WHERE 1=1
+            '''
+        params = []
+        
+        if model_names:
+            placeholders = ','.join('?' * len(model_names))
+            query += f' AND r.model_name IN ({placeholders})'
+            params.extend(model_names)
+        
+        if dataset_names:
+            placeholders = ','.join('?' * len(dataset_names))
+            query += f' AND r.dataset_name IN ({placeholders})'
+            params.extend(dataset_names)
+        
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False
+        )
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
         finally:
             conn.close()
     
     @staticmethod
     def _get_metric_unit(metric_name: str) -> str:
         """Get unit for metric"""
-        units = {
-            'accuracy': '%',
-            'precision': '%',
-            'recall': '%',
-            'f1': '%',
-            'auroc': '%',
-            'latency_p50': 'ms',
-            'latency_p95': 'ms',
-            'latency_p99': 'ms',
-            'latency_mean': 'ms',
-            'latency_std': 'ms',
-            'throughput_batch_1': 'img/s',
-            'throughput_batch_8': 'img/s',
-            'throughput_batch_32': 'img/s',
-            'throughput_batch_64': 'img/s',
-            'cpu_memory_mb': 'MB',
-            'gpu_memory_mb': 'MB',
-        }
-        return units.get(metric_name, '')
+        return METRIC_UNITS.get(metric_name, '')
@@ -0,0 +1,165 @@
+"""
+Memory Profiler for Benchmarking
+Background RSS sampling to capture peak memory during inference
+"""
+
+import threading
+import time
+import psutil
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_MB = 1024 * 1024
+
+
+def torch_allocator_probe(device) -> Optional[Callable[[], int]]:
+    """
+    Callable returning bytes currently held by torch's allocator on device
+
+    CUDA and MPS expose their caching allocators' counters. The default CPU
+    allocator keeps no public statistics, so CPU devices return None and
+    RSS remains the CPU measure.
+
+    Args:
+        device: torch.device or device string
+
+    Returns:
+        Zero-argument callable, or None if the device has no allocator stats
+    """
+    try:
+        import torch
+    except ImportError:
+        return None
+
+    device = torch.device(device)
+    if device.type == 'cuda' and torch.cuda.is_available():
+        return lambda: torch.cuda.memory_allocated(device)
+    if device.type == 'mps' and hasattr(torch, 'mps'):
+        return torch.mps.current_allocated_memory
+    return None
+
+
+class MemorySampler:
+    """
+    Poll process RSS on a background thread while a block of code runs
+
+    Forward passes release the GIL inside torch kernels, so the sampler
+    thread keeps polling during inference and catches transient spikes
+    that a single RSS read after evaluation would miss. Only a running
+    peak, sum and count are kept, so long runs use constant memory.
+
+    An allocator probe (see torch_allocator_probe) is polled alongside RSS
+    when given, and reported under allocator_* keys.
+
+    Usage:
+        with MemorySampler(interval_ms=10.0) as sampler:
+            model(images)
+        stats = sampler.summary()
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = 10.0,
+        process: Optional[psutil.Process] = None,
+        allocator: Optional[Callable[[], int]] = None
+    ):
+        """
+        Initialize sampler
+
+        Args:
+            interval_ms: Polling interval in milliseconds
+            process: Process to sample (defaults to the current process)
+            allocator: Optional callable returning allocator bytes in use
+        """
+        self.interval = interval_ms / 1000.0
+        self.process = process or psutil.Process()
+        self.allocator = allocator
+        self.baseline_bytes = 0
+        self.peak_bytes = 0
+        self.total_bytes = 0
+        self.num_samples = 0
+        self.allocator_baseline_bytes = 0
+        self.allocator_peak_bytes = 0
+        self.allocator_total_bytes = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _rss(self) -> int:
+        return self.process.memory_info().rss
+
+    def _sample(self):
+        allocated = self.allocator() if self.allocator is not None else 0
+        self._record(self._rss(), allocated)
+        return allocated
+
+    def _record(self, rss: int, allocated: int = 0):
+        self.peak_bytes = max(self.peak_bytes, rss)
+        self.total_bytes += rss
+        self.allocator_peak_bytes = max(self.allocator_peak_bytes, allocated)
+        self.allocator_total_bytes += allocated
+        self.num_samples += 1
+
+    def _poll(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Record baseline and start polling"""
+        self.peak_bytes = 0
+        self.total_bytes = 0
+        self.num_samples = 0
+        self.allocator_peak_bytes = 0
+        self.allocator_total_bytes = 0
+        self._stop_event.clear()
+        self.baseline_bytes = self._rss()
+        self.allocator_baseline_bytes = self.allocator() if self.allocator is not None else 0
+        self._record(self.baseline_bytes, self.allocator_baseline_bytes)
+
+        self._thread = threading.Thread(target=self._poll, name='memory-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and take a final sample"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sample()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize collected samples
+
+        Returns:
+            Dict with peak, mean, baseline and delta-from-baseline in MB,
+            plus the number of samples taken; the same four figures with an
+            allocator_ prefix when an allocator probe is set
+        """
+        summary = self._stats(self.peak_bytes, self.total_bytes, self.baseline_bytes)
+        summary['num_samples'] = self.num_samples
+        if self.allocator is not None:
+            allocator = self._stats(
+                self.allocator_peak_bytes, self.allocator_total_bytes, self.allocator_baseline_bytes
+            )
+            summary.update({f'allocator_{key}': value for key, value in allocator.items()})
+        return summary
+
+    def _stats(self, peak: int, total: int, baseline: int) -> Dict[str, float]:
+        if not self.num_samples:
+            return {'peak_mb': 0.0, 'mean_mb': 0.0, 'baseline_mb': 0.0, 'delta_mb': 0.0}
+        return {
+            'peak_mb': float(peak / BYTES_PER_MB),
+            'mean_mb': float(total / self.num_samples / BYTES_PER_MB),
+            'baseline_mb': float(baseline / BYTES_PER_MB),
+            'delta_mb': float((peak - baseline) / BYTES_PER_MB)
+        }
@@ -5,11 +5,14 @@ Statistical tests and confidence intervals
 
 import numpy as np
 from scipy import stats
-from typing import Tuple, Dict
+from typing import Callable, Tuple, Dict, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on elements in one resampling buffer (~32 MB of float64)
+RESAMPLE_BUFFER_ELEMENTS = 1 << 22
+
 
 class StatisticsService:
     """Perform statistical tests on benchmark results"""
@@ -72,10 +75,128 @@ class StatisticsService:
             'sample_size': len(diff)
         }
     
+    @staticmethod
+    def build_aligned_matrix(
+        values_by_model: Dict[str, Dict[str, float]],
+        model_names: List[str]
+    ) -> Tuple[np.ndarray, List[str]]:
+        """
+        Build a models x runs matrix aligned by a shared run key
+        
+        Args:
+            values_by_model: Dict of model_name -> alignment key -> value
+            model_names: Row order of the matrix
+        
+        Returns:
+            Tuple of (matrix, keys). Cells a model has no run for are NaN.
+        """
+        keys = sorted({key for model in model_names for key in values_by_model.get(model, {})})
+        key_index = {key: col for col, key in enumerate(keys)}
+        
+        matrix = np.full((len(model_names), len(keys)), np.nan)
+        for row, model in enumerate(model_names):
+            for key, value in values_by_model.get(model, {}).items():
+                matrix[row, key_index[key]] = value
+        
+        return matrix, keys
+    
+    @staticmethod
+    def all_pairs_paired_tests(
+        scores: np.ndarray,
+        model_names: List[str],
+        alpha: float = 0.05,
+        confidence: float = 0.95,
+        correction: str = 'benjamini_hochberg'
+    ) -> List[Dict]:
+        """
+        Paired t-tests for every model pair on a run-aligned score matrix
+        
+        Column j of scores holds every model's score on the same run key
+        (experiment or seed). Each pair is tested on the columns where both
+        models have a score; all pairs are computed at once.
+        
+        Args:
+            scores: Array of shape (n_models, n_runs), NaN where missing
+            model_names: Model name for each row
+            alpha: Significance level, applied to corrected p-values
+            confidence: Confidence level for the mean-difference interval
+            correction: Method passed to multiple_comparisons_correction
+        
+        Returns:
+            List of dicts, one per pair (model_a, model_b) with i < j. Pairs
+            with fewer than two aligned runs or a constant difference have no
+            t-test: testable is False, the test fields are None, and they are
+            left out of the multiple-comparisons correction (confidence_interval
+            is None too)
+        """
+        scores = np.asarray(scores, dtype=float)
+        idx_a, idx_b = np.triu_indices(scores.shape[0], k=1)
+        if len(idx_a) == 0:
+            return []
+        
+        diff = scores[idx_a] - scores[idx_b]  # (n_pairs, n_runs)
+        valid = ~np.isnan(diff)
+        n = valid.sum(axis=1)
+        diff = np.where(valid, diff, 0.0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_diff = diff.sum(axis=1) / n
+            centered = np.where(valid, diff - mean_diff[:, None], 0.0)
+            std_diff = np.sqrt((centered ** 2).sum(axis=1) / (n - 1))
+            se_diff = std_diff / np.sqrt(n)
+            t_stat = mean_diff / se_diff
+            cohens_d = mean_diff / std_diff
+        
+        # A constant difference leaves rounding noise in std_diff; treat
+        # spreads below that noise as zero variance
+        noise_floor = 1e-12 * np.abs(diff).max(axis=1)
+        testable = (n >= 2) & (std_diff > noise_floor)
+        dof = np.maximum(n - 1, 1)
+        
+        p_values = np.full(len(idx_a), np.nan)
+        p_values[testable] = 2 * stats.t.sf(np.abs(t_stat[testable]), dof[testable])
+        mean_diff = np.where(n > 0, mean_diff, 0.0)
+        
+        margin = np.where(testable, stats.t.ppf((1 + confidence) / 2, dof) * se_diff, 0.0)
+        
+        # Untestable pairs are not hypotheses, so they do not count towards m
+        adjusted = np.full(len(idx_a), np.nan)
+        if testable.any():
+            adjusted[testable] = StatisticsService.multiple_comparisons_correction(
+                p_values[testable], method=correction
+            )
+        
+        def tested(values: np.ndarray, k: int) -> Optional[float]:
+            # None rather than NaN so the result stays JSON-serializable
+            return float(values[k]) if testable[k] else None
+        
+        return [
+            {
+                'model_a': model_names[idx_a[k]],
+                'model_b': model_names[idx_b[k]],
+                'testable': bool(testable[k]),
+                't_statistic': tested(t_stat, k),
+                'p_value': tested(p_values, k),
+                'p_value_adjusted': tested(adjusted, k),
+                'significant': bool(testable[k] and adjusted[k] < alpha),
+                'cohens_d': tested(cohens_d, k),
+                'mean_difference': float(mean_diff[k]),
+                'confidence_interval': (
+                    (float(mean_diff[k] - margin[k]), float(mean_diff[k] + margin[k]))
+                    if testable[k] else None
+                ),
+                'sample_size': int(n[k])
+            }
+            for k in range(len(idx_a))
+        ]
+    
     @staticmethod
     def confidence_interval(
         scores: np.ndarray,
-        confidence: float = 0.95
+        confidence: float = 0.95,
+        method: str = 'normal',
+        n_resamples: int = 10000,
+        seed: int = 0
     ) -> Tuple[float, float]:
         """
         Compute confidence interval for scores
@@ -83,11 +204,22 @@ class StatisticsService:
         Args:
             scores: Array of scores
             confidence: Confidence level (e.g., 0.95 for 95%)
+            method: 'normal' (z-interval) or 'bootstrap' (percentile)
+            n_resamples: Bootstrap resamples when method is 'bootstrap'
+            seed: Bootstrap seed when method is 'bootstrap'
         
         Returns:
             Tuple of (lower, upper) bounds
         """
         
+        if method == 'bootstrap':
+            result = StatisticsService.bootstrap_ci(
+                scores, confidence=confidence, n_resamples=n_resamples, seed=seed
+            )
+            return result['confidence_interval']
+        elif method != 'normal':
+            raise ValueError(f"Unknown method: {method}")
+        
         mean = np.mean(scores)
         std = np.std(scores)
         se = std / np.sqrt(len(scores))
@@ -97,6 +229,178 @@ class StatisticsService:
         
         return (mean - margin_of_error, mean + margin_of_error)
     
+    @staticmethod
+    def _chunk_rows(n_total: int, row_elements: int, max_elements: int) -> int:
+        """Number of resample rows that fit in one buffer"""
+        return int(max(1, min(n_total, max_elements // max(row_elements, 1))))
+    
+    @staticmethod
+    def bootstrap_distribution(
+        values: np.ndarray,
+        statistic: Callable = np.mean,
+        n_resamples: int = 10000,
+        seed: int = 0,
+        max_buffer_elements: int = RESAMPLE_BUFFER_ELEMENTS
+    ) -> np.ndarray:
+        """
+        Bootstrap distribution of a statistic
+        
+        Resamples are drawn in chunks: each chunk's index matrix comes
+        from Generator.integers (exact and unbiased, but a fresh array per
+        chunk, as it has no out argument) and is gathered into a
+        preallocated sample buffer. The statistic is evaluated on a whole
+        chunk at once.
+        
+        Args:
+            values: Observations, shape (n,) or (n, k); rows are resampled together
+            statistic: Vectorized function called as statistic(samples, axis=1)
+                on samples of shape (chunk, n) or (chunk, n, k)
+            n_resamples: Number of bootstrap resamples
+            seed: Seed for the random generator
+            max_buffer_elements: Upper bound on elements per resampling buffer
+        
+        Returns:
+            Array of n_resamples statistic values
+        """
+        values = np.asarray(values)
+        n = values.shape[0]
+        row_shape = values.shape[1:]
+        row_elements = n * int(np.prod(row_shape, dtype=int))
+        chunk = StatisticsService._chunk_rows(n_resamples, row_elements, max_buffer_elements)
+        
+        rng = np.random.default_rng(seed)
+        samples = np.empty((chunk, n) + row_shape, dtype=values.dtype)
+        distribution = np.empty(n_resamples)
+        
+        for start in range(0, n_resamples, chunk):
+            rows = min(chunk, n_resamples - start)
+            indices = rng.integers(0, n, size=(chunk, n))
+            np.take(values, indices, axis=0, out=samples)
+            distribution[start:start + rows] = statistic(samples, axis=1)[:rows]
+        
+        return distribution
+    
+    @staticmethod
+    def bootstrap_ci(
+        values: np.ndarray,
+        statistic: Callable = np.mean,
+        confidence: float = 0.95,
+        n_resamples: int = 10000,
+        seed: int = 0
+    ) -> Dict:
+        """
+        Percentile bootstrap confidence interval for any vectorized statistic
+        
+        Args:
+            values: Observations, shape (n,) or (n, k)
+            statistic: Vectorized function called as statistic(samples, axis=...)
+            confidence: Confidence level
+            n_resamples: Number of bootstrap resamples
+            seed: Seed for the random generator
+        
+        Returns:
+            Dict with point estimate, confidence interval and standard error
+        """
+        values = np.asarray(values)
+        if values.shape[0] == 0:
+            return {
+                'estimate': 0.0,
+                'confidence_interval': (0.0, 0.0),
+                'standard_error': 0.0,
+                'n_resamples': 0
+            }
+        
+        estimate = float(statistic(values[None, ...], axis=1)[0])
+        distribution = StatisticsService.bootstrap_distribution(
+            values, statistic=statistic, n_resamples=n_resamples, seed=seed
+        )
+        
+        tail = (1 - confidence) / 2 * 100
+        lower, upper = np.percentile(distribution, [tail, 100 - tail])
+        
+        return {
+            'estimate': estimate,
+            'confidence_interval': (float(lower), float(upper)),
+            'standard_error': float(np.std(distribution, ddof=1)),
+            'n_resamples': n_resamples
+        }
+    
+    @staticmethod
+    def permutation_test(
+        scores_a: np.ndarray,
+        scores_b: np.ndarray,
+        paired: bool = False,
+        n_permutations: int = 10000,
+        seed: int = 0,
+        max_buffer_elements: int = RESAMPLE_BUFFER_ELEMENTS
+    ) -> Dict:
+        """
+        Permutation test on the difference in means
+        
+        Paired data is tested by random sign flips of the per-sample
+        differences; unpaired data by shuffling group labels. Permutations
+        are generated in chunks into preallocated buffers.
+        
+        Args:
+            scores_a: Scores for model A
+            scores_b: Scores for model B (same length as A when paired)
+            paired: Whether scores are paired by position
+            n_permutations: Number of random permutations
+            seed: Seed for the random generator
+            max_buffer_elements: Upper bound on elements per permutation buffer
+        
+        Returns:
+            Dict with observed difference and two-sided p-value
+        """
+        scores_a = np.asarray(scores_a, dtype=float)
+        scores_b = np.asarray(scores_b, dtype=float)
+        rng = np.random.default_rng(seed)
+        
+        if paired:
+            if len(scores_a) != len(scores_b):
+                raise ValueError("Paired permutation test requires equal-length inputs")
+            diff = scores_a - scores_b
+            n = len(diff)
+            observed = float(diff.mean()) if n else 0.0
+            
+            chunk = StatisticsService._chunk_rows(n_permutations, n, max_buffer_elements)
+            signs = np.empty((chunk, n))
+            
+            exceed = 0
+            for start in range(0, n_permutations, chunk):
+                rows = min(chunk, n_permutations - start)
+                rng.random(out=signs)
+                # Map U[0, 1) to +/-1 in place
+                np.less(signs, 0.5, out=signs, casting='unsafe')
+                np.multiply(signs, -2.0, out=signs)
+                np.add(signs, 1.0, out=signs)
+                np.multiply(signs, diff, out=signs)
+                permuted = signs.mean(axis=1)[:rows]
+                exceed += int(np.count_nonzero(np.abs(permuted) >= abs(observed) - 1e-12))
+        else:
+            n_a = len(scores_a)
+            pooled = np.concatenate([scores_a, scores_b])
+            n = len(pooled)
+            observed = float(scores_a.mean() - scores_b.mean()) if n_a and len(scores_b) else 0.0
+            
+            chunk = StatisticsService._chunk_rows(n_permutations, n, max_buffer_elements)
+            shuffled = np.empty((chunk, n))
+            
+            exceed = 0
+            for start in range(0, n_permutations, chunk):
+                rows = min(chunk, n_permutations - start)
+                np.copyto(shuffled, pooled)
+                rng.permuted(shuffled, axis=1, out=shuffled)
+                permuted = (shuffled[:, :n_a].mean(axis=1) - shuffled[:, n_a:].mean(axis=1))[:rows]
+                exceed += int(np.count_nonzero(np.abs(permuted) >= abs(observed) - 1e-12))
+        
+        return {
+            'observed_difference': observed,
+            'p_value': (exceed + 1) / (n_permutations + 1),
+            'n_permutations': n_permutations,
+            'paired': paired
+        }
+    
     @staticmethod
     def multiple_comparisons_correction(
         p_values: np.ndarray,
@@ -116,17 +420,20 @@ class StatisticsService:
         if method == 'bonferroni':
             return np.minimum(p_values * len(p_values), 1.0)
         elif method == 'benjamini_hochberg':
+            p_values = np.asarray(p_values, dtype=float)
+            n = len(p_values)
+            if n == 0:
+                return p_values
+            
             # Sort p-values
             sorted_indices = np.argsort(p_values)
             sorted_p = p_values[sorted_indices]
             
             # Compute BH-adjusted p-values
-            n = len(p_values)
             bh_adjusted = sorted_p * n / (np.arange(1, n + 1))
             
-            # Ensure monotonicity
-            for i in range(n - 2, -1, -1):
-                bh_adjusted[i] = min(bh_adjusted[i], bh_adjusted[i + 1])
+            # Ensure monotonicity (running minimum from the largest p-value down)
+            bh_adjusted = np.minimum.accumulate(bh_adjusted[::-1])[::-1]
             
             # Unsort
             result = np.empty_like(bh_adjusted)
@@ -136,6 +443,53 @@ class StatisticsService:
         else:
             raise ValueError(f"Unknown method: {method}")
     
+    @staticmethod
+    def mcnemar_test(
+        correct_a: np.ndarray,
+        correct_b: np.ndarray,
+        alpha: float = 0.05
+    ) -> Dict:
+        """
+        McNemar test for two classifiers evaluated on the same samples
+        
+        Uses the exact binomial test when there are fewer than 25
+        discordant pairs, otherwise the continuity-corrected chi-square.
+        
+        Args:
+            correct_a: Boolean array, model A correct per sample
+            correct_b: Boolean array, model B correct per sample (same order)
+            alpha: Significance level
+        
+        Returns:
+            Dict with discordant counts, statistic and p-value
+        """
+        correct_a = np.asarray(correct_a, dtype=bool)
+        correct_b = np.asarray(correct_b, dtype=bool)
+        
+        only_a = int(np.count_nonzero(correct_a & ~correct_b))
+        only_b = int(np.count_nonzero(~correct_a & correct_b))
+        discordant = only_a + only_b
+        
+        if discordant == 0:
+            statistic, p_value, method = 0.0, 1.0, 'exact'
+        elif discordant < 25:
+            statistic = float(min(only_a, only_b))
+            p_value = float(stats.binomtest(min(only_a, only_b), discordant, 0.5).pvalue)
+            method = 'exact'
+        else:
+            statistic = float((abs(only_a - only_b) - 1) ** 2 / discordant)
+            p_value = float(stats.chi2.sf(statistic, df=1))
+            method = 'chi2'
+        
+        return {
+            'only_a_correct': only_a,
+            'only_b_correct': only_b,
+            'statistic': statistic,
+            'p_value': p_value,
+            'significant': p_value < alpha,
+            'method': method
+        }
+    
     @staticmethod
     def effect_size_interpretation(cohens_d: float) -> str:
         """
@@ -0,0 +1,170 @@
+"""
+Check that hot comparison API queries are served by indexes
+Usage: python backend/check_query_plans.py
+
+Runs EXPLAIN QUERY PLAN (SQLite) for the lookups made by comparison/api.py,
+result reuse, artifact eviction and the disagreement index, and fails if any
+of them scans a comparison table instead of searching an index (ordered walks
+of listing indexes and the reads listed in FULL_READS are allowed). The same
+checks run in the test suite (tests/test_query_plans.py).
+"""
+import sys
+import os
+from datetime import datetime
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, or_, select
+try:
+    from database import engine
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, Artifact, ModelVersion,
+        EvaluationCacheEntry, ImageDisagreement, RunStatus, IN_FLIGHT_STATUSES
+    )
+    from comparison.cache_policy import stored_under
+except ImportError:
+    from backend.database import engine
+    from backend.models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, Artifact, ModelVersion,
+        EvaluationCacheEntry, ImageDisagreement, RunStatus, IN_FLIGHT_STATUSES
+    )
+    from backend.comparison.cache_policy import stored_under
+
+# Tables whose lookups must use an index
+CHECKED_TABLES = (
+    "comparison_runs", "evaluation_results", "image_predictions", "artifacts",
+    "evaluation_cache", "image_disagreements"
+)
+
+# Indexes that may be walked in order (paged listings stop after LIMIT rows)
+ORDERED_SCAN_INDEXES = ("idx_comparison_runs_created",)
+
+# Queries allowed to read a whole table, and which one
+FULL_READS = {
+    # NOT IN (cached runs) reads the cache table once; it holds one row per model and config
+    "superseded runs": ("evaluation_cache",),
+}
+
+
+def hot_queries():
+    """(name, statement) for each hot comparison query: API lookups, result reuse, eviction and indexing"""
+    return [
+        ("run by run_id", select(ComparisonRun).where(ComparisonRun.run_id == "run_x")),
+        ("cached run for config", select(ComparisonRun).where(
+            ComparisonRun.config_hash == "hash",
+            ComparisonRun.status == RunStatus.COMPLETED,
+            ComparisonRun.completed_at >= datetime(2000, 1, 1)
+        ).order_by(ComparisonRun.completed_at.desc()).limit(1)),
+        ("in-flight run for config", select(ComparisonRun).where(
+            ComparisonRun.config_hash == "hash",
+            ComparisonRun.status.in_(IN_FLIGHT_STATUSES)
+        ).limit(1)),
+        ("list runs", select(ComparisonRun).order_by(
+            ComparisonRun.created_at.desc()
+        ).offset(0).limit(50)),
+        ("list runs by status", select(ComparisonRun).where(
+            ComparisonRun.status == RunStatus.COMPLETED
+        ).order_by(ComparisonRun.created_at.desc()).offset(0).limit(50)),
+        ("results for run", select(EvaluationResult, ModelVersion).join(
+            ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+        ).where(EvaluationResult.run_id == 1).order_by(EvaluationResult.id)),
+        ("results for run page", select(EvaluationResult, ModelVersion).join(
+            ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+        ).where(EvaluationResult.run_id.in_([1, 2, 3])).order_by(EvaluationResult.id)),
+        ("artifacts for run page", select(
+            Artifact.result_id, Artifact.artifact_type, Artifact.storage_path
+        ).join(
+            EvaluationResult, Artifact.result_id == EvaluationResult.id
+        ).where(EvaluationResult.run_id.in_([1, 2, 3])).order_by(Artifact.id)),
+        ("predictions for result", select(ImagePrediction).where(
+            ImagePrediction.result_id == 1
+        ).limit(100)),
+        ("predictions for run", select(
+            ImagePrediction.image_id, ImagePrediction.predicted_class, ImagePrediction.ground_truth
+        ).join(
+            EvaluationResult, ImagePrediction.result_id == EvaluationResult.id
+        ).where(EvaluationResult.run_id == 1).order_by(ImagePrediction.id)),
+        ("reusable results for models", select(EvaluationCacheEntry.eval_config_hash, EvaluationResult).join(
+            EvaluationResult, EvaluationCacheEntry.result_id == EvaluationResult.id
+        ).join(
+            ComparisonRun, EvaluationResult.run_id == ComparisonRun.id
+        ).where(
+            EvaluationCacheEntry.model_version_id.in_([1, 2]),
+            EvaluationCacheEntry.dataset_id == "dataset",
+            EvaluationCacheEntry.eval_config_hash.in_(["hash_a", "hash_b"]),
+            ComparisonRun.status == RunStatus.COMPLETED,
+            ComparisonRun.completed_at >= datetime(2000, 1, 1)
+        )),
+        ("cache entries for run", select(EvaluationCacheEntry).where(
+            EvaluationCacheEntry.model_version_id.in_([1, 2]),
+            EvaluationCacheEntry.dataset_id == "dataset",
+            EvaluationCacheEntry.eval_config_hash.in_(["hash_a", "hash_b"])
+        )),
+        ("superseded runs", select(ComparisonRun.id).where(
+            ComparisonRun.status.in_([RunStatus.COMPLETED, RunStatus.FAILED]),
+            or_(
+                ComparisonRun.status == RunStatus.FAILED,
+                ComparisonRun.id.notin_(select(EvaluationResult.run_id).join(
+                    EvaluationCacheEntry, EvaluationCacheEntry.result_id == EvaluationResult.id
+                )),
+                ComparisonRun.completed_at < datetime(2000, 1, 1)
+            )
+        ).order_by(ComparisonRun.completed_at, ComparisonRun.id)),
+        ("owners of artifacts under a run dir", select(ComparisonRun.id, ComparisonRun.run_id).join(
+            EvaluationResult, EvaluationResult.run_id == ComparisonRun.id
+        ).join(
+            Artifact, Artifact.result_id == EvaluationResult.id
+        ).where(stored_under("artifacts/run_x", engine.dialect.name)).distinct()),
+        ("delete evicted artifacts", delete(Artifact).where(
+            stored_under("artifacts/run_x", engine.dialect.name)
+        )),
+        ("disagreement rows for images", select(
+            ImageDisagreement.id, ImageDisagreement.evaluated_mask, ImageDisagreement.correct_mask
+        ).where(
+            ImageDisagreement.dataset_id == "dataset",
+            ImageDisagreement.image_id.in_(["img_1", "img_2"])
+        )),
+        ("disagreements page", select(ImageDisagreement).where(
+            ImageDisagreement.dataset_id == "dataset",
+            ImageDisagreement.kind == "disagreement",
+            ImageDisagreement.image_id > "img"
+        ).order_by(ImageDisagreement.image_id).limit(101)),
+    ]
+
+
+def explain(statement) -> list:
+    """EXPLAIN QUERY PLAN detail lines for a statement"""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def table_scans(plan: list, allowed: tuple = ()) -> list:
+    """Plan lines that scan a checked table, other than allowed ones, instead of searching an index"""
+    return [
+        line for line in plan
+        if line.startswith("SCAN ") and line.split()[1] in CHECKED_TABLES
+        and line.split()[1] not in allowed
+        and not any(f"INDEX {index}" in line for index in ORDERED_SCAN_INDEXES)
+    ]
+
+
+if __name__ == "__main__":
+    if engine.dialect.name != "sqlite":
+        print(f"❌ Query plan checks support SQLite only (got {engine.dialect.name})")
+        sys.exit(2)
+
+    failures = 0
+    for name, statement in hot_queries():
+        plan = explain(statement)
+        scans = table_scans(plan, FULL_READS.get(name, ()))
+        print(f"{'❌' if scans else '✅'} {name}")
+        for line in plan:
+            print(f"     {line}")
+        failures += bool(scans)
+
+    if failures:
+        print(f"\n❌ {failures} queries scan a table without an index")
+        sys.exit(1)
+    print("\n✅ All hot queries use indexes")
@@ -2,34 +2,79 @@
 Model Comparison API Endpoints (v2)
 Handles model registration, comparison runs, and artifact retrieval
 """
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import hashlib
-import json
+import asyncio
 import uuid
 
 try:
-    from database import get_db
+    from database import get_async_db, get_pool_metrics, AsyncSessionLocal, SessionLocal
     from models.comparison_models import (
         ModelVersion, ComparisonRun, EvaluationResult, 
-        ImagePrediction, Artifact, RunStatus, ArtifactType
+        ImagePrediction, Artifact, RunStatus, ArtifactType, IN_FLIGHT_STATUSES
+    )
+    from streaming_export import (
+        EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_rows, parquet_available
     )
 except ImportError:
-    from backend.database import get_db
+    from backend.database import get_async_db, get_pool_metrics, AsyncSessionLocal, SessionLocal
     from backend.models.comparison_models import (
         ModelVersion, ComparisonRun, EvaluationResult, 
-        ImagePrediction, Artifact, RunStatus, ArtifactType
+        ImagePrediction, Artifact, RunStatus, ArtifactType, IN_FLIGHT_STATUSES
+    )
+    from backend.streaming_export import (
+        EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_rows, parquet_available
     )
 from .evaluator import ImageComparisonEvaluator
+from .significance import load_prediction_arrays, compute_run_significance, significance_cache
+from .prediction_archive import archive_available, open_run_archive, write_run_archive
+from .disagreement_index import DISAGREEMENT_KINDS, query_disagreements, update_disagreement_index
+from .result_cache import record_run_results
+from .cache_policy import (
+    run_fingerprints, comparison_config_hash, cache_cutoff, cache_ttl,
+    inflight_stale_cutoff, artifact_disk_budget_bytes, evict_artifacts
+)
+from .cache_telemetry import cache_telemetry
+from .response_cache import response_cache
+from starlette.concurrency import run_in_threadpool
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v2", tags=["model-comparison-v2"])
 
+# Column sets for summary queries. raiseload makes any other attribute access
+# fail fast instead of lazy loading (which the async session cannot do).
+RUN_SUMMARY_COLUMNS = load_only(
+    ComparisonRun.id, ComparisonRun.run_id, ComparisonRun.status, ComparisonRun.progress_pct,
+    ComparisonRun.dataset_name, ComparisonRun.created_at, ComparisonRun.completed_at,
+    raiseload=True
+)
+RESULT_METRIC_COLUMNS = load_only(
+    EvaluationResult.id, EvaluationResult.run_id, EvaluationResult.model_version_id,
+    EvaluationResult.accuracy, EvaluationResult.f1_score, EvaluationResult.precision,
+    EvaluationResult.recall, EvaluationResult.latency_mean_ms,
+    EvaluationResult.throughput_imgs_per_sec, EvaluationResult.memory_peak_mb,
+    raiseload=True
+)
+MODEL_SUMMARY_COLUMNS = load_only(
+    ModelVersion.id, ModelVersion.model_name, ModelVersion.version,
+    raiseload=True
+)
+PREDICTION_SUMMARY_COLUMNS = load_only(
+    ImagePrediction.id, ImagePrediction.image_id, ImagePrediction.predicted_class,
+    ImagePrediction.confidence, ImagePrediction.ground_truth, ImagePrediction.is_correct,
+    ImagePrediction.inference_time_ms,
+    raiseload=True
+)
+
 
 # ============= Request/Response Models =============
 
@@ -95,15 +140,17 @@ class ComparisonRunResponse(BaseModel):
 @router.post("/models/register", response_model=ModelResponse)
 async def register_model(
     request: ModelRegistrationRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new model version for comparison"""
     try:
         # Check if model version already exists
-        existing = db.query(ModelVersion).filter(
-            ModelVersion.model_name == request.model_name,
-            ModelVersion.version == request.version
-        ).first()
+        existing = (await db.execute(
+            select(ModelVersion.id).where(
+                ModelVersion.model_name == request.model_name,
+                ModelVersion.version == request.version
+            )
+        )).first()
         
         if existing:
             raise HTTPException(
@@ -120,8 +167,8 @@ async def register_model(
         )
         
         db.add(model)
-        db.commit()
-        db.refresh(model)
+        await db.commit()
+        await db.refresh(model)
         
         logger.info(f"Registered model: {model.model_name} v{model.version}")
         
@@ -137,7 +184,7 @@ async def register_model(
         raise
     except Exception as e:
         logger.error(f"Error registering model: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -146,16 +193,18 @@ async def list_models(
     filter_by_name: Optional[str] = Query(None),
     limit: int = Query(100, le=1000),
     offset: int = Query(0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all registered models"""
     try:
-        query = db.query(ModelVersion)
+        stmt = select(ModelVersion)
         
         if filter_by_name:
-            query = query.filter(ModelVersion.model_name.contains(filter_by_name))
+            stmt = stmt.where(ModelVersion.model_name.contains(filter_by_name))
         
-        models = query.order_by(ModelVersion.created_at.desc()).offset(offset).limit(limit).all()
+        models = (await db.execute(
+            stmt.order_by(ModelVersion.created_at.desc()).offset(offset).limit(limit)
+        )).scalars().all()
         
         return [
             ModelResponse(
@@ -177,7 +226,7 @@ async def list_models(
 async def create_comparison_run(
     request: ComparisonRunRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new comparison run (async processing)"""
     try:
@@ -194,9 +243,9 @@ async def create_comparison_run(
             )
         
         # Verify all models exist
-        models = db.query(ModelVersion).filter(
-            ModelVersion.id.in_(request.model_ids)
-        ).all()
+        models = (await db.execute(
+            select(ModelVersion).where(ModelVersion.id.in_(request.model_ids))
+        )).scalars().all()
         
         if len(models) != len(request.model_ids):
             raise HTTPException(
@@ -204,23 +253,28 @@ async def create_comparison_run(
                 detail="One or more model IDs not found"
             )
         
-        # Generate config hash for caching
-        config_str = json.dumps({
-            "model_ids": sorted(request.model_ids),
-            "dataset_id": request.dataset_id,
-            "config": request.config
-        }, sort_keys=True)
-        config_hash = hashlib.sha256(config_str.encode()).hexdigest()
+        await db.run_sync(cache_telemetry.maybe_flush)
+        
+        # Generate config hash for caching; fingerprints change it when weights or data change
+        fingerprints = await run_in_threadpool(run_fingerprints, models, request.dataset_id)
+        config_hash = comparison_config_hash(
+            request.model_ids, request.dataset_id, request.config, fingerprints
+        )
         
         # Check for cached run
-        cached_run = db.query(ComparisonRun).filter(
-            ComparisonRun.config_hash == config_hash,
-            ComparisonRun.status == RunStatus.COMPLETED
-        ).first()
+        cached_run = await _find_cached_run(db, config_hash)
         
         if cached_run:
             logger.info(f"Cache hit for config hash: {config_hash}")
-            return _format_run_response(cached_run, db)
+            cache_telemetry.record("hit")
+            return await _format_run_response(cached_run, db)
+        
+        # Attach to an identical run that is still being evaluated
+        inflight_run = await _find_inflight_run(db, config_hash)
+        if inflight_run:
+            logger.info(f"Attached to in-flight run {inflight_run.run_id} for config hash: {config_hash}")
+            cache_telemetry.record("dedup_attach")
+            return await _format_run_response(inflight_run, db)
         
         # Create new run
         run_id = f"run_{uuid.uuid4().hex[:12]}"
@@ -233,14 +287,28 @@ async def create_comparison_run(
             config_json={
                 "model_ids": request.model_ids,
                 "dataset_id": request.dataset_id,
-                "config": request.config
+                "config": request.config,
+                "fingerprints": fingerprints
             },
             status=RunStatus.PENDING
         )
         
         db.add(comparison_run)
-        db.commit()
-        db.refresh(comparison_run)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # An identical request created its run between our check and insert
+            await db.rollback()
+            existing_run = (
+                await _find_inflight_run(db, config_hash) or await _find_cached_run(db, config_hash)
+            )
+            if existing_run is None:
+                raise
+            logger.info(f"Attached to concurrently created run {existing_run.run_id}")
+            cache_telemetry.record("dedup_attach")
+            return await _format_run_response(existing_run, db)
+        await db.refresh(comparison_run)
+        cache_telemetry.record("miss")
         
         # Queue background evaluation task
         background_tasks.add_task(
@@ -252,13 +320,13 @@ async def create_comparison_run(
         
         logger.info(f"Created comparison run: {run_id}")
         
-        return _format_run_response(comparison_run, db)
+        return await _format_run_response(comparison_run, db)
     
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error creating comparison run: {e}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -267,18 +335,20 @@ async def list_comparison_runs(
     status: Optional[RunStatus] = Query(None),
     limit: int = Query(50, le=200),
     offset: int = Query(0),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List comparison runs with optional status filter"""
     try:
-        query = db.query(ComparisonRun)
+        stmt = select(ComparisonRun).options(RUN_SUMMARY_COLUMNS)
         
         if status:
-            query = query.filter(ComparisonRun.status == status)
+            stmt = stmt.where(ComparisonRun.status == status)
         
-        runs = query.order_by(ComparisonRun.created_at.desc()).offset(offset).limit(limit).all()
+        runs = (await db.execute(
+            stmt.order_by(ComparisonRun.created_at.desc()).offset(offset).limit(limit)
+        )).scalars().all()
         
-        return [_format_run_response(run, db) for run in runs]
+        return await _format_run_responses(runs, db)
     
     except Exception as e:
         logger.error(f"Error listing runs: {e}")
@@ -288,16 +358,21 @@ async def list_comparison_runs(
 @router.get("/comparison/runs/{run_id}", response_model=ComparisonRunResponse)
 async def get_comparison_run(
     run_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed comparison run information"""
     try:
-        run = db.query(ComparisonRun).filter(ComparisonRun.run_id == run_id).first()
+        cached = await _cached_response(request, db, run_id)
+        if cached is not None:
+            return cached
+        
+        run = await _get_run(db, run_id)
         
         if not run:
             raise HTTPException(status_code=404, detail="Run not found")
         
-        return _format_run_response(run, db)
+        return response_cache.respond(request, run, await _format_run_response(run, db))
     
     except HTTPException:
         raise
@@ -309,20 +384,31 @@ async def get_comparison_run(
 @router.get("/comparison/runs/{run_id}/results")
 async def get_run_results(
     run_id: str,
+    request: Request,
     include_predictions: bool = Query(False),
     limit: int = Query(100, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed results including predictions"""
     try:
-        run = db.query(ComparisonRun).filter(ComparisonRun.run_id == run_id).first()
+        cached = await _cached_response(request, db, run_id)
+        if cached is not None:
+            return cached
+        
+        run = await _get_run(db, run_id)
         
         if not run:
             raise HTTPException(status_code=404, detail="Run not found")
         
-        results = db.query(EvaluationResult).filter(
-            EvaluationResult.run_id == run.id
-        ).all()
+        results = (await db.execute(
+            select(EvaluationResult, ModelVersion).join(
+                ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+            ).where(
+                EvaluationResult.run_id == run.id
+            ).options(
+                RESULT_METRIC_COLUMNS, MODEL_SUMMARY_COLUMNS
+            ).order_by(EvaluationResult.id)
+        )).all()
         
         response = {
             "run_id": run_id,
@@ -330,8 +416,7 @@ async def get_run_results(
             "results": []
         }
         
-        for result in results:
-            model = result.model_version
+        for result, model in results:
             result_data = {
                 "model_id": model.id,
                 "model_name": model.model_name,
@@ -348,9 +433,11 @@ async def get_run_results(
             }
             
             if include_predictions:
-                predictions = db.query(ImagePrediction).filter(
-                    ImagePrediction.result_id == result.id
-                ).limit(limit).all()
+                predictions = (await db.execute(
+                    select(ImagePrediction).where(
+                        ImagePrediction.result_id == result.id
+                    ).options(PREDICTION_SUMMARY_COLUMNS).limit(limit)
+                )).scalars().all()
                 
                 result_data["predictions"] = [
                     {
@@ -366,7 +453,7 @@ async def get_run_results(
             
             response["results"].append(result_data)
         
-        return response
+        return response_cache.respond(request, run, response)
     
     except HTTPException:
         raise
@@ -375,38 +462,181 @@ async def get_run_results(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/comparison/runs/{run_id}/significance")
+async def get_run_significance(
+    run_id: str,
+    n_resamples: int = Query(2000, ge=100, le=20000),
+    confidence: float = Query(0.95, gt=0.5, lt=1.0),
+    seed: int = Query(0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Bootstrap CIs and pairwise McNemar tests from stored predictions (no re-inference)"""
+    try:
+        run = await _get_run(db, run_id)
+        
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        
+        if run.status != RunStatus.COMPLETED:
+            raise HTTPException(
+                status_code=400,
+                detail="Significance is only available for completed runs"
+            )
+        
+        cache_key = (run_id, n_resamples, confidence, seed)
+        cached = significance_cache.get(cache_key)
+        if cached is not None:
+            return {**cached, "cached": True}
+        
+        arrays = await db.run_sync(lambda session: load_prediction_arrays(run, session))
+        
+        # Resampling is CPU-bound; keep it off the event loop
+        analysis = await run_in_threadpool(
+            compute_run_significance,
+            arrays,
+            n_resamples=n_resamples,
+            confidence=confidence,
+            seed=seed
+        )
+        
+        response = {"run_id": run_id, **analysis}
+        significance_cache.put(cache_key, response)
+        
+        return {**response, "cached": False}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing significance: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/comparison/runs/{run_id}/predictions/query")
+async def query_run_predictions(
+    run_id: str,
+    correct: List[int] = Query([], description="Model IDs that must be correct"),
+    wrong: List[int] = Query([], description="Model IDs that must be wrong"),
+    ground_truth: Optional[str] = None,
+    min_confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
+    limit: int = Query(100, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Filter a completed run's per-image predictions from its columnar archive"""
+    try:
+        run = await _get_run(db, run_id)
+        
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        
+        if run.status != RunStatus.COMPLETED:
+            raise HTTPException(
+                status_code=400,
+                detail="Prediction queries are only available for completed runs"
+            )
+        
+        if not archive_available():
+            raise HTTPException(
+                status_code=400,
+                detail="Prediction archive requires pyarrow to be installed"
+            )
+        
+        archive = await run_in_threadpool(_open_archive, run)
+        
+        try:
+            with archive:
+                result = archive.query(
+                    correct=correct,
+                    wrong=wrong,
+                    ground_truth=ground_truth,
+                    min_confidence=min_confidence,
+                    limit=limit,
+                    offset=offset
+                )
+        except KeyError as e:
+            raise HTTPException(status_code=400, detail=str(e.args[0]))
+        
+        return {"run_id": run_id, "models": archive.models, **result}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error querying predictions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/comparison/datasets/{dataset_id}/disagreements")
+async def get_dataset_disagreements(
+    dataset_id: str,
+    kind: str = Query("disagreement", regex="^(" + "|".join(DISAGREEMENT_KINDS) + ")$"),
+    correct_model: Optional[int] = Query(None, description="Model ID that must be correct"),
+    wrong_model: Optional[int] = Query(None, description="Model ID that must be wrong"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through images where models disagree, or that every model gets wrong"""
+    try:
+        return await db.run_sync(
+            query_disagreements,
+            dataset_id,
+            kind=kind,
+            correct_model=correct_model,
+            wrong_model=wrong_model,
+            after=after,
+            limit=limit
+        )
+    
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except Exception as e:
+        logger.error(f"Error querying disagreements: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/comparison/runs/{run_id}/artifacts/{artifact_type}")
 async def get_run_artifacts(
     run_id: str,
     artifact_type: ArtifactType,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get artifacts for a specific type"""
     try:
-        run = db.query(ComparisonRun).filter(ComparisonRun.run_id == run_id).first()
+        cached = await _cached_response(request, db, run_id)
+        if cached is not None:
+            return cached
+        
+        run = await _get_run(db, run_id)
         
         if not run:
             raise HTTPException(status_code=404, detail="Run not found")
         
         # Get all artifacts of specified type for this run
-        artifacts = db.query(Artifact).join(EvaluationResult).filter(
-            EvaluationResult.run_id == run.id,
-            Artifact.artifact_type == artifact_type
-        ).all()
+        artifacts = (await db.execute(
+            select(Artifact, ModelVersion.model_name).join(
+                EvaluationResult, Artifact.result_id == EvaluationResult.id
+            ).join(
+                ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+            ).where(
+                EvaluationResult.run_id == run.id,
+                Artifact.artifact_type == artifact_type
+            )
+        )).all()
         
-        return {
+        return response_cache.respond(request, run, {
             "run_id": run_id,
             "artifact_type": artifact_type.value,
             "artifacts": [
                 {
                     "id": a.id,
-                    "model_name": a.evaluation_result.model_version.model_name,
+                    "model_name": model_name,
                     "storage_path": a.storage_path,
                     "metadata": a.metadata_json
                 }
-                for a in artifacts
+                for a, model_name in artifacts
             ]
-        }
+        })
     
     except HTTPException:
         raise
@@ -418,12 +648,17 @@ async def get_run_artifacts(
 @router.post("/comparison/runs/{run_id}/export")
 async def export_comparison_results(
     run_id: str,
+    request: Request,
     format: str = Query("json", regex="^(json|csv|pdf)$"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Export comparison results in specified format"""
     try:
-        run = db.query(ComparisonRun).filter(ComparisonRun.run_id == run_id).first()
+        cached = await _cached_response(request, db, run_id)
+        if cached is not None:
+            return cached
+        
+        run = await _get_run(db, run_id)
         
         if not run:
             raise HTTPException(status_code=404, detail="Run not found")
@@ -435,9 +670,15 @@ async def export_comparison_results(
             )
         
         # Get all results
-        results = db.query(EvaluationResult).filter(
-            EvaluationResult.run_id == run.id
-        ).all()
+        results = (await db.execute(
+            select(EvaluationResult, ModelVersion).join(
+                ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+            ).where(
+                EvaluationResult.run_id == run.id
+            ).options(
+                RESULT_METRIC_COLUMNS, MODEL_SUMMARY_COLUMNS
+            ).order_by(EvaluationResult.id)
+        )).all()
         
         export_data = {
             "run_id": run_id,
@@ -447,8 +688,7 @@ async def export_comparison_results(
             "models": []
         }
         
-        for result in results:
-            model = result.model_version
+        for result, model in results:
             export_data["models"].append({
                 "model_name": model.model_name,
                 "version": model.version,
@@ -464,7 +704,7 @@ async def export_comparison_results(
             })
         
         if format == "json":
-            return export_data
+            return response_cache.respond(request, run, export_data)
         elif format == "csv":
             # Convert to CSV format
             csv_lines = ["Model,Version,Accuracy,F1 Score,Precision,Recall,Latency (ms),Throughput (imgs/s),Memory (MB)"]
@@ -477,7 +717,7 @@ async def export_comparison_results(
                     f"{metrics.get('latency_mean_ms', 'N/A')},{metrics.get('throughput_imgs_per_sec', 'N/A')},"
                     f"{metrics.get('memory_peak_mb', 'N/A')}"
                 )
-            return {"csv_data": "\n".join(csv_lines)}
+            return response_cache.respond(request, run, {"csv_data": "\n".join(csv_lines)})
         
         return {"message": "PDF export not yet implemented"}
     
@@ -488,27 +728,72 @@ async def export_comparison_results(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/comparison/cache-stats")
-async def get_cache_stats(db: Session = Depends(get_db)):
-    """Get cache statistics"""
+@router.get("/comparison/runs/{run_id}/export/stream")
+async def stream_comparison_export(
+    run_id: str,
+    format: str = Query("csv", regex="^(csv|ndjson|parquet)$"),
+    include: str = Query("predictions", regex="^(summary|predictions)$"),
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=100, le=50000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream run metrics or per-image predictions as CSV, NDJSON or Parquet"""
     try:
-        total_runs = db.query(ComparisonRun).count()
-        completed_runs = db.query(ComparisonRun).filter(
-            ComparisonRun.status == RunStatus.COMPLETED
-        ).count()
+        run = await _get_run(db, run_id)
+        
+        if not run:
+            raise HTTPException(status_code=404, detail="Run not found")
+        
+        if run.status != RunStatus.COMPLETED:
+            raise HTTPException(
+                status_code=400,
+                detail="Can only export completed runs"
+            )
         
-        # Count unique config hashes
-        unique_configs = db.query(ComparisonRun.config_hash).distinct().count()
+        if format == "parquet" and not parquet_available():
+            raise HTTPException(
+                status_code=400,
+                detail="Parquet export requires pyarrow to be installed"
+            )
         
-        cache_hit_rate = 0
-        if unique_configs > 0:
-            cache_hit_rate = ((completed_runs - unique_configs) / completed_runs * 100) if completed_runs > 0 else 0
+        if include == "predictions":
+            columns, types = PREDICTION_EXPORT_COLUMNS, PREDICTION_EXPORT_TYPES
+        else:
+            columns, types = SUMMARY_EXPORT_COLUMNS, SUMMARY_EXPORT_TYPES
+        
+        row_chunks = _iter_export_chunks(run.id, include, chunk_size)
+        
+        return StreamingResponse(
+            stream_rows(format, columns, row_chunks, types),
+            media_type=EXPORT_FORMATS[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="{run_id}-{include}.{format}"'
+            }
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming export: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/comparison/cache-stats")
+async def get_cache_stats(db: AsyncSession = Depends(get_async_db)):
+    """Get cache statistics from observed cache events (no scans of comparison runs)"""
+    try:
+        windows = await db.run_sync(cache_telemetry.window_stats)
+        day = windows["24h"]
+        ttl = cache_ttl()
         
         return {
-            "total_runs": total_runs,
-            "completed_runs": completed_runs,
-            "unique_configurations": unique_configs,
-            "cache_hit_rate_pct": round(cache_hit_rate, 2)
+            "cache_hits": day["hit"] + day["dedup_attach"],
+            "cache_misses": day["miss"],
+            "cache_hit_rate_pct": day["hit_rate_pct"],
+            "windows": windows,
+            "process_totals": cache_telemetry.totals(),
+            "ttl_hours": ttl.total_seconds() / 3600 if ttl else None,
+            "artifact_disk_budget_mb": artifact_disk_budget_bytes() / (1024 * 1024),
+            "response_cache": response_cache.stats()
         }
     
     except Exception as e:
@@ -516,18 +801,157 @@ async def get_cache_stats(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+
+@router.get("/system/db-pool")
+async def get_db_pool_stats():
+    """Get connection pool usage for the sync and async database engines"""
+    try:
+        return get_pool_metrics()
+    
+    except Exception as e:
+        logger.error(f"Error getting pool stats: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============= Helper Functions =============
 
-def _format_run_response(run: ComparisonRun, db: Session) -> ComparisonRunResponse:
+async def _get_run(db: AsyncSession, run_id: str) -> Optional[ComparisonRun]:
+    """Look up a run by its public run_id"""
+    return (await db.execute(
+        select(ComparisonRun).where(ComparisonRun.run_id == run_id)
+    )).scalars().first()
+
+
+async def _cached_response(request: Request, db: AsyncSession, run_id: str):
+    """
+    Cached response for a completed run, if still current
+
+    Reads the run's status and updated_at (the cache version) by run_id, so
+    entries made stale by another worker's artifact eviction are rebuilt.
+    Requests for runs that are not completed are never cached and do not
+    count as misses.
+    """
+    row = (await db.execute(
+        select(ComparisonRun.status, ComparisonRun.updated_at).where(ComparisonRun.run_id == run_id)
+    )).first()
+    if row is None or row.status != RunStatus.COMPLETED:
+        return None
+    return response_cache.lookup(request, row.updated_at)
+
+
+async def _find_cached_run(db: AsyncSession, config_hash: str) -> Optional[ComparisonRun]:
+    """Most recently completed run for a configuration that is still within the cache TTL"""
+    stmt = select(ComparisonRun).where(
+        ComparisonRun.config_hash == config_hash,
+        ComparisonRun.status == RunStatus.COMPLETED
+    )
+    cutoff = cache_cutoff()
+    if cutoff is not None:
+        stmt = stmt.where(ComparisonRun.completed_at >= cutoff)
+    return (await db.execute(
+        stmt.order_by(ComparisonRun.completed_at.desc()).limit(1)
+    )).scalars().first()
+
+
+async def _find_inflight_run(db: AsyncSession, config_hash: str) -> Optional[ComparisonRun]:
+    """
+    Pending or running run for a configuration, if any
+
+    A run whose heartbeat is older than the in-flight timeout was orphaned
+    by a crashed or restarted worker. It is marked FAILED instead of being
+    attached to, which also frees its config hash for a new run.
+    """
+    stmt = select(ComparisonRun).where(
+        ComparisonRun.config_hash == config_hash,
+        ComparisonRun.status.in_(IN_FLIGHT_STATUSES)
+    ).limit(1)
+    run = (await db.execute(stmt)).scalars().first()
+    if run is None:
+        return None
+    
+    cutoff = inflight_stale_cutoff()
+    heartbeat = run.updated_at or run.started_at or run.created_at
+    if heartbeat is None or heartbeat >= cutoff:
+        return run
+    
+    if await _fail_abandoned_run(run.id, heartbeat, cutoff):
+        logger.warning(f"Marked abandoned in-flight run {run.run_id} as failed")
+    
+    db.expunge(run)
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def _fail_abandoned_run(run_pk: int, heartbeat: datetime, cutoff: datetime) -> bool:
+    """
+    Mark an in-flight run FAILED in its own transaction
+
+    Kept out of the request's session so committing it never commits
+    whatever the handler has pending. The update is conditional, so a
+    heartbeat landing meanwhile keeps the run alive.
+
+    Returns:
+        Whether the run was marked failed
+    """
+    async with AsyncSessionLocal() as session:
+        failed = await session.execute(
+            update(ComparisonRun).where(
+                ComparisonRun.id == run_pk,
+                ComparisonRun.status.in_(IN_FLIGHT_STATUSES),
+                func.coalesce(
+                    ComparisonRun.updated_at, ComparisonRun.started_at, ComparisonRun.created_at
+                ) < cutoff
+            ).values(
+                status=RunStatus.FAILED,
+                error_message=f"Abandoned: no progress since {heartbeat.isoformat()}",
+                completed_at=datetime.utcnow()
+            ).execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        return bool(failed.rowcount)
+
+
+def _open_archive(run: ComparisonRun):
+    """Open a run's prediction archive with a worker-thread session"""
+    db = SessionLocal()
+    try:
+        return open_run_archive(run, db)
+    finally:
+        db.close()
+
+
+async def _format_run_response(run: ComparisonRun, db: AsyncSession) -> ComparisonRunResponse:
     """Format a comparison run for response"""
-    results = db.query(EvaluationResult).filter(
-        EvaluationResult.run_id == run.id
-    ).all()
+    return (await _format_run_responses([run], db))[0]
+
+
+async def _format_run_responses(runs: List[ComparisonRun], db: AsyncSession) -> List[ComparisonRunResponse]:
+    """Format comparison runs for response, loading results and artifacts in two queries"""
+    run_ids = [run.id for run in runs]
+    if not run_ids:
+        return []
+    
+    results = (await db.execute(
+        select(EvaluationResult, ModelVersion).join(
+            ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+        ).where(
+            EvaluationResult.run_id.in_(run_ids)
+        ).options(
+            RESULT_METRIC_COLUMNS, MODEL_SUMMARY_COLUMNS
+        ).order_by(EvaluationResult.id)
+    )).all()
+    
+    artifacts = (await db.execute(
+        select(Artifact.result_id, Artifact.artifact_type, Artifact.storage_path).join(
+            EvaluationResult, Artifact.result_id == EvaluationResult.id
+        ).where(
+            EvaluationResult.run_id.in_(run_ids)
+        ).order_by(Artifact.id)
+    )).all()
     
-    models_data = []
-    for result in results:
-        model = result.model_version
-        models_data.append(
+    models_data = {run_id: [] for run_id in run_ids}
+    model_names = {}
+    for result, model in results:
+        model_names[result.id] = model.model_name
+        models_data[result.run_id].append(
             ModelResultResponse(
                 model_id=model.id,
                 model_name=model.model_name,
@@ -545,34 +969,99 @@ def _format_run_response(run: ComparisonRun, db: Session) -> ComparisonRunRespon
         )
     
     # Get artifact paths
-    artifacts_dict = {}
-    for result in results:
-        model_name = result.model_version.model_name
-        artifacts = db.query(Artifact).filter(
-            Artifact.result_id == result.id
-        ).all()
-        
-        for artifact in artifacts:
-            artifact_key = f"{model_name}_{artifact.artifact_type.value}"
-            artifacts_dict[artifact_key] = artifact.storage_path
+    result_runs = {result.id: result.run_id for result, _ in results}
+    artifacts_dict = {run_id: {} for run_id in run_ids}
+    for result_id, artifact_type, storage_path in artifacts:
+        artifact_key = f"{model_names[result_id]}_{artifact_type.value}"
+        artifacts_dict[result_runs[result_id]][artifact_key] = storage_path
     
-    return ComparisonRunResponse(
-        run_id=run.run_id,
-        status=run.status.value,
-        progress_pct=run.progress_pct,
-        dataset_name=run.dataset_name,
-        models=models_data,
-        artifacts=artifacts_dict,
-        created_at=run.created_at,
-        completed_at=run.completed_at
-    )
+    return [
+        ComparisonRunResponse(
+            run_id=run.run_id,
+            status=run.status.value,
+            progress_pct=run.progress_pct,
+            dataset_name=run.dataset_name,
+            models=models_data[run.id],
+            artifacts=artifacts_dict[run.id],
+            created_at=run.created_at,
+            completed_at=run.completed_at
+        )
+        for run in runs
+    ]
 
 
-async def run_evaluation_task(run_db_id: int, model_ids: List[int], dataset_id: str):
-    """Background task to run evaluation"""
-    from backend.database import SessionLocal
+PREDICTION_EXPORT_COLUMNS = [
+    "model_id", "model_name", "version", "image_id", "image_path",
+    "predicted_class", "confidence", "ground_truth", "is_correct", "inference_time_ms"
+]
+PREDICTION_EXPORT_TYPES = {
+    "model_id": "int", "confidence": "float", "is_correct": "int", "inference_time_ms": "float"
+}
+SUMMARY_EXPORT_COLUMNS = [
+    "model_id", "model_name", "version", "accuracy", "f1_score", "precision", "recall",
+    "latency_mean_ms", "latency_std_ms", "throughput_imgs_per_sec", "memory_peak_mb", "memory_avg_mb"
+]
+SUMMARY_EXPORT_TYPES = {
+    name: "float" for name in SUMMARY_EXPORT_COLUMNS if name not in ("model_name", "version")
+}
+SUMMARY_EXPORT_TYPES["model_id"] = "int"
+
+
+def _iter_export_chunks(run_db_id: int, include: str, chunk_size: int):
+    """
+    Yield export rows in chunks from a server-side cursor
+    
+    Runs with its own session because the response body is produced after
+    the request-scoped session has been released.
+    """
+    if include == "predictions":
+        stmt = select(
+            ModelVersion.id, ModelVersion.model_name, ModelVersion.version,
+            ImagePrediction.image_id, ImagePrediction.image_path,
+            ImagePrediction.predicted_class, ImagePrediction.confidence,
+            ImagePrediction.ground_truth, ImagePrediction.is_correct,
+            ImagePrediction.inference_time_ms
+        ).join(
+            EvaluationResult, ImagePrediction.result_id == EvaluationResult.id
+        ).join(
+            ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+        ).where(
+            EvaluationResult.run_id == run_db_id
+        ).order_by(ImagePrediction.id)
+    else:
+        stmt = select(
+            ModelVersion.id, ModelVersion.model_name, ModelVersion.version,
+            EvaluationResult.accuracy, EvaluationResult.f1_score,
+            EvaluationResult.precision, EvaluationResult.recall,
+            EvaluationResult.latency_mean_ms, EvaluationResult.latency_std_ms,
+            EvaluationResult.throughput_imgs_per_sec,
+            EvaluationResult.memory_peak_mb, EvaluationResult.memory_avg_mb
+        ).join(
+            ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+        ).where(
+            EvaluationResult.run_id == run_db_id
+        ).order_by(EvaluationResult.id)
     
     db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=chunk_size))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        db.close()
+
+
+def run_evaluation_task(run_db_id: int, model_ids: List[int], dataset_id: str):
+    """
+    Background task to run evaluation
+
+    A plain function, so Starlette runs it in its worker threadpool: the
+    sync session's status and per-image progress commits, result copies,
+    artifact rendering and post-run bookkeeping all stay off the event
+    loop. The async evaluator gets its own loop in that thread.
+    """
+    db = SessionLocal()
+    run = None
     try:
         run = db.query(ComparisonRun).filter(ComparisonRun.id == run_db_id).first()
         if not run:
@@ -589,7 +1078,7 @@ async def run_evaluation_task(run_db_id: int, model_ids: List[int], dataset_id:
         
         # Run evaluation
         evaluator = ImageComparisonEvaluator(models, dataset_id, db)
-        await evaluator.run_evaluation(run)
+        asyncio.run(evaluator.run_evaluation(run))
         
         # Update status to completed
         run.status = RunStatus.COMPLETED
@@ -597,11 +1086,40 @@ async def run_evaluation_task(run_db_id: int, model_ids: List[int], dataset_id:
         run.progress_pct = 100.0
         db.commit()
         
+        # The run is complete either way; a failure here only costs future reuse
+        try:
+            record_run_results(db, run)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not record cached results for run {run.run_id}: {e}")
+        
+        try:
+            evicted, affected = evict_artifacts(db)
+            cache_telemetry.record("eviction", len(evicted))
+            for affected_run_id in affected:
+                response_cache.invalidate_run(affected_run_id)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Artifact eviction failed: {e}")
+        
         logger.info(f"Completed evaluation for run {run.run_id}")
+        
+        # Compact predictions for analytics; the run stays usable without these
+        try:
+            write_run_archive(run, db)
+        except Exception as e:
+            logger.warning(f"Could not archive predictions for run {run.run_id}: {e}")
+        
+        try:
+            update_disagreement_index(run, db)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not update disagreement index for run {run.run_id}: {e}")
     
     except Exception as e:
         logger.error(f"Error in evaluation task: {e}")
         if run:
+            db.rollback()
             run.status = RunStatus.FAILED
             run.error_message = str(e)
             db.commit()
@@ -0,0 +1,260 @@
+"""
+Comparison Cache Policy
+Fingerprinted cache keys, TTL expiry and artifact eviction
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+try:
+    from models.comparison_models import (
+        ModelVersion, ComparisonRun, EvaluationResult, Artifact,
+        EvaluationCacheEntry, RunStatus
+    )
+except ImportError:
+    from backend.models.comparison_models import (
+        ModelVersion, ComparisonRun, EvaluationResult, Artifact,
+        EvaluationCacheEntry, RunStatus
+    )
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from .datasets import load_dataset
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def cache_ttl() -> Optional[timedelta]:
+    """Maximum age of a reusable completed run (COMPARISON_CACHE_TTL_HOURS, 0 = never expire)"""
+    hours = float(os.getenv("COMPARISON_CACHE_TTL_HOURS", "168"))
+    return timedelta(hours=hours) if hours > 0 else None
+
+
+def cache_cutoff() -> Optional[datetime]:
+    """Oldest completed_at that is still served from cache"""
+    ttl = cache_ttl()
+    return datetime.utcnow() - ttl if ttl else None
+
+
+def inflight_stale_cutoff() -> datetime:
+    """
+    Last heartbeat before which an in-flight run counts as abandoned
+    (COMPARISON_INFLIGHT_TIMEOUT_MINUTES, default 30)
+    """
+    minutes = float(os.getenv("COMPARISON_INFLIGHT_TIMEOUT_MINUTES", "30"))
+    return datetime.utcnow() - timedelta(minutes=minutes)
+
+
+def artifact_disk_budget_bytes() -> int:
+    """Artifact disk budget (ARTIFACT_DISK_BUDGET_MB, 0 = unlimited)"""
+    return int(float(os.getenv("ARTIFACT_DISK_BUDGET_MB", "5120")) * 1024 * 1024)
+
+
+# ============= Fingerprints =============
+
+# (path, size, mtime_ns) -> content digest, so unchanged weights are hashed once
+_weights_digests: Dict[Tuple[str, int, int], str] = {}
+_weights_lock = threading.Lock()
+
+
+def _file_digest(path: str, stat: os.stat_result) -> str:
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _weights_lock:
+        digest = _weights_digests.get(key)
+    if digest is not None:
+        return digest
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            sha.update(block)
+    digest = sha.hexdigest()
+
+    with _weights_lock:
+        _weights_digests[key] = digest
+    return digest
+
+
+def weights_fingerprint(model: ModelVersion) -> str:
+    """
+    Fingerprint of a model's weights
+
+    Content hash of weights_path when the file exists; otherwise the
+    registration's updated_at, so re-registering a model still changes it.
+    """
+    if model.weights_path and os.path.isfile(model.weights_path):
+        return _file_digest(model.weights_path, os.stat(model.weights_path))
+    updated_at = model.updated_at.isoformat() if model.updated_at else ""
+    return hashlib.sha256(f"{model.weights_path}|{updated_at}".encode()).hexdigest()
+
+
+def dataset_fingerprint(dataset_id: str) -> str:
+    """Fingerprint of a dataset manifest: image paths, labels and file size/mtime"""
+    sha = hashlib.sha256(dataset_id.encode())
+    for image_path, label in sorted(load_dataset(dataset_id)):
+        try:
+            stat = os.stat(image_path)
+            file_state = f"{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            file_state = "missing"
+        sha.update(f"\n{image_path}|{label}|{file_state}".encode())
+    return sha.hexdigest()
+
+
+def run_fingerprints(models: List[ModelVersion], dataset_id: str) -> Dict:
+    """Fingerprints stored with a run and folded into its cache key"""
+    return {
+        "dataset": dataset_fingerprint(dataset_id),
+        "weights": {str(model.id): weights_fingerprint(model) for model in models}
+    }
+
+
+def comparison_config_hash(
+    model_ids: List[int],
+    dataset_id: str,
+    config: Optional[Dict],
+    fingerprints: Dict
+) -> str:
+    """Cache key for a whole comparison run"""
+    config_str = json.dumps({
+        "model_ids": sorted(model_ids),
+        "dataset_id": dataset_id,
+        "config": config,
+        "fingerprints": fingerprints
+    }, sort_keys=True)
+    return hashlib.sha256(config_str.encode()).hexdigest()
+
+
+# ============= Artifact Eviction =============
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def stored_under(directory: str, dialect: str):
+    """
+    Filter for artifact rows whose storage_path lies inside a directory
+
+    SQLite cannot search an index for LIKE with an escaped, concatenated
+    pattern, so there the prefix is an equivalent range on
+    idx_artifacts_storage_path (BINARY collation orders paths bytewise).
+    Elsewhere the collation may not, so the LIKE prefix match is kept.
+    """
+    prefix = directory + os.sep
+    if dialect == "sqlite":
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return and_(Artifact.storage_path >= prefix, Artifact.storage_path < upper)
+    return Artifact.storage_path.startswith(prefix, autoescape=True)
+
+
+def superseded_run_ids(db: Session) -> List[int]:
+    """
+    Finished runs no cache lookup can return, oldest first
+
+    A run is superseded when it failed, has outlived the TTL, or none of its
+    results is a model's current cached evaluation.
+    """
+    cached_runs = db.query(EvaluationResult.run_id).join(
+        EvaluationCacheEntry, EvaluationCacheEntry.result_id == EvaluationResult.id
+    )
+
+    conditions = [
+        ComparisonRun.status == RunStatus.FAILED,
+        ComparisonRun.id.notin_(cached_runs)
+    ]
+    cutoff = cache_cutoff()
+    if cutoff is not None:
+        conditions.append(ComparisonRun.completed_at < cutoff)
+
+    rows = db.query(ComparisonRun.id).filter(
+        ComparisonRun.status.in_([RunStatus.COMPLETED, RunStatus.FAILED]),
+        or_(*conditions)
+    ).order_by(ComparisonRun.completed_at, ComparisonRun.id).all()
+    return [run_id for run_id, in rows]
+
+
+def evict_artifacts(db: Session, budget_bytes: Optional[int] = None) -> Tuple[List[str], Set[str]]:
+    """
+    Delete artifact directories of superseded runs until usage fits the budget
+
+    Reused results share artifact files with the run that produced them, so
+    a directory is kept while any live run still references a file in it.
+    Other superseded runs may still reference it; their artifact rows are
+    deleted with the directory.
+
+    Returns:
+        (run_ids whose artifact directories were evicted, run_ids of every
+        run that lost artifact rows, including those)
+    """
+    budget_bytes = artifact_disk_budget_bytes() if budget_bytes is None else budget_bytes
+    base_path = os.getenv("ARTIFACT_LOCAL_PATH", "./backend/artifacts")
+    if budget_bytes <= 0 or not os.path.isdir(base_path):
+        return [], set()
+
+    sizes = {
+        entry.name: _directory_size(entry.path)
+        for entry in os.scandir(base_path) if entry.is_dir()
+    }
+    usage = sum(sizes.values())
+    if usage <= budget_bytes:
+        return [], set()
+
+    candidates = superseded_run_ids(db)
+    candidate_set = set(candidates)
+    run_names = dict(db.query(ComparisonRun.id, ComparisonRun.run_id).filter(
+        ComparisonRun.id.in_(candidates)
+    ).all()) if candidates else {}
+
+    dialect = db.get_bind().dialect.name
+    evicted, affected = [], set()
+    for run_db_id in candidates:
+        if usage <= budget_bytes:
+            break
+        run_id = run_names.get(run_db_id)
+        if run_id is None or run_id not in sizes:
+            continue
+
+        run_dir = os.path.join(base_path, run_id)
+        in_run_dir = stored_under(run_dir, dialect)
+        owners = dict(db.query(ComparisonRun.id, ComparisonRun.run_id).join(
+            EvaluationResult, EvaluationResult.run_id == ComparisonRun.id
+        ).join(
+            Artifact, Artifact.result_id == EvaluationResult.id
+        ).filter(in_run_dir).distinct().all())
+        # Kept while a live run still references a file in it
+        if not candidate_set.issuperset(owners):
+            continue
+
+        affected.update(owners.values())
+        affected.add(run_id)
+        db.query(Artifact).filter(in_run_dir).delete(synchronize_session=False)
+        # New updated_at versions the changed runs for every worker's response cache
+        db.query(ComparisonRun).filter(
+            ComparisonRun.id.in_(set(owners) | {run_db_id})
+        ).update({ComparisonRun.updated_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+        usage -= sizes[run_id]
+        evicted.append(run_id)
+
+    if evicted:
+        logger.info(
+            f"Evicted artifacts for {len(evicted)} superseded runs "
+            f"({len(affected)} runs affected); usage now {usage} bytes"
+        )
+    return evicted, affected
+
@@ -0,0 +1,163 @@
+"""
+Comparison Cache Telemetry
+In-process cache event counters, flushed to time buckets for sliding-window rates
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import logging
+
+try:
+    from models.comparison_models import CacheStatBucket
+except ImportError:
+    from backend.models.comparison_models import CacheStatBucket
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+CACHE_EVENTS = ("hit", "miss", "dedup_attach", "eviction")
+
+# Sliding windows reported by /comparison/cache-stats
+STAT_WINDOWS = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "24h": timedelta(hours=24),
+}
+
+
+def _bucket_start(moment: datetime) -> datetime:
+    """Start of the one-minute bucket containing moment"""
+    return moment.replace(second=0, microsecond=0)
+
+
+class CacheTelemetry:
+    """
+    Counts cache events in memory and periodically adds them to cache_stat_buckets
+
+    Recording never touches the database; pending counts are flushed by the
+    first caller holding a session once CACHE_STATS_FLUSH_SECONDS have passed.
+    Reads combine flushed buckets with this process's unflushed counts.
+    """
+
+    def __init__(self, flush_interval_s: Optional[float] = None):
+        self.flush_interval_s = flush_interval_s if flush_interval_s is not None else \
+            float(os.getenv("CACHE_STATS_FLUSH_SECONDS", "30"))
+        self._pending: Dict[Tuple[datetime, str], int] = {}
+        self._totals = {event: 0 for event in CACHE_EVENTS}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, event: str, count: int = 1):
+        """Count an event in the current bucket"""
+        if event not in self._totals:
+            raise ValueError(f"Unknown cache event: {event}")
+        if count <= 0:
+            return
+        key = (_bucket_start(datetime.utcnow()), event)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + count
+            self._totals[event] += count
+
+    def totals(self) -> Dict[str, int]:
+        """Counts recorded by this process since it started"""
+        with self._lock:
+            return dict(self._totals)
+
+    def maybe_flush(self, db: Session):
+        """Flush if the flush interval has elapsed"""
+        if time.monotonic() - self._last_flush >= self.flush_interval_s:
+            self.flush(db)
+
+    def flush(self, db: Session):
+        """Add pending counts to their buckets, clear them and prune expired buckets"""
+        if not self._flush_lock.acquire(blocking=False):
+            return  # Another request is already flushing
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+
+            try:
+                for (bucket_start, event), count in pending.items():
+                    self._add_to_bucket(db, bucket_start, event, count)
+                # No window reads past the longest one; uq_cache_stat_bucket serves the range
+                db.query(CacheStatBucket).filter(
+                    CacheStatBucket.bucket_start < _bucket_start(datetime.utcnow() - max(STAT_WINDOWS.values()))
+                ).delete(synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Could not flush cache stats: {e}")
+                with self._lock:
+                    for key, count in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + count
+        finally:
+            self._flush_lock.release()
+
+    @staticmethod
+    def _add_to_bucket(db: Session, bucket_start: datetime, event: str, count: int):
+        updated = db.query(CacheStatBucket).filter(
+            CacheStatBucket.bucket_start == bucket_start,
+            CacheStatBucket.event == event
+        ).update({CacheStatBucket.count: CacheStatBucket.count + count}, synchronize_session=False)
+        if updated:
+            return
+
+        # First writer for this bucket; another process may insert it concurrently
+        try:
+            with db.begin_nested():
+                db.add(CacheStatBucket(bucket_start=bucket_start, event=event, count=count))
+        except IntegrityError:
+            db.query(CacheStatBucket).filter(
+                CacheStatBucket.bucket_start == bucket_start,
+                CacheStatBucket.event == event
+            ).update({CacheStatBucket.count: CacheStatBucket.count + count}, synchronize_session=False)
+
+    def window_stats(self, db: Session) -> Dict[str, Dict]:
+        """
+        Event counts and hit rate over each sliding window
+
+        Windows are aligned to minute buckets, so a window may include up to
+        one extra partial minute.
+
+        Returns:
+            Dict of window name -> counts per event, lookups and hit_rate_pct
+        """
+        self.maybe_flush(db)
+
+        now = datetime.utcnow()
+        oldest = _bucket_start(now - max(STAT_WINDOWS.values()))
+        counts = db.query(
+            CacheStatBucket.bucket_start, CacheStatBucket.event, CacheStatBucket.count
+        ).filter(
+            CacheStatBucket.bucket_start >= oldest
+        ).all()
+
+        with self._lock:
+            pending = list(self._pending.items())
+        counts.extend((bucket_start, event, total) for (bucket_start, event), total in pending)
+
+        stats = {}
+        for name, length in STAT_WINDOWS.items():
+            start = _bucket_start(now - length)
+            window = {event: 0 for event in CACHE_EVENTS}
+            for bucket_start, event, total in counts:
+                if bucket_start >= start and event in window:
+                    window[event] += int(total)
+
+            # Attaching to an in-flight run avoids an evaluation, so it counts as a hit
+            hits = window["hit"] + window["dedup_attach"]
+            lookups = hits + window["miss"]
+            stats[name] = {
+                **window,
+                "lookups": lookups,
+                "hit_rate_pct": round(hits / lookups * 100, 2) if lookups > 0 else 0.0
+            }
+        return stats
+
+
+cache_telemetry = CacheTelemetry()
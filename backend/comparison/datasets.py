@@ -0,0 +1,38 @@
+"""
+Comparison Datasets
+Dataset manifests (image path, ground truth label) used by evaluation runs
+"""
+from typing import List, Tuple
+
+
+def load_dataset(dataset_id: str) -> List[Tuple[str, str]]:
+    """Load dataset images and ground truth labels"""
+    # Mock dataset loading - replace with actual dataset loader
+    # This should load from dataset/ folder or database
+    
+    dataset_map = {
+        "skin_conditions": [
+            ("dataset/skin_sample_1.jpg", "acne"),
+            ("dataset/skin_sample_2.jpg", "eczema"),
+            ("dataset/skin_sample_3.jpg", "psoriasis"),
+        ],
+        "eye_diseases": [
+            ("dataset/eye_sample_1.jpg", "conjunctivitis"),
+            ("dataset/eye_sample_2.jpg", "cataract"),
+        ],
+        "general_medical": [
+            ("dataset/sample_1.jpg", "condition_a"),
+            ("dataset/sample_2.jpg", "condition_b"),
+            ("dataset/sample_3.jpg", "condition_a"),
+        ]
+    }
+    
+    # Return mock dataset for now
+    if dataset_id in dataset_map:
+        return dataset_map[dataset_id]
+    else:
+        # Generate mock data
+        return [
+            (f"dataset/sample_{i}.jpg", f"class_{i % 3}")
+            for i in range(10)
+        ]
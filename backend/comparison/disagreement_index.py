@@ -0,0 +1,324 @@
+"""
+Cross-Run Disagreement Index
+Per-(dataset, image) bitmasks of which models were correct, for fast disagreement queries
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+try:
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, RunStatus,
+        DatasetModelSlot, ImageDisagreement
+    )
+except ImportError:
+    from backend.models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, RunStatus,
+        DatasetModelSlot, ImageDisagreement
+    )
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Masks are signed 64-bit integers; keep clear of the sign bit
+MAX_SLOTS = 63
+
+# Bound on IN (...) list sizes and upsert batches
+LOOKUP_CHUNK = 500
+
+# Query kinds; 'all' reads every indexed image
+DISAGREEMENT_KINDS = ("disagreement", "hard", "all")
+
+# Attempts at assigning slots when concurrent runs race for the same bits
+SLOT_ASSIGN_ATTEMPTS = 5
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def image_kind(num_correct: int, num_evaluated: int) -> str:
+    """Stored kind of an indexed image: 'disagreement', 'hard' or 'consensus'"""
+    if num_correct == 0:
+        return "hard"
+    if num_correct < num_evaluated:
+        return "disagreement"
+    return "consensus"
+
+
+def _assign_slots(db: Session, dataset_id: str, model_ids: List[int]) -> Dict[int, int]:
+    """
+    Return model_version_id -> bit for the dataset, assigning bits to new models
+
+    New slots are inserted in a savepoint. If a concurrent run claimed the
+    same bit or model first, the unique constraints reject the insert and
+    the slots are re-read and assigned again.
+    """
+    for attempt in range(SLOT_ASSIGN_ATTEMPTS):
+        existing = db.query(
+            DatasetModelSlot.model_version_id, DatasetModelSlot.slot
+        ).filter(DatasetModelSlot.dataset_id == dataset_id).all()
+        slots = {model_id: slot for model_id, slot in existing}
+
+        missing = sorted(set(model_ids) - set(slots))
+        if not missing:
+            return slots
+
+        next_slot = max(slots.values(), default=-1) + 1
+        try:
+            with db.begin_nested():
+                for model_id in missing:
+                    if next_slot >= MAX_SLOTS:
+                        logger.warning(
+                            f"Disagreement index for dataset {dataset_id} is full; "
+                            f"model {model_id} will not be indexed"
+                        )
+                        continue
+                    db.add(DatasetModelSlot(dataset_id=dataset_id, model_version_id=model_id, slot=next_slot))
+                    slots[model_id] = next_slot
+                    next_slot += 1
+        except IntegrityError:
+            logger.info(f"Slot assignment for dataset {dataset_id} conflicted; retrying ({attempt + 1})")
+            continue
+        return slots
+
+    raise RuntimeError(f"Could not assign disagreement index slots for dataset {dataset_id}")
+
+
+def _insert_for(db: Session):
+    """Dialect insert construct that supports ON CONFLICT upserts"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def update_disagreement_index(run: ComparisonRun, db: Session) -> int:
+    """
+    Fold a completed run's predictions into its dataset's disagreement index
+
+    For every model in the run the image's evaluated bit is set and its
+    correct bit replaced, so the latest run wins when a model is re-evaluated.
+    Masks are merged in the database with INSERT ... ON CONFLICT DO UPDATE,
+    so runs finishing concurrently on one dataset both keep their bits. The
+    derived counts and kind are then recomputed from the merged masks while
+    the upsert still holds the rows.
+
+    Returns:
+        Number of images touched
+    """
+    rows = db.query(
+        EvaluationResult.model_version_id,
+        ImagePrediction.image_id,
+        ImagePrediction.ground_truth,
+        ImagePrediction.is_correct
+    ).join(
+        EvaluationResult, ImagePrediction.result_id == EvaluationResult.id
+    ).filter(
+        EvaluationResult.run_id == run.id,
+        ImagePrediction.image_id.isnot(None),
+        ImagePrediction.is_correct.isnot(None)
+    ).all()
+
+    if not rows:
+        return 0
+
+    slots = _assign_slots(db, run.dataset_id, [row[0] for row in rows])
+
+    # image_id -> [ground_truth, run_bits, correct_bits]
+    updates: Dict[str, list] = {}
+    for model_id, image_id, truth, is_correct in rows:
+        slot = slots.get(model_id)
+        if slot is None:
+            continue
+        bit = 1 << slot
+        entry = updates.setdefault(image_id, [truth, 0, 0])
+        entry[1] |= bit
+        if is_correct:
+            entry[2] |= bit
+
+    if not updates:
+        return 0
+
+    table = ImageDisagreement.__table__
+    now = datetime.utcnow()
+    values = []
+    for image_id, (truth, run_bits, correct_bits) in updates.items():
+        num_evaluated, num_correct = _popcount(run_bits), _popcount(correct_bits)
+        values.append({
+            "dataset_id": run.dataset_id,
+            "image_id": image_id,
+            "ground_truth": truth,
+            "evaluated_mask": run_bits,
+            "correct_mask": correct_bits,
+            "num_evaluated": num_evaluated,
+            "num_correct": num_correct,
+            "kind": image_kind(num_correct, num_evaluated),
+            "last_run_id": run.id,
+            "updated_at": now
+        })
+
+    stmt = _insert_for(db)(table)
+    excluded = stmt.excluded
+    # correct & ~run_bits, written without bitwise NOT for portability
+    kept_correct = table.c.correct_mask - table.c.correct_mask.op("&")(excluded.evaluated_mask)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.dataset_id, table.c.image_id],
+        set_={
+            "ground_truth": excluded.ground_truth,
+            "evaluated_mask": table.c.evaluated_mask.op("|")(excluded.evaluated_mask),
+            "correct_mask": kept_correct.op("|")(excluded.correct_mask),
+            "last_run_id": excluded.last_run_id,
+            "updated_at": excluded.updated_at
+        }
+    )
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        db.execute(stmt, values[start:start + LOOKUP_CHUNK])
+
+    # Recompute counts for rows that already held other models' bits
+    image_ids = list(updates)
+    changes = []
+    for start in range(0, len(image_ids), LOOKUP_CHUNK):
+        chunk = image_ids[start:start + LOOKUP_CHUNK]
+        for record in db.query(
+            ImageDisagreement.id,
+            ImageDisagreement.evaluated_mask,
+            ImageDisagreement.correct_mask,
+            ImageDisagreement.num_evaluated,
+            ImageDisagreement.num_correct
+        ).filter(
+            ImageDisagreement.dataset_id == run.dataset_id,
+            ImageDisagreement.image_id.in_(chunk)
+        ):
+            num_evaluated = _popcount(record.evaluated_mask)
+            num_correct = _popcount(record.correct_mask)
+            if (num_evaluated, num_correct) != (record.num_evaluated, record.num_correct):
+                changes.append({
+                    "id": record.id,
+                    "num_evaluated": num_evaluated,
+                    "num_correct": num_correct,
+                    "kind": image_kind(num_correct, num_evaluated)
+                })
+
+    if changes:
+        db.bulk_update_mappings(ImageDisagreement, changes)
+    db.commit()
+
+    logger.info(
+        f"Disagreement index for dataset {run.dataset_id}: "
+        f"{len(updates)} images merged ({len(changes)} recounted) from run {run.run_id}"
+    )
+    return len(updates)
+
+
+def rebuild_disagreement_index(db: Session, dataset_id: Optional[str] = None) -> int:
+    """
+    Rebuild the index by replaying completed runs in completion order
+
+    Args:
+        db: Database session
+        dataset_id: Only rebuild this dataset (defaults to all)
+
+    Returns:
+        Number of runs replayed
+    """
+    index_query = db.query(ImageDisagreement)
+    slot_query = db.query(DatasetModelSlot)
+    run_query = db.query(ComparisonRun).filter(ComparisonRun.status == RunStatus.COMPLETED)
+    if dataset_id is not None:
+        index_query = index_query.filter(ImageDisagreement.dataset_id == dataset_id)
+        slot_query = slot_query.filter(DatasetModelSlot.dataset_id == dataset_id)
+        run_query = run_query.filter(ComparisonRun.dataset_id == dataset_id)
+
+    index_query.delete(synchronize_session=False)
+    slot_query.delete(synchronize_session=False)
+    db.commit()
+
+    runs = run_query.order_by(ComparisonRun.completed_at, ComparisonRun.id).all()
+    for run in runs:
+        update_disagreement_index(run, db)
+    return len(runs)
+
+
+def query_disagreements(
+    db: Session,
+    dataset_id: str,
+    kind: str = "disagreement",
+    correct_model: Optional[int] = None,
+    wrong_model: Optional[int] = None,
+    after: Optional[str] = None,
+    limit: int = 100
+) -> Dict:
+    """
+    Page through indexed images with keyset pagination on image_id
+
+    Args:
+        db: Database session
+        dataset_id: Dataset to query
+        kind: 'disagreement' (some but not all models correct), 'hard'
+            (no evaluated model correct) or 'all'
+        correct_model: Only images this model got right
+        wrong_model: Only images this model got wrong
+        after: image_id cursor returned as next_cursor by the previous page
+        limit: Page size
+
+    Returns:
+        Dict with the page of images and the cursor for the next page
+    """
+    if kind not in DISAGREEMENT_KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+
+    slots = dict(db.query(
+        DatasetModelSlot.model_version_id, DatasetModelSlot.slot
+    ).filter(DatasetModelSlot.dataset_id == dataset_id).all())
+    models_by_slot = {slot: model_id for model_id, slot in slots.items()}
+
+    for model_id in (correct_model, wrong_model):
+        if model_id is not None and model_id not in slots:
+            raise KeyError(f"Model {model_id} has no indexed predictions on dataset {dataset_id}")
+
+    query = db.query(ImageDisagreement).filter(ImageDisagreement.dataset_id == dataset_id)
+
+    # Equality on the stored kind keeps (dataset_id, kind, image_id) ordered for the cursor
+    if kind != "all":
+        query = query.filter(ImageDisagreement.kind == kind)
+
+    if correct_model is not None:
+        bit = 1 << slots[correct_model]
+        query = query.filter(ImageDisagreement.correct_mask.op("&")(bit) != 0)
+    if wrong_model is not None:
+        bit = 1 << slots[wrong_model]
+        query = query.filter(
+            ImageDisagreement.evaluated_mask.op("&")(bit) != 0,
+            ImageDisagreement.correct_mask.op("&")(bit) == 0
+        )
+
+    if after is not None:
+        query = query.filter(ImageDisagreement.image_id > after)
+
+    records = query.order_by(ImageDisagreement.image_id).limit(limit + 1).all()
+    has_more = len(records) > limit
+    records = records[:limit]
+
+    def decode(mask: int) -> List[int]:
+        return sorted(model_id for slot, model_id in models_by_slot.items() if mask >> slot & 1)
+
+    return {
+        "dataset_id": dataset_id,
+        "kind": kind,
+        "images": [
+            {
+                "image_id": record.image_id,
+                "ground_truth": record.ground_truth,
+                "num_evaluated": record.num_evaluated,
+                "num_correct": record.num_correct,
+                "correct_models": decode(record.correct_mask),
+                "wrong_models": decode(record.evaluated_mask & ~record.correct_mask)
+            }
+            for record in records
+        ],
+        "next_cursor": records[-1].image_id if has_more else None
+    }
+
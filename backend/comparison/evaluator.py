@@ -4,9 +4,10 @@ Handles model evaluation, metrics computation, and artifact generation
 """
 import os
 import time
-import tracemalloc
+import enum
+import psutil
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 from PIL import Image
 import json
@@ -23,18 +24,37 @@ except ImportError:
         ImagePrediction, Artifact, ArtifactType
     )
 from sqlalchemy.orm import Session
+from .datasets import load_dataset
+from .result_cache import find_reusable_results, copy_result
 
 logger = logging.getLogger(__name__)
 
 
+class MemoryMode(str, enum.Enum):
+    """How often process memory is read during inference"""
+    OFF = "off"
+    SAMPLED = "sampled"  # Every Nth image
+    FULL = "full"  # Every image
+
+
 class ImageComparisonEvaluator:
     """Evaluates multiple models on a dataset and generates comparison artifacts"""
     
-    def __init__(self, models: List[ModelVersion], dataset_id: str, db: Session):
+    def __init__(
+        self,
+        models: List[ModelVersion],
+        dataset_id: str,
+        db: Session,
+        memory_mode: Optional[MemoryMode] = None,
+        memory_sample_every: Optional[int] = None
+    ):
         self.models = models
         self.dataset_id = dataset_id
         self.db = db
         self.artifact_base_path = os.getenv("ARTIFACT_LOCAL_PATH", "./backend/artifacts")
+        self.memory_mode = MemoryMode(memory_mode or os.getenv("EVAL_MEMORY_MODE", MemoryMode.SAMPLED.value))
+        self.memory_sample_every = max(1, memory_sample_every or int(os.getenv("EVAL_MEMORY_SAMPLE_EVERY", "10")))
+        self._process = psutil.Process()
     
     async def run_evaluation(self, run: ComparisonRun):
         """Main evaluation loop"""
@@ -49,20 +69,31 @@ class ImageComparisonEvaluator:
             os.makedirs(os.path.join(run_artifact_dir, "predictions"), exist_ok=True)
             os.makedirs(os.path.join(run_artifact_dir, "thumbnails"), exist_ok=True)
             
+            # Models already evaluated on this dataset under the same config
+            reusable = find_reusable_results(self.db, run, [model.id for model in self.models])
+            
             # Load dataset
-            dataset = self._load_dataset(self.dataset_id)
+            dataset = self._load_dataset(self.dataset_id) if len(reusable) < len(self.models) else []
             total_images = len(dataset)
             
             logger.info(f"Loaded dataset {self.dataset_id} with {total_images} images")
             
             # Evaluate each model
             for model_idx, model in enumerate(self.models):
+                if model.id in reusable:
+                    copy_result(self.db, reusable[model.id], run)
+                    run.progress_pct = (model_idx + 1) / len(self.models) * 100
+                    self.db.commit()
+                    logger.info(f"Reused cached evaluation for model {model.model_name} v{model.version}")
+                    continue
+                
                 logger.info(f"Evaluating model {model.model_name} v{model.version}")
                 
                 # Run inference on all images
                 predictions = []
                 latencies = []
                 memory_usages = []
+                memory_overhead_ms = 0.0
                 
                 for img_idx, (image_path, ground_truth) in enumerate(dataset):
                     # Update progress
@@ -72,7 +103,11 @@ class ImageComparisonEvaluator:
                         self.db.commit()
                     
                     # Run inference with timing and memory tracking
-                    pred, latency, memory = await self._run_inference(model, image_path)
+                    measure_memory = self._should_measure_memory(img_idx)
+                    pred, latency, memory, overhead_ms = await self._run_inference(
+                        model, image_path, measure_memory
+                    )
+                    memory_overhead_ms += overhead_ms
                     
                     predictions.append({
                         "image_path": image_path,
@@ -83,10 +118,18 @@ class ImageComparisonEvaluator:
                     })
                     
                     latencies.append(latency)
-                    memory_usages.append(memory)
+                    if memory is not None:
+                        memory_usages.append(memory)
                 
                 # Compute metrics
                 metrics = self._compute_metrics(predictions)
+                metrics["memory_instrumentation"] = {
+                    "mode": self.memory_mode.value,
+                    "sample_every": self.memory_sample_every if self.memory_mode == MemoryMode.SAMPLED else None,
+                    "num_samples": len(memory_usages),
+                    "overhead_ms_total": memory_overhead_ms,
+                    "overhead_ms_per_sample": memory_overhead_ms / len(memory_usages) if memory_usages else 0.0
+                }
                 
                 # Create evaluation result
                 eval_result = EvaluationResult(
@@ -99,8 +142,8 @@ class ImageComparisonEvaluator:
                     latency_mean_ms=np.mean(latencies),
                     latency_std_ms=np.std(latencies),
                     throughput_imgs_per_sec=1000.0 / np.mean(latencies) if np.mean(latencies) > 0 else 0,
-                    memory_peak_mb=np.max(memory_usages),
-                    memory_avg_mb=np.mean(memory_usages),
+                    memory_peak_mb=np.max(memory_usages) if memory_usages else None,
+                    memory_avg_mb=np.mean(memory_usages) if memory_usages else None,
                     metrics_json=metrics
                 )
                 
@@ -137,43 +180,31 @@ class ImageComparisonEvaluator:
     
     def _load_dataset(self, dataset_id: str) -> List[Tuple[str, str]]:
         """Load dataset images and ground truth labels"""
-        # Mock dataset loading - replace with actual dataset loader
-        # This should load from dataset/ folder or database
-        
-        dataset_map = {
-            "skin_conditions": [
-                ("dataset/skin_sample_1.jpg", "acne"),
-                ("dataset/skin_sample_2.jpg", "eczema"),
-                ("dataset/skin_sample_3.jpg", "psoriasis"),
-            ],
-            "eye_diseases": [
-                ("dataset/eye_sample_1.jpg", "conjunctivitis"),
-                ("dataset/eye_sample_2.jpg", "cataract"),
-            ],
-            "general_medical": [
-                ("dataset/sample_1.jpg", "condition_a"),
-                ("dataset/sample_2.jpg", "condition_b"),
-                ("dataset/sample_3.jpg", "condition_a"),
-            ]
-        }
-        
-        # Return mock dataset for now
-        if dataset_id in dataset_map:
-            return dataset_map[dataset_id]
-        else:
-            # Generate mock data
-            return [
-                (f"dataset/sample_{i}.jpg", f"class_{i % 3}")
-                for i in range(10)
-            ]
+        return load_dataset(dataset_id)
+    
+    def _should_measure_memory(self, img_idx: int) -> bool:
+        """Whether memory is read for this image under the current mode"""
+        if self.memory_mode == MemoryMode.FULL:
+            return True
+        if self.memory_mode == MemoryMode.SAMPLED:
+            return img_idx % self.memory_sample_every == 0
+        return False
     
-    async def _run_inference(self, model: ModelVersion, image_path: str) -> Tuple[Dict, float, float]:
-        """Run inference on a single image with timing and memory tracking"""
-        # Start memory tracking
-        tracemalloc.start()
+    async def _run_inference(
+        self,
+        model: ModelVersion,
+        image_path: str,
+        measure_memory: bool = False
+    ) -> Tuple[Dict, float, Optional[float], float]:
+        """
+        Run inference on a single image with timing and memory tracking
         
+        Memory is read as process RSS after the timed region, so the reported
+        latency excludes instrumentation. Returns the prediction, latency in ms,
+        RSS in MB (None when not measured) and the measurement overhead in ms.
+        """
         # Simulate model inference (replace with actual model loading and inference)
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Mock prediction
         prediction = {
@@ -188,15 +219,18 @@ class ImageComparisonEvaluator:
         # Simulate processing time
         await self._simulate_processing(0.05, 0.15)  # 50-150ms
         
-        end_time = time.time()
+        end_time = time.perf_counter()
         latency_ms = (end_time - start_time) * 1000
         
         # Get memory usage
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
-        memory_mb = peak / 1024 / 1024
+        memory_mb = None
+        overhead_ms = 0.0
+        if measure_memory:
+            memory_start = time.perf_counter()
+            memory_mb = self._process.memory_info().rss / 1024 / 1024
+            overhead_ms = (time.perf_counter() - memory_start) * 1000
         
-        return prediction, latency_ms, memory_mb
+        return prediction, latency_ms, memory_mb, overhead_ms
     
     async def _simulate_processing(self, min_time: float, max_time: float):
         """Simulate processing delay"""
@@ -0,0 +1,257 @@
+"""
+Columnar Prediction Archive
+Compact completed runs' per-image predictions into memory-mappable Arrow IPC files
+"""
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+import logging
+
+try:
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, ModelVersion
+    )
+except ImportError:
+    from backend.models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, ModelVersion
+    )
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FILENAME = "predictions.arrow"
+
+
+def archive_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow.ipc  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def archive_path(run_id: str) -> str:
+    """Location of a run's archive under the artifact directory"""
+    base_path = os.getenv("ARTIFACT_LOCAL_PATH", "./backend/artifacts")
+    return os.path.join(base_path, run_id, ARCHIVE_FILENAME)
+
+
+def write_run_archive(run: ComparisonRun, db: Session) -> Optional[str]:
+    """
+    Write a run's predictions as one wide Arrow IPC file
+
+    One row per image; for every model there are pred_<id>, conf_<id> and
+    correct_<id> columns. All class label columns share one dictionary, so
+    labels are stored as small integer codes. Model metadata is kept in the
+    schema metadata.
+
+    Returns:
+        Path of the written archive, or None if pyarrow is unavailable
+    """
+    if not archive_available():
+        logger.warning("pyarrow not installed; skipping prediction archive")
+        return None
+
+    import pyarrow as pa
+
+    rows = db.query(
+        ModelVersion.id,
+        ModelVersion.model_name,
+        ModelVersion.version,
+        ImagePrediction.image_id,
+        ImagePrediction.predicted_class,
+        ImagePrediction.confidence,
+        ImagePrediction.ground_truth
+    ).join(
+        EvaluationResult, ImagePrediction.result_id == EvaluationResult.id
+    ).join(
+        ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+    ).filter(
+        EvaluationResult.run_id == run.id
+    ).all()
+
+    models = {}
+    image_index = {}
+    for model_id, model_name, version, image_id, _, _, _ in rows:
+        models.setdefault(model_id, {"model_id": model_id, "model_name": model_name, "version": version})
+        image_index.setdefault(image_id, len(image_index))
+
+    model_ids = sorted(models)
+    model_pos = {model_id: pos for pos, model_id in enumerate(model_ids)}
+    n_images = len(image_index)
+
+    # Codes index into one shared label dictionary; -1 marks missing
+    labels = {}
+    truth_codes = np.full(n_images, -1, dtype=np.int32)
+    pred_codes = np.full((len(model_ids), n_images), -1, dtype=np.int32)
+    confidences = np.full((len(model_ids), n_images), np.nan)
+
+    for model_id, _, _, image_id, predicted, confidence, truth in rows:
+        row = image_index[image_id]
+        col = model_pos[model_id]
+        pred_codes[col, row] = labels.setdefault(predicted, len(labels))
+        confidences[col, row] = confidence
+        if truth is not None:
+            truth_codes[row] = labels.setdefault(truth, len(labels))
+
+    dictionary = pa.array(list(labels.keys()), type=pa.string())
+
+    def dictionary_column(codes: np.ndarray):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0, type=pa.int32()), dictionary
+        )
+
+    columns = {
+        "image_id": pa.array(list(image_index.keys()), type=pa.string()),
+        "ground_truth": dictionary_column(truth_codes),
+    }
+    for model_id in model_ids:
+        pos = model_pos[model_id]
+        missing = pred_codes[pos] < 0
+        columns[f"pred_{model_id}"] = dictionary_column(pred_codes[pos])
+        columns[f"conf_{model_id}"] = pa.array(confidences[pos], mask=missing)
+        columns[f"correct_{model_id}"] = pa.array(
+            (pred_codes[pos] == truth_codes) & (truth_codes >= 0),
+            mask=missing | (truth_codes < 0)
+        )
+
+    table = pa.table(columns).replace_schema_metadata({
+        "run_id": run.run_id,
+        "dataset_id": run.dataset_id,
+        "models": json.dumps([models[model_id] for model_id in model_ids]),
+    })
+
+    path = archive_path(run.run_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per writer, so concurrent compactions of one run never share a file
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{ARCHIVE_FILENAME}.", suffix=".tmp", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+    logger.info(f"Archived {n_images} images x {len(model_ids)} models for run {run.run_id}")
+    return path
+
+
+class PredictionArchive:
+    """Memory-mapped, read-only view over a run's prediction archive"""
+
+    def __init__(self, path: str):
+        import pyarrow as pa
+
+        self.path = path
+        self._source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self._source).read_all()
+
+        metadata = self.table.schema.metadata or {}
+        self.run_id = metadata.get(b"run_id", b"").decode()
+        self.models: List[Dict] = json.loads(metadata.get(b"models", b"[]"))
+
+    def close(self):
+        """Release the table and unmap the archive file"""
+        self.table = None
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def __enter__(self) -> "PredictionArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def num_images(self) -> int:
+        return self.table.num_rows
+
+    def query(
+        self,
+        correct: Optional[List[int]] = None,
+        wrong: Optional[List[int]] = None,
+        ground_truth: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Dict:
+        """
+        Filter images with vectorized predicates
+
+        Args:
+            correct: Model IDs that must be correct on the image
+            wrong: Model IDs that must be wrong on the image
+            ground_truth: Only images with this ground-truth label
+            min_confidence: Every listed model's confidence must be at least
+                this; applies to every model in the run when none are listed
+            limit: Maximum rows returned
+            offset: Rows to skip
+
+        Returns:
+            Dict with total match count and the requested page of rows
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        known = {m["model_id"] for m in self.models}
+        for model_id in (correct or []) + (wrong or []):
+            if model_id not in known:
+                raise KeyError(f"Model {model_id} is not part of run {self.run_id}")
+
+        mask = pa.scalar(True)
+        for model_id in correct or []:
+            mask = pc.and_kleene(mask, pc.fill_null(self.table[f"correct_{model_id}"], False))
+        for model_id in wrong or []:
+            mask = pc.and_kleene(mask, pc.fill_null(pc.invert(self.table[f"correct_{model_id}"]), False))
+        if ground_truth is not None:
+            truth = self.table["ground_truth"].cast(pa.string())
+            mask = pc.and_kleene(mask, pc.fill_null(pc.equal(truth, ground_truth), False))
+        if min_confidence is not None:
+            listed = (correct or []) + (wrong or [])
+            for model_id in listed or [m["model_id"] for m in self.models]:
+                mask = pc.and_kleene(
+                    mask, pc.fill_null(pc.greater_equal(self.table[f"conf_{model_id}"], min_confidence), False)
+                )
+
+        if isinstance(mask, pa.Scalar):
+            matches = self.table
+        else:
+            matches = self.table.filter(mask)
+
+        page = matches.slice(offset, limit).to_pylist()
+        rows = []
+        for record in page:
+            rows.append({
+                "image_id": record["image_id"],
+                "ground_truth": record["ground_truth"],
+                "predictions": {
+                    str(m["model_id"]): {
+                        "predicted_class": record[f"pred_{m['model_id']}"],
+                        "confidence": record[f"conf_{m['model_id']}"],
+                        "is_correct": record[f"correct_{m['model_id']}"]
+                    }
+                    for m in self.models
+                }
+            })
+
+        return {
+            "total": matches.num_rows,
+            "limit": limit,
+            "offset": offset,
+            "rows": rows
+        }
+
+
+def open_run_archive(run: ComparisonRun, db: Session) -> PredictionArchive:
+    """Open a run's archive, compacting the run first if it has none yet"""
+    path = archive_path(run.run_id)
+    if not os.path.exists(path):
+        write_run_archive(run, db)
+    return PredictionArchive(path)
@@ -0,0 +1,163 @@
+"""
+Completed-Run Response Cache
+Serialized responses for completed-run endpoints, with ETags and 304s
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    from models.comparison_models import ComparisonRun, RunStatus
+except ImportError:
+    from backend.models.comparison_models import ComparisonRun, RunStatus
+
+# Completed runs still change when artifact eviction removes their artifact
+# rows, so clients may store responses but must revalidate them by ETag (a
+# cheap 304 while the run is unchanged).
+# private: responses are per-deployment data and should not sit in shared proxies.
+COMPLETED_CACHE_CONTROL = "private, no-cache"
+
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+class CachedResponse(NamedTuple):
+    run_id: str
+    version: Optional[datetime]  # run.updated_at when the response was built
+    body: bytes
+    etag: str
+
+
+def _request_key(request: Request) -> Tuple:
+    """Method, path and normalised query string"""
+    return (request.method, request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of If-None-Match against etag, as RFC 9110 specifies"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU of serialized responses for completed runs
+
+    Only COMPLETED runs are stored. Each entry records the run's updated_at,
+    which artifact eviction bumps for every run that lost artifact rows, and
+    a lookup is only served while the caller's freshly read updated_at still
+    matches. That costs one indexed read per hit, and keeps every worker
+    process correct after an eviction in any of them; invalidate_run only
+    frees the evicting process's memory early. Entries larger than an eighth
+    of the budget are not kept, so one large result page cannot flush the
+    cache.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.getenv("RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0}
+        self._lock = threading.Lock()
+
+    def lookup(self, request: Request, version: Optional[datetime]) -> Optional[Response]:
+        """
+        Cached response for a completed run's request, or None
+
+        Only call this for cacheable requests, so misses mean something.
+
+        Args:
+            request: Incoming request
+            version: The run's current updated_at, read from the database
+
+        Returns:
+            The cached response (a 304 if the client's ETag matches), or None
+            if nothing is cached or the entry predates the run's last change
+        """
+        key = _request_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version != version:
+                self._bytes -= len(self._entries.pop(key).body)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return self._serve(request, entry)
+
+    def respond(self, request: Request, run: ComparisonRun, payload: Any) -> Any:
+        """
+        Cache and serve payload if the run is completed
+
+        Returns:
+            A Response with ETag and revalidating Cache-Control for
+            completed runs; otherwise the payload unchanged
+        """
+        if run.status != RunStatus.COMPLETED:
+            return payload
+
+        body = JSONResponse(content=jsonable_encoder(payload)).body
+        entry = CachedResponse(
+            run_id=run.run_id,
+            version=run.updated_at,
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        )
+        self._store(_request_key(request), entry)
+        return self._serve(request, entry)
+
+    def invalidate_run(self, run_id: str) -> int:
+        """Drop every cached response for a run; returns the number removed"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.run_id == run_id]
+            for key in keys:
+                self._bytes -= len(self._entries.pop(key).body)
+            return len(keys)
+
+    def stats(self) -> Dict:
+        """Hit/miss counts and memory use"""
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _store(self, key: Tuple, entry: CachedResponse):
+        size = len(entry.body)
+        if size > self.max_bytes // 8:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self._stats["evictions"] += 1
+
+    def _serve(self, request: Request, entry: CachedResponse) -> Response:
+        headers = {"ETag": entry.etag, "Cache-Control": COMPLETED_CACHE_CONTROL}
+        if request.method in CONDITIONAL_METHODS and _etag_matches(request, entry.etag):
+            with self._lock:
+                self._stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+response_cache = ResponseCache()
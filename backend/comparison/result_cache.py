@@ -0,0 +1,188 @@
+"""
+Model-Level Result Cache
+Reuse a model's evaluation on a dataset across comparison runs with the same eval config
+"""
+import hashlib
+import json
+from typing import Dict, List, Optional
+import logging
+
+try:
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, Artifact,
+        EvaluationCacheEntry, RunStatus
+    )
+except ImportError:
+    from backend.models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, Artifact,
+        EvaluationCacheEntry, RunStatus
+    )
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session, undefer
+from .cache_policy import cache_cutoff
+
+logger = logging.getLogger(__name__)
+
+# Scalar EvaluationResult columns carried over to a reused result
+RESULT_COPY_COLUMNS = [
+    "accuracy", "f1_score", "precision", "recall",
+    "latency_mean_ms", "latency_std_ms", "throughput_imgs_per_sec",
+    "memory_peak_mb", "memory_avg_mb"
+]
+
+PREDICTION_COPY_COLUMNS = [
+    "image_path", "image_id", "predicted_class", "confidence", "ground_truth",
+    "is_correct", "inference_time_ms", "prediction_json", "created_at"
+]
+
+ARTIFACT_COPY_COLUMNS = [
+    "artifact_type", "storage_path", "file_size_bytes", "metadata_json", "created_at"
+]
+
+
+def evaluation_config_hash(
+    dataset_id: str,
+    config: Optional[Dict],
+    dataset_fingerprint: Optional[str] = None,
+    weights_fingerprint: Optional[str] = None
+) -> str:
+    """Hash of everything that determines one model's evaluation output"""
+    config_str = json.dumps({
+        "dataset_id": dataset_id,
+        "config": config,
+        "dataset_fingerprint": dataset_fingerprint,
+        "weights_fingerprint": weights_fingerprint
+    }, sort_keys=True)
+    return hashlib.sha256(config_str.encode()).hexdigest()
+
+
+def model_evaluation_hash(run: ComparisonRun, model_id: int) -> str:
+    """Eval config hash for one of a run's models, from the run's stored configuration"""
+    config_json = run.config_json or {}
+    fingerprints = config_json.get("fingerprints") or {}
+    return evaluation_config_hash(
+        run.dataset_id,
+        config_json.get("config"),
+        fingerprints.get("dataset"),
+        (fingerprints.get("weights") or {}).get(str(model_id))
+    )
+
+
+def find_reusable_results(
+    db: Session,
+    run: ComparisonRun,
+    model_ids: List[int]
+) -> Dict[int, EvaluationResult]:
+    """
+    Look up cached evaluations for a run's models
+
+    Only results from completed runs within the cache TTL are returned.
+
+    Returns:
+        Dict of model_version_id -> EvaluationResult
+    """
+    hashes = {model_id: model_evaluation_hash(run, model_id) for model_id in model_ids}
+
+    # metrics_json is deferred on the model but copied into the reusing run
+    query = db.query(EvaluationCacheEntry.eval_config_hash, EvaluationResult).options(
+        undefer(EvaluationResult.metrics_json)
+    ).join(
+        EvaluationResult, EvaluationCacheEntry.result_id == EvaluationResult.id
+    ).join(
+        ComparisonRun, EvaluationResult.run_id == ComparisonRun.id
+    ).filter(
+        EvaluationCacheEntry.model_version_id.in_(model_ids),
+        EvaluationCacheEntry.dataset_id == run.dataset_id,
+        EvaluationCacheEntry.eval_config_hash.in_(set(hashes.values())),
+        ComparisonRun.status == RunStatus.COMPLETED
+    )
+
+    cutoff = cache_cutoff()
+    if cutoff is not None:
+        query = query.filter(ComparisonRun.completed_at >= cutoff)
+
+    return {
+        result.model_version_id: result
+        for eval_config_hash, result in query.all()
+        if hashes[result.model_version_id] == eval_config_hash
+    }
+
+
+def copy_result(db: Session, source: EvaluationResult, run: ComparisonRun) -> EvaluationResult:
+    """
+    Copy a cached evaluation into a new run
+
+    Predictions and artifact rows are copied with INSERT ... SELECT so they
+    never pass through Python; artifact files are shared, not duplicated.
+    Copying rather than referencing the source rows keeps every run's
+    predictions reachable through its own results, as all readers expect.
+
+    Returns:
+        The new run's EvaluationResult
+    """
+    metrics_json = dict(source.metrics_json or {})
+    metrics_json["reused_from_result_id"] = source.id
+
+    result = EvaluationResult(
+        run_id=run.id,
+        model_version_id=source.model_version_id,
+        metrics_json=metrics_json,
+        **{column: getattr(source, column) for column in RESULT_COPY_COLUMNS}
+    )
+    db.add(result)
+    db.flush()
+
+    prediction_columns = [getattr(ImagePrediction, column) for column in PREDICTION_COPY_COLUMNS]
+    db.execute(
+        insert(ImagePrediction).from_select(
+            ["result_id"] + PREDICTION_COPY_COLUMNS,
+            select(literal(result.id), *prediction_columns).where(
+                ImagePrediction.result_id == source.id
+            ).order_by(ImagePrediction.id)
+        )
+    )
+
+    artifact_columns = [getattr(Artifact, column) for column in ARTIFACT_COPY_COLUMNS]
+    db.execute(
+        insert(Artifact).from_select(
+            ["result_id"] + ARTIFACT_COPY_COLUMNS,
+            select(literal(result.id), *artifact_columns).where(
+                Artifact.result_id == source.id
+            ).order_by(Artifact.id)
+        )
+    )
+
+    db.commit()
+    db.refresh(result)
+    return result
+
+
+def record_run_results(db: Session, run: ComparisonRun):
+    """Make a completed run's results the cached evaluations for its models"""
+    results = db.query(
+        EvaluationResult.id, EvaluationResult.model_version_id
+    ).filter(EvaluationResult.run_id == run.id).all()
+    hashes = {model_id: model_evaluation_hash(run, model_id) for _, model_id in results}
+
+    existing = {
+        (entry.model_version_id, entry.eval_config_hash): entry
+        for entry in db.query(EvaluationCacheEntry).filter(
+            EvaluationCacheEntry.model_version_id.in_(list(hashes)),
+            EvaluationCacheEntry.dataset_id == run.dataset_id,
+            EvaluationCacheEntry.eval_config_hash.in_(set(hashes.values()))
+        )
+    }
+
+    for result_id, model_id in results:
+        entry = existing.get((model_id, hashes[model_id]))
+        if entry is None:
+            db.add(EvaluationCacheEntry(
+                model_version_id=model_id,
+                dataset_id=run.dataset_id,
+                eval_config_hash=hashes[model_id],
+                result_id=result_id
+            ))
+        else:
+            entry.result_id = result_id
+
+    db.commit()
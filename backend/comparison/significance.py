@@ -0,0 +1,253 @@
+"""
+Run Significance Analysis
+Bootstrap confidence intervals and McNemar tests from stored per-image predictions
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import logging
+
+try:
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, ModelVersion
+    )
+    from benchmarking.statistics_service import StatisticsService
+except ImportError:
+    from backend.models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, ModelVersion
+    )
+    from backend.benchmarking.statistics_service import StatisticsService
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+METRIC_NAMES = ["accuracy", "precision", "recall", "f1_score"]
+
+
+# ============= Prediction Loading =============
+
+def load_prediction_arrays(run: ComparisonRun, db: Session) -> Dict:
+    """
+    Load a run's stored predictions as class-code arrays aligned by image
+
+    Only images with ground truth that every model predicted are kept, so
+    position i refers to the same image for every model.
+
+    Returns:
+        Dict with 'models' (list of model info dicts), 'image_ids',
+        'classes', 'y_true' (n,) and 'y_pred' (n_models, n) int arrays
+    """
+    rows = db.query(
+        EvaluationResult.id,
+        ModelVersion.id,
+        ModelVersion.model_name,
+        ModelVersion.version,
+        ImagePrediction.image_id,
+        ImagePrediction.predicted_class,
+        ImagePrediction.ground_truth
+    ).join(
+        ModelVersion, EvaluationResult.model_version_id == ModelVersion.id
+    ).join(
+        ImagePrediction, ImagePrediction.result_id == EvaluationResult.id
+    ).filter(
+        EvaluationResult.run_id == run.id,
+        ImagePrediction.ground_truth.isnot(None)
+    ).order_by(EvaluationResult.id).all()
+
+    models = []
+    predictions_by_result = {}
+    ground_truth = {}
+    for result_id, model_id, model_name, version, image_id, predicted, truth in rows:
+        if result_id not in predictions_by_result:
+            predictions_by_result[result_id] = {}
+            models.append({"model_id": model_id, "model_name": model_name, "version": version})
+        predictions_by_result[result_id][image_id] = predicted
+        ground_truth[image_id] = truth
+
+    if not models:
+        return {"models": [], "image_ids": [], "classes": [],
+                "y_true": np.empty(0, dtype=int), "y_pred": np.empty((0, 0), dtype=int)}
+
+    per_model = list(predictions_by_result.values())
+    image_ids = sorted(set(per_model[0]).intersection(*per_model[1:]))
+
+    labels = [ground_truth[image_id] for image_id in image_ids]
+    for predictions in per_model:
+        labels.extend(predictions[image_id] for image_id in image_ids)
+
+    classes, codes = np.unique(np.array(labels, dtype=str), return_inverse=True)
+    codes = codes.reshape(len(per_model) + 1, len(image_ids))
+
+    return {
+        "models": models,
+        "image_ids": image_ids,
+        "classes": classes.tolist(),
+        "y_true": codes[0],
+        "y_pred": codes[1:]
+    }
+
+
+# ============= Vectorized Metrics =============
+
+def _macro_metric(samples: np.ndarray, axis: int, num_classes: int, kind: str) -> np.ndarray:
+    """
+    Macro-averaged precision/recall/F1 over resamples of (y_true, y_pred) pairs
+
+    Matches ImageComparisonEvaluator._compute_metrics: classes are those that
+    appear in either labels or predictions of the sample, and undefined
+    ratios count as 0.
+    """
+    y_true = samples[..., 0]
+    y_pred = samples[..., 1]
+
+    total = 0.0
+    present = 0
+    for c in range(num_classes):
+        is_true = y_true == c
+        is_pred = y_pred == c
+        tp = np.count_nonzero(is_true & is_pred, axis=axis)
+        n_true = np.count_nonzero(is_true, axis=axis)
+        n_pred = np.count_nonzero(is_pred, axis=axis)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precision = np.where(n_pred > 0, tp / n_pred, 0.0)
+            recall = np.where(n_true > 0, tp / n_true, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        value = {"precision": precision, "recall": recall, "f1_score": f1}[kind]
+        total = total + value
+        present = present + ((n_true + n_pred) > 0)
+
+    return total / np.maximum(present, 1)
+
+
+def _metric_statistic(name: str, num_classes: int):
+    """Vectorized statistic(samples, axis) for a metric name"""
+    if name == "accuracy":
+        return lambda samples, axis: np.mean(samples[..., 0] == samples[..., 1], axis=axis)
+    return lambda samples, axis: _macro_metric(samples, axis, num_classes, name)
+
+
+# ============= Analysis =============
+
+def compute_run_significance(
+    arrays: Dict,
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    alpha: float = 0.05
+) -> Dict:
+    """
+    Bootstrap CIs per model and pairwise McNemar tests on shared images
+
+    Every model is resampled with the same seed, so all models see the same
+    bootstrap image sets.
+    """
+    models = arrays["models"]
+    y_true = arrays["y_true"]
+    y_pred = arrays["y_pred"]
+    num_classes = len(arrays["classes"])
+
+    model_results = []
+    for idx, model in enumerate(models):
+        pairs = np.stack([y_true, y_pred[idx]], axis=1)
+        metrics = {}
+        for name in METRIC_NAMES:
+            ci = StatisticsService.bootstrap_ci(
+                pairs,
+                statistic=_metric_statistic(name, num_classes),
+                confidence=confidence,
+                n_resamples=n_resamples,
+                seed=seed
+            )
+            metrics[name] = {
+                "estimate": ci["estimate"],
+                "ci_lower": ci["confidence_interval"][0],
+                "ci_upper": ci["confidence_interval"][1],
+                "standard_error": ci["standard_error"]
+            }
+        model_results.append({**model, "metrics": metrics})
+
+    correct = y_pred == y_true[None, :]
+    pairwise = []
+    for i in range(len(models)):
+        for j in range(i + 1, len(models)):
+            test = StatisticsService.mcnemar_test(correct[i], correct[j], alpha=alpha)
+            pairwise.append({
+                "model_a": models[i]["model_name"],
+                "model_b": models[j]["model_name"],
+                "model_a_id": models[i]["model_id"],
+                "model_b_id": models[j]["model_id"],
+                **test
+            })
+
+    if pairwise:
+        adjusted = StatisticsService.multiple_comparisons_correction(
+            np.array([p["p_value"] for p in pairwise]), method="benjamini_hochberg"
+        )
+        for test, p_adjusted in zip(pairwise, adjusted):
+            test["p_value_adjusted"] = float(p_adjusted)
+            test["significant"] = bool(p_adjusted < alpha)
+
+    return {
+        "num_images": len(arrays["image_ids"]),
+        "num_classes": num_classes,
+        "confidence": confidence,
+        "n_resamples": n_resamples,
+        "models": model_results,
+        "pairwise_tests": pairwise,
+        "ranking": _rank_models(model_results, pairwise)
+    }
+
+
+def _rank_models(model_results: List[Dict], pairwise: List[Dict]) -> List[Dict]:
+    """Rank by accuracy and list which lower-ranked models each one significantly beats"""
+    beats = {m["model_id"]: [] for m in model_results}
+    for test in pairwise:
+        if not test["significant"]:
+            continue
+        if test["only_a_correct"] > test["only_b_correct"]:
+            beats[test["model_a_id"]].append(test["model_b"])
+        elif test["only_b_correct"] > test["only_a_correct"]:
+            beats[test["model_b_id"]].append(test["model_a"])
+
+    ranked = sorted(model_results, key=lambda m: m["metrics"]["accuracy"]["estimate"], reverse=True)
+    return [
+        {
+            "rank": position + 1,
+            "model_id": m["model_id"],
+            "model_name": m["model_name"],
+            "accuracy": m["metrics"]["accuracy"]["estimate"],
+            "significantly_better_than": beats[m["model_id"]]
+        }
+        for position, m in enumerate(ranked)
+    ]
+
+
+# ============= Cache =============
+
+class SignificanceCache:
+    """Small in-process LRU of significance results for completed runs"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+significance_cache = SignificanceCache()
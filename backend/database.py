@@ -1,24 +1,108 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+try:
+    from migrations import run_migrations
+except ImportError:
+    from backend.migrations import run_migrations
+
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./arogya.db")
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and DATABASE_URL.split("://", 1)[-1] in ("", "/", "/:memory:")
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _pool_settings() -> Dict:
+    """
+    Pool options from the environment (DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING)
+    """
+    settings = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", not IS_SQLITE),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    # In-memory SQLite uses a single-connection pool that takes no sizing options
+    if not IS_SQLITE_MEMORY:
+        settings.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        )
+    return settings
+
+
+# SQLite connection pragmas: WAL lets API reads proceed while an evaluation
+# commits, and busy_timeout makes writers wait for the lock instead of failing
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Set SQLITE_PRAGMAS on each new connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
 # Create engine with appropriate settings
-if DATABASE_URL.startswith("sqlite"):
+if IS_SQLITE:
     engine = create_engine(
         DATABASE_URL,
-        connect_args={"check_same_thread": False}  # Needed for SQLite
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        **_pool_settings()
     )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(DATABASE_URL, **_pool_settings())
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite / asyncpg)"""
+    scheme, _, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+# Async engine for request handlers, so queries don't block the event loop
+if IS_SQLITE:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_settings())
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+else:
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_pool_settings())
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -31,7 +115,34 @@ def get_db():
         db.close()
 
 
+def _pool_metrics(pool) -> Dict:
+    metrics = {"pool_class": type(pool).__name__, "status": pool.status()}
+    # Only queue-based pools track checkouts and overflow
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            metrics[name] = counter()
+    return metrics
+
+
+def get_pool_metrics() -> Dict:
+    """Connection pool usage for the sync and async engines"""
+    return {
+        "dialect": engine.dialect.name,
+        "sync": _pool_metrics(engine.pool),
+        "async": _pool_metrics(async_engine.pool),
+    }
+
+
+async def get_async_db():
+    """Dependency for FastAPI to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database - create all tables"""
+    """Initialize database - create all tables and apply pending migrations"""
     Base.metadata.create_all(bind=engine)
+    # create_all skips changes to tables that already exist
+    run_migrations(engine)
     print("✅ Database tables created successfully!")
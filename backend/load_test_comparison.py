@@ -0,0 +1,116 @@
+"""
+Concurrent load test for the v2 comparison API
+Usage: python backend/load_test_comparison.py [--base-url URL] [--concurrency N] [--requests N] [--path PATH ...]
+
+Fires requests at a running server from N concurrent clients and reports
+per-path latency percentiles, so runs before and after a change can be compared.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v2/models",
+    "/api/v2/comparison/runs",
+    "/api/v2/comparison/cache-stats",
+]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def _worker(client: httpx.AsyncClient, paths: List[str], queue: asyncio.Queue,
+                  latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    while True:
+        try:
+            index = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        path = paths[index % len(paths)]
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors[path] += 1
+        except httpx.HTTPError:
+            errors[path] += 1
+        latencies[path].append((time.perf_counter() - start) * 1000)
+
+
+async def run_load_test(base_url: str, paths: List[str], concurrency: int, total_requests: int) -> Dict:
+    """
+    Send total_requests GETs round-robin over paths from concurrency clients
+
+    Returns:
+        Dict with wall time, throughput and per-path latency stats in ms
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(total_requests):
+        queue.put_nowait(index)
+
+    latencies = {path: [] for path in paths}
+    errors = {path: 0 for path in paths}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(client, paths, queue, latencies, errors) for _ in range(concurrency)
+        ])
+        wall_s = time.perf_counter() - start
+
+    return {
+        "wall_s": wall_s,
+        "requests_per_s": total_requests / wall_s if wall_s > 0 else 0.0,
+        "paths": {
+            path: {
+                "count": len(values),
+                "errors": errors[path],
+                "mean_ms": statistics.mean(values) if values else 0.0,
+                "p50_ms": _percentile(values, 50) if values else 0.0,
+                "p95_ms": _percentile(values, 95) if values else 0.0,
+                "p99_ms": _percentile(values, 99) if values else 0.0,
+                "max_ms": max(values) if values else 0.0,
+            }
+            for path, values in latencies.items()
+        }
+    }
+
+
+def _print_report(report: Dict, concurrency: int):
+    print(f"\n{report['requests_per_s']:.1f} req/s over {report['wall_s']:.2f}s "
+          f"with {concurrency} concurrent clients\n")
+    print(f"{'path':<55} {'n':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for path, stats in report["paths"].items():
+        print(
+            f"{path:<55} {stats['count']:>6} {stats['errors']:>4} "
+            f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+            f"{stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the v2 comparison API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Path to request (repeatable; defaults to list endpoints)")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    print(f"Load testing {args.base_url} ({args.requests} requests, {args.concurrency} clients)...")
+    try:
+        report = asyncio.run(run_load_test(args.base_url, paths, args.concurrency, args.requests))
+    except Exception as e:
+        print(f"❌ Load test failed: {e}")
+        sys.exit(1)
+    _print_report(report, args.concurrency)
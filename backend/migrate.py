@@ -0,0 +1,35 @@
+"""
+Apply or list schema migrations for the configured database
+Usage: python backend/migrate.py [upgrade [VERSION] | status]
+"""
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import engine
+from backend.migrations import migration_status, run_migrations
+from backend.models.comparison_models import Base
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    try:
+        if command == "status":
+            for migration in migration_status(engine):
+                mark = "✅" if migration["applied"] else "⏳"
+                print(f"{mark} {migration['version']:>4}  {migration['description']}")
+        elif command == "upgrade":
+            target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            Base.metadata.create_all(bind=engine)
+            applied = run_migrations(engine, target)
+            if applied:
+                print(f"✅ Applied migrations: {', '.join(str(v) for v in applied)}")
+            else:
+                print("✅ Database schema is up to date")
+        else:
+            print(__doc__)
+            sys.exit(2)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
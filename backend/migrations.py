@@ -0,0 +1,198 @@
+"""
+Schema migrations
+Versioned, in-place upgrades for existing databases
+
+create_all only creates missing tables, so indexes and other changes to
+tables that already exist are applied here. Each migration runs once, in
+its own transaction, and is recorded in schema_migrations. Statements
+should be idempotent (IF NOT EXISTS) because fresh databases already get
+the current schema from the models; statements on tables that do not
+exist yet are skipped for the same reason. A statement may also be a
+callable taking the connection, for changes SQL cannot make conditional
+(such as adding a column).
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+def _add_column(table: str, column: str, definition: str):
+    """Statement callable adding a column unless the table already has it"""
+    def apply(conn):
+        if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+    return apply
+
+
+# (version, description, [(table, statement), ...]); append only, never edit an applied entry
+MIGRATIONS = [
+    (
+        1,
+        "Unique in-flight comparison run per config hash",
+        [
+            # Keep the newest in-flight run per config; the index cannot be built over duplicates
+            ("comparison_runs",
+             "UPDATE comparison_runs SET status = 'FAILED', "
+             "error_message = 'Superseded by a duplicate in-flight run' "
+             "WHERE status IN ('PENDING', 'RUNNING') AND id NOT IN ("
+             "SELECT MAX(id) FROM comparison_runs WHERE status IN ('PENDING', 'RUNNING') "
+             "GROUP BY config_hash)"),
+            ("comparison_runs",
+             "CREATE UNIQUE INDEX IF NOT EXISTS uq_comparison_runs_inflight_config "
+             "ON comparison_runs (config_hash) WHERE status IN ('PENDING', 'RUNNING')"),
+        ],
+    ),
+    (
+        2,
+        "Index comparison foreign keys and run lookups",
+        [
+            ("evaluation_results",
+             "CREATE INDEX IF NOT EXISTS idx_evaluation_results_run ON evaluation_results (run_id)"),
+            ("image_predictions",
+             "CREATE INDEX IF NOT EXISTS idx_image_predictions_result ON image_predictions (result_id)"),
+            ("artifacts",
+             "CREATE INDEX IF NOT EXISTS idx_artifacts_result ON artifacts (result_id)"),
+            ("comparison_runs",
+             "CREATE INDEX IF NOT EXISTS idx_comparison_runs_config_status_created "
+             "ON comparison_runs (config_hash, status, created_at)"),
+            ("comparison_runs",
+             "CREATE INDEX IF NOT EXISTS idx_comparison_runs_status_created "
+             "ON comparison_runs (status, created_at)"),
+            ("comparison_runs",
+             "CREATE INDEX IF NOT EXISTS idx_comparison_runs_created ON comparison_runs (created_at)"),
+        ],
+    ),
+    (
+        3,
+        "Stored disagreement kind with a (dataset_id, kind, image_id) index",
+        [
+            ("image_disagreements",
+             _add_column("image_disagreements", "kind", "VARCHAR(20) NOT NULL DEFAULT 'consensus'")),
+            ("image_disagreements",
+             "UPDATE image_disagreements SET kind = CASE "
+             "WHEN num_correct = 0 THEN 'hard' "
+             "WHEN num_correct < num_evaluated THEN 'disagreement' "
+             "ELSE 'consensus' END"),
+            ("image_disagreements", "DROP INDEX IF EXISTS idx_image_disagreement_counts"),
+            ("image_disagreements",
+             "CREATE INDEX IF NOT EXISTS idx_image_disagreement_kind "
+             "ON image_disagreements (dataset_id, kind, image_id)"),
+        ],
+    ),
+    (
+        4,
+        "Comparison run heartbeat for abandoned in-flight runs",
+        [
+            ("comparison_runs", _add_column("comparison_runs", "updated_at", "TIMESTAMP")),
+        ],
+    ),
+    (
+        5,
+        "Index cached-run lookups on completed_at",
+        [
+            ("comparison_runs",
+             "CREATE INDEX IF NOT EXISTS idx_comparison_runs_config_status_completed "
+             "ON comparison_runs (config_hash, status, completed_at)"),
+            ("comparison_runs", "DROP INDEX IF EXISTS idx_comparison_runs_config_status_created"),
+        ],
+    ),
+    (
+        6,
+        "Index artifact storage paths for eviction",
+        [
+            ("artifacts",
+             "CREATE INDEX IF NOT EXISTS idx_artifacts_storage_path ON artifacts (storage_path)"),
+        ],
+    ),
+]
+
+
+class _AlreadyApplied(Exception):
+    """Another process recorded the migration first; raised to roll back ours"""
+
+
+def _ensure_migrations_table(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR(255) NOT NULL, "
+            "applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_versions(engine: Engine) -> List[int]:
+    """Versions already recorded in schema_migrations"""
+    if not inspect(engine).has_table(MIGRATIONS_TABLE):
+        return []
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(
+            text(f"SELECT version FROM {MIGRATIONS_TABLE} ORDER BY version")
+        )]
+
+
+def run_migrations(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations in version order
+
+    Args:
+        engine: Engine for the database to upgrade
+        target: Highest version to apply (default: all)
+
+    Returns:
+        Versions applied by this call
+    """
+    _ensure_migrations_table(engine)
+    done = set(applied_versions(engine))
+    existing_tables = set(inspect(engine).get_table_names())
+    applied = []
+
+    for version, description, statements in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in done or (target is not None and version > target):
+            continue
+        try:
+            with engine.begin() as conn:
+                for table, statement in statements:
+                    # Tables created later come from the models, which already match
+                    if table not in existing_tables:
+                        continue
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(text(statement))
+                # Only a conflict on the version row means another process won;
+                # integrity errors from the statements themselves propagate
+                try:
+                    conn.execute(
+                        text(
+                            f"INSERT INTO {MIGRATIONS_TABLE} (version, description, applied_at) "
+                            "VALUES (:version, :description, :applied_at)"
+                        ),
+                        {"version": version, "description": description, "applied_at": datetime.utcnow()}
+                    )
+                except IntegrityError as e:
+                    raise _AlreadyApplied() from e
+        except _AlreadyApplied:
+            logger.info(f"Migration {version} already applied")
+            continue
+        logger.info(f"Applied migration {version}: {description}")
+        applied.append(version)
+
+    return applied
+
+
+def migration_status(engine: Engine) -> List[Dict]:
+    """Each known migration and whether it has been applied"""
+    done = set(applied_versions(engine))
+    return [
+        {"version": version, "description": description, "applied": version in done}
+        for version, description, _ in sorted(MIGRATIONS, key=lambda m: m[0])
+    ]
@@ -1,4 +1,10 @@
 """Models package"""
-from .comparison_models import ModelVersion, ComparisonRun, EvaluationResult, ImagePrediction, Artifact
+from .comparison_models import (
+    ModelVersion, ComparisonRun, EvaluationResult, ImagePrediction, Artifact,
+    EvaluationCacheEntry, DatasetModelSlot, ImageDisagreement, CacheStatBucket
+)
 
-__all__ = ['ModelVersion', 'ComparisonRun', 'EvaluationResult', 'ImagePrediction', 'Artifact']
+__all__ = [
+    'ModelVersion', 'ComparisonRun', 'EvaluationResult', 'ImagePrediction', 'Artifact',
+    'EvaluationCacheEntry', 'DatasetModelSlot', 'ImageDisagreement', 'CacheStatBucket'
+]
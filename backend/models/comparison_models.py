@@ -1,8 +1,11 @@
 """
 Database models for model comparison and evaluation
 """
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, String, Integer, BigInteger, Float, DateTime, Text, ForeignKey, JSON,
+    Enum as SQLEnum, Index, UniqueConstraint, text
+)
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import enum
 try:
@@ -48,9 +51,28 @@ class ModelVersion(Base):
         return f"<ModelVersion {self.model_name} v{self.version}>"
 
 
+# Statuses of runs that are still being evaluated (stored by enum name)
+IN_FLIGHT_STATUSES = (RunStatus.PENDING, RunStatus.RUNNING)
+
+
 class ComparisonRun(Base):
     """A comparison run across multiple models and a dataset"""
     __tablename__ = "comparison_runs"
+    __table_args__ = (
+        # At most one in-flight run per configuration; duplicates attach to it
+        Index(
+            "uq_comparison_runs_inflight_config",
+            "config_hash",
+            unique=True,
+            sqlite_where=text("status IN ('PENDING', 'RUNNING')"),
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')")
+        ),
+        # Cache lookups by configuration, most recently completed first
+        Index("idx_comparison_runs_config_status_completed", "config_hash", "status", "completed_at"),
+        # Run listings, optionally filtered by status
+        Index("idx_comparison_runs_status_created", "status", "created_at"),
+        Index("idx_comparison_runs_created", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     run_id = Column(String(100), unique=True, nullable=False, index=True)
@@ -58,13 +80,15 @@ class ComparisonRun(Base):
     dataset_id = Column(String(100), nullable=False, index=True)
     dataset_name = Column(String(255), nullable=True)
     config_hash = Column(String(64), nullable=False, index=True)  # For caching
-    config_json = Column(JSON, nullable=False)  # Run configuration
+    config_json = deferred(Column(JSON, nullable=False))  # Run configuration; loaded on first access
     status = Column(SQLEnum(RunStatus), default=RunStatus.PENDING, nullable=False)
     error_message = Column(Text, nullable=True)
     progress_pct = Column(Float, default=0.0)
     created_at = Column(DateTime, default=datetime.utcnow)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
+    # Heartbeat: every status and progress commit bumps it while the run is in flight
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     evaluation_results = relationship("EvaluationResult", back_populates="comparison_run")
@@ -76,6 +100,9 @@ class ComparisonRun(Base):
 class EvaluationResult(Base):
     """Evaluation results for one model in a comparison run"""
     __tablename__ = "evaluation_results"
+    __table_args__ = (
+        Index("idx_evaluation_results_run", "run_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     run_id = Column(Integer, ForeignKey("comparison_runs.id"), nullable=False)
@@ -95,7 +122,7 @@ class EvaluationResult(Base):
     memory_avg_mb = Column(Float, nullable=True)
     
     # Additional metrics
-    metrics_json = Column(JSON, nullable=True)  # Additional custom metrics
+    metrics_json = deferred(Column(JSON, nullable=True))  # Confusion matrix, per-class metrics; loaded on first access
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -112,6 +139,9 @@ class EvaluationResult(Base):
 class ImagePrediction(Base):
     """Individual image prediction from a model"""
     __tablename__ = "image_predictions"
+    __table_args__ = (
+        Index("idx_image_predictions_result", "result_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     result_id = Column(Integer, ForeignKey("evaluation_results.id"), nullable=False)
@@ -124,7 +154,7 @@ class ImagePrediction(Base):
     is_correct = Column(Integer, nullable=True)  # 1 if correct, 0 if wrong, NULL if no ground truth
     
     inference_time_ms = Column(Float, nullable=True)
-    prediction_json = Column(JSON, nullable=True)  # Full prediction details (top-k, probabilities, etc.)
+    prediction_json = deferred(Column(JSON, nullable=True))  # Full prediction details (top-k, probabilities, etc.); loaded on first access
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -138,6 +168,11 @@ class ImagePrediction(Base):
 class Artifact(Base):
     """Artifacts generated during evaluation (confusion matrices, overlays, etc.)"""
     __tablename__ = "artifacts"
+    __table_args__ = (
+        Index("idx_artifacts_result", "result_id"),
+        # Eviction finds every row stored under a run directory by path prefix
+        Index("idx_artifacts_storage_path", "storage_path"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     result_id = Column(Integer, ForeignKey("evaluation_results.id"), nullable=False)
@@ -153,3 +188,82 @@ class Artifact(Base):
 
     def __repr__(self):
         return f"<Artifact {self.artifact_type} at {self.storage_path}>"
+
+
+class EvaluationCacheEntry(Base):
+    """Latest reusable evaluation of a model on a dataset under one eval config"""
+    __tablename__ = "evaluation_cache"
+    __table_args__ = (
+        UniqueConstraint("model_version_id", "dataset_id", "eval_config_hash", name="uq_evaluation_cache_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_version_id = Column(Integer, ForeignKey("model_versions.id"), nullable=False)
+    dataset_id = Column(String(100), nullable=False)
+    eval_config_hash = Column(String(64), nullable=False)
+    result_id = Column(Integer, ForeignKey("evaluation_results.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<EvaluationCacheEntry model={self.model_version_id} dataset={self.dataset_id} result={self.result_id}>"
+
+
+class DatasetModelSlot(Base):
+    """Bit position assigned to a model within a dataset's disagreement index"""
+    __tablename__ = "dataset_model_slots"
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "model_version_id", name="uq_dataset_model_slot_model"),
+        UniqueConstraint("dataset_id", "slot", name="uq_dataset_model_slot_slot"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dataset_id = Column(String(100), nullable=False)
+    model_version_id = Column(Integer, ForeignKey("model_versions.id"), nullable=False)
+    slot = Column(Integer, nullable=False)  # Bit index into ImageDisagreement masks
+
+    def __repr__(self):
+        return f"<DatasetModelSlot {self.dataset_id} model={self.model_version_id} bit={self.slot}>"
+
+
+class ImageDisagreement(Base):
+    """Which models got an image right, across all completed runs on its dataset"""
+    __tablename__ = "image_disagreements"
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "image_id", name="uq_image_disagreement"),
+        Index("idx_image_disagreement_kind", "dataset_id", "kind", "image_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dataset_id = Column(String(100), nullable=False)
+    image_id = Column(String(100), nullable=False)
+    ground_truth = Column(String(100), nullable=True)
+
+    # Bit n refers to the model holding DatasetModelSlot.slot == n
+    evaluated_mask = Column(BigInteger, nullable=False, default=0)
+    correct_mask = Column(BigInteger, nullable=False, default=0)
+    num_evaluated = Column(Integer, nullable=False, default=0)
+    num_correct = Column(Integer, nullable=False, default=0)
+    # 'disagreement', 'hard' or 'consensus', derived from the counts so kind queries can seek an index
+    kind = Column(String(20), nullable=False, default="consensus")
+
+    last_run_id = Column(Integer, ForeignKey("comparison_runs.id"), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ImageDisagreement {self.dataset_id}/{self.image_id} {self.num_correct}/{self.num_evaluated}>"
+
+
+class CacheStatBucket(Base):
+    """Comparison cache events counted per time bucket, flushed from process counters"""
+    __tablename__ = "cache_stat_buckets"
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "event", name="uq_cache_stat_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False)
+    event = Column(String(32), nullable=False)  # hit, miss, dedup_attach, eviction
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CacheStatBucket {self.bucket_start} {self.event}={self.count}>"
@@ -0,0 +1,25 @@
+"""
+Rebuild benchmark rollup tables from raw data
+Usage: python backend/rebuild_benchmark_rollups.py [path/to/arogya_benchmarks.db]
+"""
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.benchmarking.logging_service import BenchmarkLogger
+
+if __name__ == "__main__":
+    database_path = sys.argv[1] if len(sys.argv) > 1 else 'arogya_benchmarks.db'
+    print(f"Rebuilding benchmark aggregates in {database_path}...")
+    try:
+        benchmark_logger = BenchmarkLogger(database_path)
+        benchmark_logger.rebuild_rollups()
+        benchmark_logger.close()
+        print("✅ Benchmark aggregates rebuilt successfully!")
+        print("   - metric_rollups table rebuilt")
+        print("   - run_rollups table rebuilt")
+    except Exception as e:
+        print(f"❌ Error rebuilding aggregates: {e}")
+        sys.exit(1)
@@ -0,0 +1,26 @@
+"""
+Rebuild the cross-run disagreement index from completed comparison runs
+Usage: python backend/rebuild_disagreement_index.py [dataset_id]
+"""
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.database import SessionLocal, init_db
+from backend.comparison.disagreement_index import rebuild_disagreement_index
+
+if __name__ == "__main__":
+    dataset_id = sys.argv[1] if len(sys.argv) > 1 else None
+    print(f"Rebuilding disagreement index for {dataset_id or 'all datasets'}...")
+    db = SessionLocal()
+    try:
+        init_db()
+        num_runs = rebuild_disagreement_index(db, dataset_id)
+        print(f"✅ Disagreement index rebuilt from {num_runs} completed runs!")
+    except Exception as e:
+        print(f"❌ Error rebuilding disagreement index: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+"""
+Streaming export writers
+Encode row chunks as CSV, NDJSON or Parquet bytes incrementally for StreamingResponse
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enums
+        return value.value
+    return str(value)
+
+
+def csv_stream(columns: Sequence[str], row_chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Yield a CSV header, then one encoded block per row chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    for rows in row_chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def ndjson_stream(columns: Sequence[str], row_chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Yield one JSON object per line, one encoded block per row chunk"""
+    for rows in row_chunks:
+        lines = [
+            json.dumps(dict(zip(columns, row)), default=_json_default)
+            for row in rows
+        ]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose written bytes can be drained between writes"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema(columns: Sequence[str], types: Dict[str, str]):
+    import pyarrow as pa
+
+    arrow_types = {
+        "str": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+    }
+    return pa.schema([(name, arrow_types[types.get(name, "str")]) for name in columns])
+
+
+def parquet_stream(
+    columns: Sequence[str],
+    row_chunks: Iterable[List[tuple]],
+    types: Optional[Dict[str, str]] = None
+) -> Iterator[bytes]:
+    """
+    Yield a Parquet file one row group per chunk
+
+    Column types come from `types` (name -> str/float/int/bool/timestamp,
+    default str). String columns are dictionary-encoded by pyarrow.
+    Requires pyarrow; check parquet_available() before starting the response.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(columns, types or {})
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    for rows in row_chunks:
+        if not rows:
+            continue
+        table = pa.Table.from_pydict({
+            name: [row[idx] for row in rows]
+            for idx, name in enumerate(columns)
+        }, schema=schema)
+        writer.write_table(table)
+        yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def stream_rows(
+    format: str,
+    columns: Sequence[str],
+    row_chunks: Iterable[List[tuple]],
+    types: Optional[Dict[str, str]] = None
+) -> Iterator[bytes]:
+    """Encode row chunks in the requested export format"""
+    if format == "csv":
+        return csv_stream(columns, row_chunks)
+    if format == "ndjson":
+        return ndjson_stream(columns, row_chunks)
+    if format == "parquet":
+        return parquet_stream(columns, row_chunks, types)
+    raise ValueError(f"Unsupported export format: {format}")
@@ -0,0 +1,118 @@
+"""
+Shared pytest setup
+Points the database and artifact store at a scratch directory before any backend module is imported
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))
+sys.path.insert(0, BACKEND_DIR)
+
+_scratch = tempfile.mkdtemp(prefix="arogya-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'arogya.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["ARTIFACT_LOCAL_PATH"] = os.path.join(_scratch, "artifacts")
+
+
+@pytest.fixture
+def db():
+    """Sync session on an empty, fully migrated comparison database"""
+    from database import Base, SessionLocal, engine, init_db
+    import models.comparison_models  # noqa: F401 - registers the tables on Base
+
+    init_db()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def seed_run(db):
+    """
+    Factory inserting a run with per-image predictions
+
+    Call as seed_run(dataset_id, {model_version: [(image_id, predicted, truth), ...]})
+    with ModelVersion rows (see make_model) as keys.
+    """
+    from models.comparison_models import (
+        ComparisonRun, EvaluationResult, ImagePrediction, RunStatus
+    )
+
+    def seed(dataset_id, predictions, status=RunStatus.COMPLETED, config_hash="hash", **fields):
+        run = ComparisonRun(
+            run_id=fields.pop("run_id", f"run-{uuid.uuid4().hex[:12]}"),
+            dataset_id=dataset_id,
+            config_hash=config_hash,
+            config_json=fields.pop("config_json", {}),
+            status=status,
+            completed_at=fields.pop(
+                "completed_at", datetime.utcnow() if status == RunStatus.COMPLETED else None
+            ),
+            **fields
+        )
+        db.add(run)
+        db.flush()
+        for model, rows in predictions.items():
+            result = EvaluationResult(run_id=run.id, model_version_id=model.id, accuracy=0.5)
+            db.add(result)
+            db.flush()
+            db.add_all([
+                ImagePrediction(
+                    result_id=result.id,
+                    image_path=f"/data/{image_id}.png",
+                    image_id=image_id,
+                    predicted_class=predicted,
+                    confidence=0.9,
+                    ground_truth=truth,
+                    is_correct=None if truth is None else int(predicted == truth)
+                )
+                for image_id, predicted, truth in rows
+            ])
+        db.commit()
+        return run
+
+    return seed
+
+
+@pytest.fixture
+def make_model(db):
+    """Factory inserting a registered model version"""
+    from models.comparison_models import ModelVersion
+
+    def make(name, version="1"):
+        model = ModelVersion(model_name=name, version=version, config_json={})
+        db.add(model)
+        db.commit()
+        return model
+
+    return make
+
+
+@pytest.fixture
+def run_async(db):
+    """Run fn(async_session, *args) to completion on a fresh event loop"""
+    from database import AsyncSessionLocal, async_engine
+
+    def run(fn, *args):
+        async def main():
+            try:
+                async with AsyncSessionLocal() as session:
+                    return await fn(session, *args)
+            finally:
+                # Pooled connections belong to this loop
+                await async_engine.dispose()
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,60 @@
+"""Batched augmentations operate on pixel values of normalized batches"""
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from benchmarking.augmentations import (  # noqa: E402
+    IMAGENET_MEAN, IMAGENET_STD, Brightness, GaussianNoise, JPEGCompression,
+    get_batch_augmentations
+)
+
+
+def _normalize(pixels):
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+    return (pixels - mean) / std
+
+
+def _denormalize(images):
+    mean = torch.tensor(IMAGENET_MEAN).view(1, 3, 1, 1)
+    std = torch.tensor(IMAGENET_STD).view(1, 3, 1, 1)
+    return images * std + mean
+
+
+def test_brightness_scales_pixels_not_normalized_values():
+    pixels = torch.full((2, 3, 8, 8), 0.4)
+    augmentation = Brightness(max_delta=0.3, seed=1)
+
+    out = _denormalize(augmentation(_normalize(pixels)))
+
+    # One factor per sample, shared by every channel and pixel
+    ratios = out / pixels
+    for sample in ratios:
+        assert torch.allclose(sample, sample.flatten()[0].expand_as(sample), atol=1e-5)
+        assert 0.7 - 1e-5 <= sample.flatten()[0] <= 1.3 + 1e-5
+
+
+def test_brightness_saturates_in_pixel_space():
+    pixels = torch.full((4, 3, 8, 8), 0.95)
+    out = _denormalize(Brightness(max_delta=0.5, seed=0)(_normalize(pixels)))
+    assert out.max() <= 1.0 + 1e-5
+
+
+def test_noise_std_is_in_pixel_units():
+    pixels = torch.full((1, 3, 128, 128), 0.5)
+    out = _denormalize(GaussianNoise(std=0.05, seed=0)(_normalize(pixels)))
+    assert abs((out - pixels).std().item() - 0.05) < 0.005
+
+
+def test_raw_inputs_are_left_unnormalized():
+    pixels = torch.rand(2, 3, 16, 16)
+    augmentation = JPEGCompression(quality=95, mean=(0.0,), std=(1.0,))
+    out = augmentation(pixels)
+    assert out.min() >= 0.0 and out.max() <= 1.0
+    assert (out - pixels).abs().mean() < 0.02
+
+
+def test_seeded_passes_are_repeatable():
+    images = _normalize(torch.rand(2, 3, 16, 16))
+    for augmentation in get_batch_augmentations(seed=3).values():
+        assert torch.equal(augmentation(images), augmentation(images))
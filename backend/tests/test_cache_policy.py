@@ -0,0 +1,62 @@
+"""Artifact eviction for superseded runs"""
+import os
+
+from comparison.cache_policy import evict_artifacts
+from comparison.result_cache import record_run_results
+from models.comparison_models import (
+    Artifact, ArtifactType, EvaluationCacheEntry, EvaluationResult, RunStatus
+)
+
+
+def _add_artifact(db, base, run, owner_run=None):
+    """Artifact row on run's result pointing at a file in owner_run's directory"""
+    owner_run = owner_run or run
+    path = os.path.join(base, owner_run.run_id, "confusion_matrices", "cm.png")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    result = db.query(EvaluationResult).filter(EvaluationResult.run_id == run.id).first()
+    db.add(Artifact(result_id=result.id, artifact_type=ArtifactType.CONFUSION_MATRIX, storage_path=path))
+    db.commit()
+
+
+def test_shared_directories_are_kept_until_every_referencing_run_is_superseded(
+    db, seed_run, make_model, tmp_path, monkeypatch
+):
+    base = str(tmp_path)
+    monkeypatch.setenv("ARTIFACT_LOCAL_PATH", base)
+    model = make_model("a")
+    rows = [("img1", "mel", "mel")]
+
+    source = seed_run("derm", {model: rows}, config_hash="source")
+    reuser = seed_run("derm", {model: rows}, config_hash="reuser")
+    failed = seed_run("derm", {model: rows}, status=RunStatus.FAILED, config_hash="failed")
+    _add_artifact(db, base, source)
+    _add_artifact(db, base, reuser, owner_run=source)
+    _add_artifact(db, base, failed)
+    record_run_results(db, reuser)
+
+    evicted, affected = evict_artifacts(db, budget_bytes=1)
+
+    assert evicted == [failed.run_id]
+    assert affected == {failed.run_id}
+    assert os.path.isdir(os.path.join(base, source.run_id))
+    assert not os.path.exists(os.path.join(base, failed.run_id))
+
+    # Once the reusing run is no longer cached, the shared directory goes too
+    db.query(EvaluationCacheEntry).delete()
+    db.commit()
+    evicted, affected = evict_artifacts(db, budget_bytes=1)
+
+    assert evicted == [source.run_id]
+    assert affected == {source.run_id, reuser.run_id}
+    assert db.query(Artifact).count() == 0
+
+
+def test_nothing_is_evicted_within_budget(db, seed_run, make_model, tmp_path, monkeypatch):
+    monkeypatch.setenv("ARTIFACT_LOCAL_PATH", str(tmp_path))
+    model = make_model("a")
+    failed = seed_run("derm", {model: [("img1", "mel", "mel")]}, status=RunStatus.FAILED)
+    _add_artifact(db, str(tmp_path), failed)
+
+    assert evict_artifacts(db, budget_bytes=10 ** 6) == ([], set())
@@ -0,0 +1,89 @@
+"""Disagreement index merges across runs"""
+from comparison.disagreement_index import query_disagreements, rebuild_disagreement_index, update_disagreement_index
+from models.comparison_models import ImageDisagreement
+
+
+def _index(db, dataset_id):
+    db.expire_all()
+    return {
+        record.image_id: record
+        for record in db.query(ImageDisagreement).filter(ImageDisagreement.dataset_id == dataset_id)
+    }
+
+
+def test_two_runs_merge_their_models_bits(db, seed_run, make_model):
+    a, b, c = make_model("a"), make_model("b"), make_model("c")
+    first = seed_run("derm", {
+        a: [("img1", "mel", "mel"), ("img2", "nev", "mel")],
+        b: [("img1", "mel", "mel"), ("img2", "nev", "mel")],
+    })
+    second = seed_run("derm", {
+        c: [("img1", "nev", "mel"), ("img2", "nev", "mel"), ("img3", "nev", "nev")],
+    }, config_hash="other")
+
+    assert update_disagreement_index(first, db) == 2
+    assert update_disagreement_index(second, db) == 3
+
+    index = _index(db, "derm")
+    assert (index["img1"].num_evaluated, index["img1"].num_correct, index["img1"].kind) == (3, 2, "disagreement")
+    assert (index["img2"].num_evaluated, index["img2"].num_correct, index["img2"].kind) == (3, 0, "hard")
+    assert (index["img3"].num_evaluated, index["img3"].num_correct, index["img3"].kind) == (1, 1, "consensus")
+    assert index["img1"].last_run_id == second.id
+
+    page = query_disagreements(db, "derm", kind="disagreement")
+    assert [image["image_id"] for image in page["images"]] == ["img1"]
+    assert page["images"][0]["correct_models"] == sorted([a.id, b.id])
+    assert page["images"][0]["wrong_models"] == [c.id]
+
+
+def test_reevaluated_model_replaces_only_its_own_bit(db, seed_run, make_model):
+    a, b = make_model("a"), make_model("b")
+    update_disagreement_index(seed_run("derm", {
+        a: [("img1", "nev", "mel")],
+        b: [("img1", "mel", "mel")],
+    }), db)
+    update_disagreement_index(seed_run("derm", {a: [("img1", "mel", "mel")]}, config_hash="retrained"), db)
+
+    record = _index(db, "derm")["img1"]
+    assert (record.num_evaluated, record.num_correct, record.kind) == (2, 2, "consensus")
+
+
+def test_rebuild_replays_to_the_same_index(db, seed_run, make_model):
+    a, b = make_model("a"), make_model("b")
+    seed_run("derm", {a: [("img1", "mel", "mel"), ("img2", "nev", "mel")]})
+    seed_run("derm", {b: [("img1", "nev", "mel"), ("img2", "nev", "mel")]}, config_hash="other")
+
+    assert rebuild_disagreement_index(db, "derm") == 2
+    index = _index(db, "derm")
+    assert index["img1"].kind == "disagreement"
+    assert index["img2"].kind == "hard"
+
+
+def test_runs_finishing_concurrently_are_all_indexed(db, seed_run, make_model):
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+
+    from database import SessionLocal
+
+    models = [make_model(f"m{i}") for i in range(4)]
+    runs = [
+        seed_run("derm", {model: [(f"img{j}", "mel", "mel" if (i + j) % 2 else "nev") for j in range(50)]},
+                 config_hash=f"hash-{i}")
+        for i, model in enumerate(models)
+    ]
+    barrier = Barrier(len(runs))
+
+    def finish(run):
+        session = SessionLocal()
+        try:
+            barrier.wait()
+            return update_disagreement_index(run, session)
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(len(runs)) as pool:
+        assert list(pool.map(finish, runs)) == [50] * len(runs)
+
+    index = _index(db, "derm")
+    assert len(index) == 50
+    assert all(record.num_evaluated == 4 and record.num_correct == 2 for record in index.values())
@@ -0,0 +1,43 @@
+"""BenchmarkLogger run listings"""
+import pytest
+
+from benchmarking.logging_service import BenchmarkLogger
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    return str(tmp_path / "benchmarks.db")
+
+
+def _log(logger: BenchmarkLogger, model_name: str = "resnet"):
+    return logger.log_run(model_name, "skin", {"accuracy": 0.9}, duration_seconds=1.0)
+
+
+def test_total_tracks_writes_from_another_logger(database_path):
+    reader, writer = BenchmarkLogger(database_path), BenchmarkLogger(database_path)
+    try:
+        _log(reader)
+        assert reader.list_runs()["total"] == 1
+
+        _log(writer)
+        writer.log_runs_bulk([
+            {"model_name": "vit", "dataset_name": "skin", "metrics": {"accuracy": 0.8}, "duration_seconds": 1.0}
+        ])
+        assert reader.list_runs()["total"] == 3
+    finally:
+        reader.close()
+        writer.close()
+
+
+def test_page_metrics_belong_to_page_runs(database_path):
+    logger = BenchmarkLogger(database_path)
+    try:
+        for name in ("a", "b", "c"):
+            _log(logger, name)
+        page = logger.list_runs(limit=2, offset=1)
+        assert page["total"] == 3
+        assert len(page["runs"]) == 2
+        for run in page["runs"]:
+            assert run["metrics"] == {"accuracy": 0.9}
+    finally:
+        logger.close()
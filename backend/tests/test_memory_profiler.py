@@ -0,0 +1,26 @@
+"""Background memory sampling, with and without an allocator probe"""
+import time
+
+from benchmarking.memory_profiler import BYTES_PER_MB, MemorySampler
+
+
+def test_rss_summary_without_allocator():
+    with MemorySampler(interval_ms=1.0) as sampler:
+        time.sleep(0.02)
+    summary = sampler.summary()
+
+    assert summary['num_samples'] >= 2
+    assert summary['peak_mb'] >= summary['mean_mb'] > 0
+    assert summary['delta_mb'] == summary['peak_mb'] - summary['baseline_mb']
+    assert not any(key.startswith('allocator_') for key in summary)
+
+
+def test_allocator_probe_is_sampled_alongside_rss():
+    held = iter(range(4 * BYTES_PER_MB, 10 ** 12, BYTES_PER_MB))
+    with MemorySampler(interval_ms=1.0, allocator=lambda: next(held)) as sampler:
+        time.sleep(0.02)
+    summary = sampler.summary()
+
+    assert summary['allocator_baseline_mb'] == 4.0
+    assert summary['allocator_peak_mb'] == 4.0 + summary['num_samples'] - 1
+    assert summary['allocator_delta_mb'] == summary['allocator_peak_mb'] - 4.0
@@ -0,0 +1,37 @@
+"""Columnar prediction archives"""
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from comparison.prediction_archive import open_run_archive  # noqa: E402
+
+
+def test_query_filters_and_close_releases_the_map(db, seed_run, make_model):
+    a, b = make_model("a"), make_model("b")
+    run = seed_run("derm", {
+        a: [("img1", "mel", "mel"), ("img2", "nev", "mel"), ("img3", "nev", "nev")],
+        b: [("img1", "nev", "mel"), ("img2", "nev", "mel"), ("img3", "nev", "nev")],
+    })
+
+    with open_run_archive(run, db) as archive:
+        assert archive.num_images == 3
+        result = archive.query(correct=[a.id], wrong=[b.id])
+        source = archive._source
+
+    assert [row["image_id"] for row in result["rows"]] == ["img1"]
+    assert result["rows"][0]["predictions"][str(b.id)]["predicted_class"] == "nev"
+    assert source.closed
+    assert archive.table is None
+
+
+def test_unknown_model_is_rejected(db, seed_run, make_model):
+    a = make_model("a")
+    run = seed_run("derm", {a: [("img1", "mel", "mel")]})
+
+    archive = open_run_archive(run, db)
+    try:
+        with pytest.raises(KeyError):
+            archive.query(correct=[a.id + 100])
+    finally:
+        archive.close()
+    archive.close()  # safe to call twice
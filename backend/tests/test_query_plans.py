@@ -0,0 +1,13 @@
+"""Hot comparison queries are served by indexes (see check_query_plans.py)"""
+import pytest
+
+import check_query_plans
+from check_query_plans import FULL_READS, explain, hot_queries, table_scans
+
+
+@pytest.mark.parametrize("name, statement", hot_queries(), ids=[name for name, _ in hot_queries()])
+def test_hot_query_uses_an_index(db, name, statement):
+    if check_query_plans.engine.dialect.name != "sqlite":
+        pytest.skip("query plan checks support SQLite only")
+    plan = explain(statement)
+    assert table_scans(plan, FULL_READS.get(name, ())) == [], "\n".join(plan)
@@ -0,0 +1,90 @@
+"""Completed-run responses: ETags, 304s and staleness across workers"""
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from comparison import api
+from comparison.cache_policy import evict_artifacts
+from comparison.response_cache import ResponseCache
+from models.comparison_models import Artifact, ArtifactType, EvaluationResult, RunStatus
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    fresh = ResponseCache()
+    monkeypatch.setattr(api, "response_cache", fresh)
+    return fresh
+
+
+@pytest.fixture
+def client(db, cache):
+    from database import async_engine
+
+    app = FastAPI()
+    app.include_router(api.router)
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(async_engine.dispose)
+
+
+def _artifacts_url(run):
+    return f"/api/v2/comparison/runs/{run.run_id}/artifacts/{ArtifactType.CONFUSION_MATRIX.value}"
+
+
+def test_matching_if_none_match_gets_304(db, seed_run, make_model, client, cache):
+    run = seed_run("derm", {make_model("a"): [("img1", "mel", "mel")]})
+    url = f"/api/v2/comparison/runs/{run.run_id}"
+
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    revalidated = client.get(url, headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["not_modified"]) == (1, 2, 1)
+
+
+def test_eviction_in_another_worker_invalidates_entries(
+    db, seed_run, make_model, client, cache, tmp_path, monkeypatch
+):
+    monkeypatch.setenv("ARTIFACT_LOCAL_PATH", str(tmp_path))
+    run = seed_run("derm", {make_model("a"): [("img1", "mel", "mel")]}, status=RunStatus.COMPLETED)
+    path = os.path.join(str(tmp_path), run.run_id, "cm.png")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(b"x" * 100)
+    result = db.query(EvaluationResult).filter(EvaluationResult.run_id == run.id).one()
+    db.add(Artifact(result_id=result.id, artifact_type=ArtifactType.CONFUSION_MATRIX, storage_path=path))
+    db.commit()
+
+    first = client.get(_artifacts_url(run))
+    assert len(first.json()["artifacts"]) == 1
+
+    # Evicted elsewhere: this process's cache is never told via invalidate_run
+    evicted, _ = evict_artifacts(db, budget_bytes=1)
+    assert evicted == [run.run_id]
+
+    after = client.get(_artifacts_url(run), headers={"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert after.json()["artifacts"] == []
+    assert after.headers["etag"] != first.headers["etag"]
+
+
+def test_runs_in_flight_are_not_cached_or_counted(db, seed_run, client, cache):
+    run = seed_run("derm", {}, status=RunStatus.RUNNING)
+
+    for _ in range(3):
+        response = client.get(f"/api/v2/comparison/runs/{run.run_id}")
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["entries"]) == (0, 0, 0)
@@ -0,0 +1,70 @@
+"""Reusing a model's cached evaluation in a later run"""
+import asyncio
+from datetime import datetime, timedelta
+
+from comparison.evaluator import ImageComparisonEvaluator
+from comparison.result_cache import find_reusable_results, record_run_results
+from models.comparison_models import (
+    Artifact, ArtifactType, EvaluationResult, ImagePrediction, RunStatus
+)
+
+CONFIG = {"config": {"batch_size": 8}, "fingerprints": {"dataset": "d1", "weights": {}}}
+
+
+def _cached_source(db, seed_run, model):
+    source = seed_run("derm", {
+        model: [("img1", "mel", "mel"), ("img2", "nev", "mel")]
+    }, config_json=CONFIG)
+    result = db.query(EvaluationResult).filter(EvaluationResult.run_id == source.id).one()
+    db.add(Artifact(
+        result_id=result.id,
+        artifact_type=ArtifactType.CONFUSION_MATRIX,
+        storage_path=f"{source.run_id}/confusion_matrices/a.png",
+        file_size_bytes=10
+    ))
+    db.commit()
+    record_run_results(db, source)
+    return source, result
+
+
+def test_reused_run_copies_predictions_and_artifacts(db, seed_run, make_model):
+    model = make_model("a")
+    source, source_result = _cached_source(db, seed_run, model)
+    run = seed_run("derm", {}, status=RunStatus.RUNNING, config_hash="new", config_json=CONFIG)
+
+    evaluator = ImageComparisonEvaluator([model], "derm", db)
+    evaluator._load_dataset = lambda dataset_id: (_ for _ in ()).throw(AssertionError("dataset loaded"))
+    asyncio.run(evaluator.run_evaluation(run))
+
+    result = db.query(EvaluationResult).filter(EvaluationResult.run_id == run.id).one()
+    assert result.id != source_result.id
+    assert result.accuracy == source_result.accuracy
+    assert result.metrics_json["reused_from_result_id"] == source_result.id
+    predictions = db.query(ImagePrediction).filter(ImagePrediction.result_id == result.id).all()
+    assert sorted((p.image_id, p.predicted_class, p.is_correct) for p in predictions) == [
+        ("img1", "mel", 1), ("img2", "nev", 0)
+    ]
+    artifacts = db.query(Artifact).filter(Artifact.result_id == result.id).all()
+    assert [a.storage_path for a in artifacts] == [f"{source.run_id}/confusion_matrices/a.png"]
+    assert run.progress_pct == 100
+
+    # Once completed, recording the reusing run repoints the cache entry at its copy
+    run.status, run.completed_at = RunStatus.COMPLETED, datetime.utcnow()
+    db.commit()
+    record_run_results(db, run)
+    assert find_reusable_results(db, run, [model.id])[model.id].id == result.id
+
+
+def test_changed_config_or_expired_source_is_not_reused(db, seed_run, make_model, monkeypatch):
+    model = make_model("a")
+    source, _ = _cached_source(db, seed_run, model)
+
+    other = dict(CONFIG, config={"batch_size": 16})
+    changed = seed_run("derm", {}, status=RunStatus.RUNNING, config_hash="other", config_json=other)
+    assert find_reusable_results(db, changed, [model.id]) == {}
+
+    monkeypatch.setenv("COMPARISON_CACHE_TTL_HOURS", "1")
+    source.completed_at = datetime.utcnow() - timedelta(hours=2)
+    db.commit()
+    same = seed_run("derm", {}, status=RunStatus.RUNNING, config_hash="same", config_json=CONFIG)
+    assert find_reusable_results(db, same, [model.id]) == {}
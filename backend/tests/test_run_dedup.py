@@ -0,0 +1,52 @@
+"""Cached and in-flight run lookups for identical comparison requests"""
+from datetime import datetime, timedelta
+
+from comparison.api import _find_cached_run, _find_inflight_run
+from models.comparison_models import ComparisonRun, RunStatus
+
+
+def _refreshed(db, run):
+    db.expire_all()
+    return db.get(ComparisonRun, run.id)
+
+
+def test_live_inflight_run_is_attached_to(db, seed_run, run_async):
+    run = seed_run("derm", {}, status=RunStatus.RUNNING, updated_at=datetime.utcnow())
+
+    found = run_async(_find_inflight_run, "hash")
+
+    assert found.id == run.id
+    assert _refreshed(db, run).status == RunStatus.RUNNING
+
+
+def test_stale_inflight_run_is_failed_and_replaced(db, seed_run, run_async):
+    stale = seed_run(
+        "derm", {}, status=RunStatus.RUNNING,
+        updated_at=datetime.utcnow() - timedelta(hours=2)
+    )
+
+    assert run_async(_find_inflight_run, "hash") is None
+
+    failed = _refreshed(db, stale)
+    assert failed.status == RunStatus.FAILED
+    assert failed.error_message.startswith("Abandoned")
+    assert failed.completed_at is not None
+
+    # The config hash is free again for a replacement run
+    replacement = seed_run("derm", {}, status=RunStatus.PENDING)
+    assert run_async(_find_inflight_run, "hash").id == replacement.id
+
+
+def test_cached_run_is_newest_within_ttl(db, seed_run, run_async, monkeypatch):
+    monkeypatch.setenv("COMPARISON_CACHE_TTL_HOURS", "24")
+    now = datetime.utcnow()
+    seed_run("derm", {}, completed_at=now - timedelta(hours=48))
+    seed_run("derm", {}, completed_at=now - timedelta(hours=5))
+    newest = seed_run("derm", {}, completed_at=now - timedelta(hours=1))
+
+    assert run_async(_find_cached_run, "hash").id == newest.id
+
+    monkeypatch.setenv("COMPARISON_CACHE_TTL_HOURS", "2")
+    assert run_async(_find_cached_run, "hash").id == newest.id
+    monkeypatch.setenv("COMPARISON_CACHE_TTL_HOURS", "0.5")
+    assert run_async(_find_cached_run, "hash") is None
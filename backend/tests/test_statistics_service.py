@@ -0,0 +1,91 @@
+"""Vectorized paired tests checked against scipy"""
+import itertools
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from benchmarking.statistics_service import StatisticsService
+
+
+def _pairs_by_name(results):
+    return {(r['model_a'], r['model_b']): r for r in results}
+
+
+def test_all_pairs_match_scipy_ttest_rel():
+    rng = np.random.default_rng(7)
+    scores = rng.normal(0.8, 0.05, size=(4, 12))
+    scores[1] += 0.03
+    scores[2, [3, 8]] = np.nan
+    names = ['a', 'b', 'c', 'd']
+
+    results = _pairs_by_name(StatisticsService.all_pairs_paired_tests(scores, names))
+
+    assert len(results) == 6
+    for i, j in itertools.combinations(range(4), 2):
+        both = ~np.isnan(scores[i]) & ~np.isnan(scores[j])
+        expected = stats.ttest_rel(scores[i, both], scores[j, both])
+        result = results[(names[i], names[j])]
+        assert result['testable']
+        assert result['sample_size'] == both.sum()
+        assert result['t_statistic'] == pytest.approx(expected.statistic)
+        assert result['p_value'] == pytest.approx(expected.pvalue)
+
+
+def test_untestable_pairs_are_reported_and_left_out_of_correction():
+    scores = np.array([
+        [0.90, 0.80, 0.85, 0.70],
+        [0.80, 0.70, 0.75, 0.60],  # a - b is a constant 0.1
+        [0.91, 0.83, 0.84, 0.72],
+        [0.50, np.nan, np.nan, np.nan],  # one aligned run only
+    ])
+    names = ['a', 'b', 'c', 'd']
+
+    results = _pairs_by_name(StatisticsService.all_pairs_paired_tests(scores, names))
+
+    untestable = {pair for pair, r in results.items() if not r['testable']}
+    assert untestable == {('a', 'b'), ('a', 'd'), ('b', 'd'), ('c', 'd')}
+    for pair in untestable:
+        r = results[pair]
+        assert r['t_statistic'] is None and r['p_value'] is None
+        assert r['p_value_adjusted'] is None and r['cohens_d'] is None
+        assert r['confidence_interval'] is None
+        assert r['significant'] is False
+    assert results[('a', 'b')]['mean_difference'] == pytest.approx(0.1)
+
+    # Only the two testable pairs count towards m
+    testable = [results[('a', 'c')], results[('b', 'c')]]
+    raw = np.array([r['p_value'] for r in testable])
+    expected = StatisticsService.multiple_comparisons_correction(raw, method='benjamini_hochberg')
+    assert [r['p_value_adjusted'] for r in testable] == pytest.approx(list(expected))
+
+
+def test_fewer_than_two_models_has_no_pairs():
+    assert StatisticsService.all_pairs_paired_tests(np.ones((1, 5)), ['a']) == []
+
+
+def test_benjamini_hochberg_matches_scipy_in_input_order():
+    p_values = np.array([0.04, 0.001, 0.03, 0.2, 0.012, 0.5, 0.012])
+
+    adjusted = StatisticsService.multiple_comparisons_correction(p_values, method='benjamini_hochberg')
+
+    assert adjusted == pytest.approx(stats.false_discovery_control(p_values, method='bh'))
+    # Adjustment preserves the order of the raw p-values
+    order = np.argsort(p_values, kind='stable')
+    assert np.all(np.diff(adjusted[order]) >= 0)
+
+
+def test_bonferroni_caps_at_one():
+    adjusted = StatisticsService.multiple_comparisons_correction(np.array([0.01, 0.3, 0.6]))
+    assert adjusted == pytest.approx([0.03, 0.9, 1.0])
+
+
+def test_bootstrap_distribution_is_seeded_and_in_range():
+    values = np.arange(10.0)
+
+    distribution = StatisticsService.bootstrap_distribution(values, n_resamples=500, seed=3, max_buffer_elements=40)
+    repeat = StatisticsService.bootstrap_distribution(values, n_resamples=500, seed=3, max_buffer_elements=40)
+
+    assert np.array_equal(distribution, repeat)
+    assert distribution.min() >= 0.0 and distribution.max() <= 9.0
+    assert abs(distribution.mean() - 4.5) < 0.2